@@ -5,12 +5,31 @@ __all__ = [
     ]
 
 import os
-import subprocess
+
+from pocketlint.procpool import (
+    get_process_pool,
+    ToolError,
+    )
 
 
 PACKAGE_PATH = os.path.dirname(__file__)
 
 
+class PyFlakesMessage(object):
+    """A pyflakes message reported by the py2 sub-proc."""
+
+    def __init__(self, filename, lineno, message):
+        self.filename = filename
+        self.lineno = lineno
+        self.col = -1
+        self.message = '%s'
+        self.message_args = (message, )
+
+    def __str__(self):
+        return '%s:%s: %s' % (
+            self.filename, self.lineno, self.message % self.message_args)
+
+
 class PyFlakesChecker(object):
     """A fake for py3 that can run py2 in a sub-proc."""
 
@@ -18,12 +37,15 @@ class PyFlakesChecker(object):
         self.messages = []
         script = os.path.join(PACKAGE_PATH, 'formatcheck.py')
         command = ['python2', script, filename]
-        linter = subprocess.Popen(
-            command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        issues, errors = linter.communicate()
+        try:
+            returncode, issues, errors = get_process_pool().run(command)
+        except ToolError as error:
+            self.messages.append(PyFlakesMessage(
+                filename, 0, 'pyflakes failed: %s' % error))
+            return
         issues = issues.decode('ascii').strip()
         if issues:
             for line in issues.split('\n')[1:]:
-                line_no, message = line.split(':')
-                self.messages.append(
-                    '%s:%s:%s' % (filename, line_no.strip(), message.strip()))
+                line_no, message = line.split(':', 1)
+                self.messages.append(PyFlakesMessage(
+                    filename, int(line_no), message.strip()))
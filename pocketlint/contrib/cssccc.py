@@ -13,17 +13,8 @@ If a comment is inside a line it will only consume its own content.
 
 Bases on Stoyan Stefanov's http://www.phpied.com/css-coding-conventions/
 
-'@media' rule is not supported.
-    @media print {
-      html {
-        background: #fff;
-        color: #000;
-      }
-      body {
-        padding: 1in;
-        border: 0.5pt solid #666;
-      }
-    }
+The text is tokenized once, then the rules are read from the tokens, so
+the time to check grows linearly with the size of the stylesheet.
 
 The following at-rules are supported:
  * keyword / text at-rules
@@ -33,6 +24,10 @@ The following at-rules are supported:
  * keybord / block rules
   * @page { block; }
   * @font-face { block; }
+ * nested rules; the rule sets in the block are indented 4 more spaces.
+  * @media print { rule_set; rule_set; }
+  * @supports (display: flex) { rule_set; }
+Other at-rules are skipped.
 
 
 TODO:
@@ -40,7 +35,6 @@ TODO:
  * add Unicode support.
  * add AtRule checks
  * add support for TAB as a separator / identation.
- * add support for @media
 '''
 
 from __future__ import (
@@ -49,17 +43,50 @@ from __future__ import (
     with_statement,
 )
 
-__version__ = '0.1.1'
+__version__ = '0.2.0'
 
+from bisect import bisect_right
+import re
 import sys
 
 SELECTOR_SEPARATOR = ','
 DECLARATION_SEPARATOR = ';'
 PROPERTY_SEPARATOR = ':'
-COMMENT_START = r'/*'
-COMMENT_END = r'*/'
 AT_TEXT_RULES = ['import', 'charset', 'namespace']
 AT_BLOCK_RULES = ['page', 'font-face']
+AT_NESTED_RULES = [
+    'media', 'supports', 'document', '-moz-document', 'keyframes',
+    '-moz-keyframes', '-o-keyframes', '-webkit-keyframes']
+INDENT = '    '
+
+# The kinds of tokens. Strings and comments that are not closed at the end
+# of the line or text are bad. Text is everything between the other
+# tokens: identifiers, numbers, operators and whitespace.
+COMMENT = 'comment'
+BAD_COMMENT = 'bad_comment'
+STRING = 'string'
+BAD_STRING = 'bad_string'
+AT_KEYWORD = 'at_keyword'
+DELIMITER = 'delimiter'
+TEXT = 'text'
+
+TOKENS = r'''
+    (?P<comment>/\*.*?\*/)
+    |(?P<bad_comment>/\*.*)
+    |(?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+    |(?P<bad_string>["'](?:[^\\\n]|\\.)*)
+    |(?P<at_keyword>@-?[\w-]+)
+    '''
+TOKEN_PATTERN = re.compile(TOKENS + r'''
+    |(?P<delimiter>[{}()\[\];:,])
+    |(?P<text>(?:[^{}()\[\];:,"'/@]|/(?!\*))+|.)
+    ''', re.DOTALL | re.UNICODE | re.VERBOSE)
+# The coding conventions only need the tokens that can end a statement;
+# the text between them is not tokenized.
+STATEMENT_TOKEN_PATTERN = re.compile(
+    TOKENS + '|(?P<delimiter>[{};])', re.DOTALL | re.UNICODE | re.VERBOSE)
+SPACE_PATTERN = re.compile(r'\s*')
+
 # If you want
 # selector,
 # selector2
@@ -83,6 +110,16 @@ AT_BLOCK_RULES = ['page', 'font-face']
 IGNORED_MESSAGES = ['I005', 'I006']
 
 
+def tokenize(text, pattern=TOKEN_PATTERN):
+    '''Return the list of (kind, text, offset) tokens in the text.
+
+    The texts of the TOKEN_PATTERN tokens are the whole text, in order.
+    '''
+    return [
+        (match.lastgroup, match.group(), match.start())
+        for match in pattern.finditer(text)]
+
+
 def to_console(text):
     sys.stdout.write(text)
     sys.stdout.write('\n')
@@ -117,10 +154,14 @@ class CSSRuleSet(object):
 
     type = object()
 
-    def __init__(self, selector, declarations, log):
+    def __init__(self, selector, declarations, log, indent='', first=False):
         self.selector = selector
         self.declarations = declarations
         self.log = log
+        # The indentation of the rule set and whether it is the first rule
+        # set in the block of an at-rule.
+        self.indent = indent
+        self.first = first
 
     def __str__(self):
         return '%s{%s}' % (str(self.selector), str(self.declarations))
@@ -149,7 +190,7 @@ class CSSRuleSet(object):
             self.log(start_line, 'I002', 'To many newlines before selectors.')
         elif first_selector.startswith('\n\n'):
             pass
-        elif start_line > 2:
+        elif start_line > 2 and not self.first:
             self.log(start_line, 'I003', 'To few newlines before selectors.')
         else:
             pass
@@ -180,6 +221,7 @@ class CSSRuleSet(object):
         start_line = self.declarations.getStartLine()
         declarations = self.declarations.text.split(DECLARATION_SEPARATOR)
         offset = 0
+        indent = '\n' + self.indent + INDENT
 
         # Check all declarations except last as this is the new line.
         first_declaration = True
@@ -189,8 +231,8 @@ class CSSRuleSet(object):
                     start_line + offset,
                     'I007',
                     'Each declarations should start on a new line.')
-            elif (not declaration.startswith('\n    ') or
-                  declaration[5] == ' '):
+            elif (not declaration.startswith(indent) or
+                  declaration[len(indent):len(indent) + 1] == ' '):
                 self.log(
                     start_line + offset,
                     'I008',
@@ -226,12 +268,12 @@ class CSSRuleSet(object):
 
         last_declaration = declarations[-1]
         offset += last_declaration.count('\n')
-        if last_declaration != '\n':
+        if last_declaration != '\n' + self.indent:
             self.log(
                 start_line + offset,
                 'I006',
                 'Rule declarations should end with a single new line.')
-        if last_declaration != '\n    ':
+        if last_declaration != indent:
             self.log(
                 start_line + offset,
                 'I014',
@@ -249,18 +291,8 @@ class CSSStatementMember(object):
     def getStartLine(self):
         '''Return the line number for first character in the statement and
         the number of new lines untilg the first character.'''
-        index = 0
-        text = self.text
-        try:
-            character = text[index]
-            while character == '\n':
-                index += 1
-                character = text[index]
-        except IndexError:
-            # The end of string was reached without finding a statement.
-            pass
-
-        return self.start_line + index + 1
+        newlines = len(self.text) - len(self.text.lstrip('\n'))
+        return self.start_line + newlines + 1
 
     def __str__(self):
         return self.text
@@ -278,10 +310,29 @@ class CSSCodingConventionChecker(object):
         'I': 'info',
     }
 
-    def __init__(self, text, logger=None):
-        self._text = text.splitlines(True)
-        self.line_number = 0
-        self.character_number = 0
+    def __init__(self, text, logger=None, tokens=None):
+        '''Create a checker of the text.
+
+        The tokens of the text can be passed if they are known; only the
+        ones that STATEMENT_TOKEN_PATTERN matches are used.
+        '''
+        self._text = text
+        if tokens is None:
+            self._tokens = tokenize(text, STATEMENT_TOKEN_PATTERN)
+        else:
+            self._tokens = [
+                token for token in tokens
+                if token[0] != TEXT and
+                (token[0] != DELIMITER or token[1] in '{};')]
+        # The cursor is the offset in the text and the index of the first
+        # token after it.
+        self._offset = 0
+        self._index = 0
+        self._line_starts = None
+        # The number of open nested at-rule blocks, and whether the next
+        # rule set is the first in its block.
+        self._depth = 0
+        self._first = False
         if logger:
             self._logger = logger
         else:
@@ -302,167 +353,165 @@ class CSSCodingConventionChecker(object):
     def getRules(self):
         '''Generates the next CSS rule ignoring comments.'''
         while True:
-            yield self.getNextRule()
+            try:
+                rule = self.getNextRule()
+            except StopIteration:
+                return
+            yield rule
 
     def getNextRule(self):
         '''Return the next parsed rule.
 
         Raise `StopIteration` if we are at the last rule.
         '''
-        if self._nextStatementIsAtRule():
-            text = None
-            block = None
-            keyword = self._parse('@')
-            # TODO: user regex [ \t {]
-            keyword_text = self._parse(' ')
-            keyword_name = keyword_text.text
-            keyword.text += '@' + keyword_name + ' '
-
-            if keyword_name.lower() in AT_TEXT_RULES:
-                text = self._parse(';')
-            elif keyword_name.lower() in AT_BLOCK_RULES:
-                start = self._parse('{')
-                keyword.text += start.text
-                block = self._parse('}')
-            else:
-                self._parse(';')
-                raise StopIteration
-
+        offset, index = self._skipSpace()
+        while self._depth and self._text.startswith('}', offset):
+            # The end of a nested at-rule block.
+            self._offset = offset + 1
+            self._index = index + 1
+            self._depth -= 1
+            offset, index = self._skipSpace()
+        if (index < len(self._tokens) and self._tokens[index][2] == offset and
+                self._tokens[index][0] == AT_KEYWORD):
+            return self._getAtRule()
+        selector = self._parse('{')
+        declarations = self._parse('}')
+        rule = CSSRuleSet(
+            selector=selector,
+            declarations=declarations,
+            log=self.log,
+            indent=INDENT * self._depth,
+            first=self._first)
+        self._first = False
+        return rule
+
+    def _getAtRule(self):
+        '''Return the at-rule that starts at the next token.'''
+        text = None
+        block = None
+        keyword = self._parse('@')
+        kind, keyword_text, offset = self._tokens[self._index]
+        keyword_name = keyword_text[1:]
+        keyword.text += '@' + keyword_name + ' '
+        self._index += 1
+        self._offset = offset + len(keyword_text)
+        if self._text[self._offset:self._offset + 1].isspace():
+            self._offset += 1
+        name = keyword_name.lower()
+        if name in AT_TEXT_RULES:
+            text = self._parse(';')
+        elif name in AT_NESTED_RULES:
+            keyword.text += self._parse('{').text
+            self._depth += 1
+            self._first = True
             return CSSAtRule(
-                identifier=keyword_name,
-                keyword=keyword,
-                text=text,
-                block=block,
-                log=self.log)
+                identifier=keyword_name, keyword=keyword, log=self.log)
+        elif name in AT_BLOCK_RULES or self._nextStop('{;') == '{':
+            start = self._parse('{')
+            keyword.text += start.text
+            block = self._parse('}', nested=True)
         else:
-            selector = self._parse('{')
-            declarations = self._parse('}')
-            return CSSRuleSet(
-                selector=selector,
-                declarations=declarations,
-                log=self.log)
+            text = self._parse(';')
+        self._first = False
+        return CSSAtRule(
+            identifier=keyword_name,
+            keyword=keyword,
+            text=text,
+            block=block,
+            log=self.log)
 
     def _defaultLog(self, line_number, message, icon='info'):
         '''Log the message to STDOUT.'''
         to_console('    %4s:%s' % (line_number, message))
 
-    def _nextStatementIsAtRule(self):
-        '''Return True if next statement in the buffer is an at-rule.
+    def _skipSpace(self):
+        '''Return the offset and token index after whitespace and comments.
 
-        Just look for open brackets and see if there is an @ before that
-        braket.
+        The cursor does not move.
         '''
-        search_buffer = []
-        line_counter = self.line_number
-        current_line = self._text[line_counter][self.character_number:]
-        while current_line.find('@') == -1:
-            search_buffer.append(current_line)
-            line_counter += 1
-            try:
-                current_line = self._text[line_counter]
-            except IndexError:
-                return False
-
-        text_buffer = ''.join(search_buffer)
-        if text_buffer.find('{') == -1:
-            return True
-        else:
-            return False
-
-    def _parse(self, stop_character):
-        '''Return the parsed text until stop_character.'''
-        try:
-            self._text[self.line_number][self.character_number]
-        except IndexError:
-            raise StopIteration
-        result = []
-        start_line = self.line_number
-        start_character = self.character_number
-        comment_started = False
+        tokens = self._tokens
+        offset = self._offset
+        index = self._index
         while True:
-            try:
-                data = self._text[self.line_number][self.character_number:]
-            except IndexError:
-                break
-
-            # Look for comment start/end.
-            (comment_update, before_comment,
-             after_comment, newline_consumed) = _check_comment(data)
-            if comment_update is not None:
-                comment_started = comment_update
-
-            if comment_started:
-                # We are inside a comment.
-                # Add the data before the comment and go to next line.
-                if before_comment is not None:
-                    result.append(before_comment)
-                self.character_number = 0
-                self.line_number += 1
-                continue
-
-            # If we have a comment, strip it from the data.
-            # Remember the initial cursor position to know where to
-            # continue.
-            initial_position = data.find(stop_character)
-            if before_comment is not None or after_comment is not None:
-                if before_comment is None:
-                    before_comment = ''
-                if after_comment is None:
-                    after_comment = ''
-                data = before_comment + after_comment
-
-            if initial_position == -1 or newline_consumed:
-                # We are not at the end.
-                # Go to next line and append the data.
-                result.append(data)
-                self.character_number = 0
-                self.line_number += 1
-                continue
-            else:
-                # Delimiter found.
-                # Find it again in the text that now has no comments.
-                # Append data until the delimiter.
-                # Move cursor to next character and stop searching for it.
-                new_position = data.find(stop_character)
-                result.append(data[:new_position])
-                self.character_number += initial_position + 1
+            offset = SPACE_PATTERN.match(self._text, offset).end()
+            while index < len(tokens) and tokens[index][2] < offset:
+                index += 1
+            if (index == len(tokens) or tokens[index][2] != offset or
+                    tokens[index][0] not in (COMMENT, BAD_COMMENT)):
+                return offset, index
+            offset += len(tokens[index][1])
+            index += 1
+
+    def _nextStop(self, stop_characters):
+        '''Return the first of the stop_characters after the cursor.'''
+        for index in range(self._index, len(self._tokens)):
+            kind, text, offset = self._tokens[index]
+            if kind == DELIMITER and text in stop_characters:
+                return text
+        return None
+
+    def _position(self, offset):
+        '''Return the (line, character) of the offset, counting from 0.'''
+        if self._line_starts is None:
+            self._line_starts = [0] + [
+                match.end() for match in re.finditer('\n', self._text)]
+        line = bisect_right(self._line_starts, offset) - 1
+        return line, offset - self._line_starts[line]
+
+    def _parse(self, stop_character, nested=False):
+        '''Return the parsed text until stop_character.
+
+        Comments are removed; a comment that starts a line is removed with
+        the newline after it. When nested is True, the blocks inside are
+        skipped. The cursor is left on an at-keyword when stop_character
+        is '@'.
+        '''
+        source = self._text
+        start = self._offset
+        if start >= len(source):
+            raise StopIteration
+        start_line, start_character = self._position(start)
+        tokens = self._tokens
+        index = self._index
+        # The text is sliced from the source between the comments.
+        pieces = []
+        piece_start = start
+        end = len(source)
+        next_offset = end
+        depth = 0
+        comment_on_line = False
+        while index < len(tokens):
+            kind, text, offset = tokens[index]
+            index += 1
+            if kind == DELIMITER:
+                if text == stop_character:
+                    if depth == 0:
+                        end = offset
+                        next_offset = offset + 1
+                        break
+                    depth -= 1
+                elif nested and text == '{':
+                    depth += 1
+            elif kind == AT_KEYWORD and stop_character == '@':
+                end = next_offset = offset
+                index -= 1
                 break
-
+            elif kind == COMMENT or kind == BAD_COMMENT:
+                pieces.append(source[piece_start:offset])
+                at_line_start = (
+                    offset == start or source[offset - 1] in '\n{}' or (
+                        offset == piece_start and comment_on_line))
+                comment_on_line = at_line_start
+                piece_start = offset + len(text)
+                if at_line_start and source.startswith('\n', piece_start):
+                    piece_start += 1
+        pieces.append(source[piece_start:end])
+        self._offset = next_offset
+        self._index = index
         return CSSStatementMember(
             start_line=start_line,
             start_character=start_character,
-            text=''.join(result))
-
-
-def _check_comment(data):
-    '''Check the data for comment markers.'''
-
-    comment_started = None
-    before_comment = None
-    after_comment = None
-    newline_consumed = False
-
-    comment_start = data.find(COMMENT_START)
-    if comment_start != -1:
-        comment_started = True
-        before_comment = data[:comment_start]
-        # Only use `None` to signal that there is no text before the comment.
-        if before_comment == '':
-            before_comment = None
-
-    comment_end = data.find(COMMENT_END)
-    if comment_end != -1:
-        comment_started = False
-        # Set comment end after the lenght of the actual comment end
-        # marker.
-        comment_end += len(COMMENT_END)
-        if before_comment is None and data[comment_end] == '\n':
-            # Consume the new line if it next to the comment end and
-            # the comment in on the whole line.
-            comment_end += 1
-            newline_consumed = True
-        after_comment = data[comment_end:]
-    return (comment_started, before_comment, after_comment, newline_consumed)
+            text=''.join(pieces))
 
 
 def show_usage():
@@ -0,0 +1,273 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+"""A fast, in-process validator of CSS syntax."""
+
+from __future__ import (
+    absolute_import,
+    unicode_literals,
+    with_statement,
+)
+
+__all__ = [
+    'CSSScanner',
+]
+
+
+from bisect import bisect_right
+import re
+
+from pocketlint.contrib.cssccc import (
+    AT_KEYWORD,
+    AT_NESTED_RULES,
+    AT_TEXT_RULES,
+    BAD_COMMENT,
+    BAD_STRING,
+    COMMENT,
+    DELIMITER,
+    TEXT,
+    tokenize,
+)
+
+
+OPENERS = {'(': ')', '[': ']', '{': '}'}
+CLOSERS = {')': '(', ']': '[', '}': '{'}
+
+PROPERTY_PATTERN = re.compile(r'^(?:--|-?[^\W\d])[\w-]*$', re.UNICODE)
+
+# The kinds of blocks.
+RULES = 'rules'
+DECLARATIONS = 'declarations'
+
+
+class CSSScanner(object):
+    """Scan CSS for the syntax errors that a tokenizer can see.
+
+    They are unclosed and unbalanced blocks, brackets, strings and comments,
+    selectors without a block, at-rules without an end, and declarations
+    without a property, a colon or a value. The scanner reads the tokens
+    once and keeps only the stack of open blocks, so it is much faster than
+    cssutils, but it does not know the properties and their values. After
+    scan(), problems is a list of (line, column, message), counting from 1.
+
+    :param tokens: The tokenize() tokens of the text, if they are known.
+    """
+
+    def __init__(self, text, tokens=None):
+        self.text = text
+        self.tokens = tokens
+        self.problems = []
+        self._line_starts = None
+
+    def scan(self):
+        """Scan the text; return the list of problems."""
+        tokens = self.tokens
+        if tokens is None:
+            tokens = tokenize(self.text)
+        # The stack of (bracket, offset, kind) that are open.
+        stack = []
+        kind = RULES
+        statement = _Statement()
+        for token_kind, text, offset in tokens:
+            if token_kind == TEXT:
+                stripped = text.lstrip()
+                if stripped:
+                    statement.add(
+                        stripped, offset + len(text) - len(stripped))
+                continue
+            if token_kind == COMMENT:
+                continue
+            if token_kind == BAD_COMMENT:
+                self._add(offset, 'Unclosed comment.')
+                continue
+            if token_kind == BAD_STRING:
+                self._add(offset, 'Unclosed string.')
+                statement.add(text, offset)
+                continue
+            if token_kind == AT_KEYWORD:
+                if statement.is_empty:
+                    statement.at_rule = text[1:].lower()
+                statement.add(text, offset)
+                continue
+            if token_kind != DELIMITER:
+                statement.add(text, offset)
+                continue
+            if text in '([':
+                statement.add(text, offset)
+                stack.append((text, offset, None))
+            elif text in ')]':
+                if self._close(stack, text, offset, '{'):
+                    statement.add(text, offset)
+            elif text == '}':
+                # The brackets that were not closed end with the block.
+                while statement.depth(stack) and stack[-1][0] != '{':
+                    self._close(stack, text, offset, None)
+                if statement.depth(stack):
+                    # A block that is nested in a value or selector.
+                    stack.pop()
+                    statement.add(text, offset)
+                    continue
+                if kind == DECLARATIONS:
+                    self._end_declaration(statement)
+                else:
+                    self._end_rule(statement)
+                if not stack:
+                    self._add(offset, "Unexpected '}'.")
+                    statement = _Statement()
+                    continue
+                ignore, ignore, kind = stack.pop()
+                statement = _Statement(base=len(stack))
+            elif statement.depth(stack):
+                if text == ';' and kind == RULES:
+                    self._add(offset, "Unexpected ';'.")
+                else:
+                    statement.add(text, offset)
+                    if text == '{':
+                        stack.append((text, offset, None))
+            elif text == '{':
+                if kind == RULES and statement.at_rule is None:
+                    if statement.is_empty:
+                        self._add(offset, "Expected a selector before '{'.")
+                elif statement.at_rule in AT_TEXT_RULES:
+                    self._end_rule(statement)
+                if (statement.at_rule in AT_NESTED_RULES and
+                        kind == RULES):
+                    block_kind = RULES
+                else:
+                    block_kind = DECLARATIONS
+                stack.append((text, offset, kind))
+                kind = block_kind
+                statement = _Statement(base=len(stack))
+            elif text == ';':
+                if kind == DECLARATIONS:
+                    self._end_declaration(statement)
+                elif statement.at_rule is None:
+                    self._add(offset, "Unexpected ';'.")
+                statement = _Statement(base=statement.base)
+            elif text == ':' and kind == DECLARATIONS:
+                self._colon(statement, offset)
+            else:
+                statement.add(text, offset)
+        if kind == RULES:
+            self._end_rule(statement)
+        else:
+            self._end_declaration(statement)
+        for bracket, offset, ignore in stack:
+            self._add(offset, "Unclosed '%s'." % bracket)
+        self.problems.sort()
+        return self.problems
+
+    def _line(self, offset):
+        """Return the line of the offset, counting from 1."""
+        if self._line_starts is None:
+            self._line_starts = [0] + [
+                match.end() for match in re.finditer('\n', self.text)]
+        return bisect_right(self._line_starts, offset)
+
+    def _add(self, offset, message):
+        """Add the problem at the offset."""
+        line = self._line(offset)
+        column = offset - self._line_starts[line - 1] + 1
+        self.problems.append((line, column, message))
+
+    def _close(self, stack, closer, offset, barrier):
+        """Pop the bracket that the closer closes; return True if it did.
+
+        Brackets are not closed beyond the barrier, the opener of the
+        block that contains them.
+        """
+        opener = CLOSERS[closer]
+        if stack and stack[-1][0] == opener:
+            stack.pop()
+            return True
+        if not stack or stack[-1][0] == barrier:
+            self._add(offset, "Unexpected '%s'." % closer)
+            return False
+        bracket, open_offset, ignore = stack.pop()
+        self._add(
+            offset,
+            "Expected '%s' to match '%s' from line %s and instead saw "
+            "'%s'." % (
+                OPENERS[bracket], bracket, self._line(open_offset), closer))
+        return True
+
+    def _colon(self, statement, offset):
+        """Split the declaration at its first colon."""
+        if statement.colon is None:
+            statement.colon = offset
+            statement.name = statement.text()
+            statement.parts = []
+            return
+        if statement.extra_colon is None:
+            statement.extra_colon = offset
+
+    def _end_declaration(self, statement):
+        """Check the declaration that ended."""
+        if statement.at_rule is not None:
+            return
+        if statement.colon is None:
+            if not statement.is_empty:
+                self._add(
+                    statement.start,
+                    "Expected ':' after '%s'." % statement.text())
+            return
+        name = statement.name
+        value = statement.text()
+        if not name:
+            self._add(statement.colon, "Expected a property before ':'.")
+        elif not PROPERTY_PATTERN.match(name):
+            self._add(statement.start, "Invalid property '%s'." % name)
+        elif name.startswith('--'):
+            # Custom properties may have any value.
+            return
+        elif not value:
+            self._add(
+                statement.colon, "Expected a value for '%s'." % name)
+        elif (statement.extra_colon is not None and
+                not value.lower().startswith('progid')):
+            # Internet Explorer filters are progid:name(arguments).
+            self._add(
+                statement.extra_colon,
+                "Unexpected ':' in the value of '%s'." % name)
+
+    def _end_rule(self, statement):
+        """Check the statement that ended at a '}' or the end."""
+        if statement.is_empty:
+            return
+        if statement.at_rule is not None:
+            self._add(
+                statement.start,
+                "Expected ';' to end '@%s'." % statement.at_rule)
+        else:
+            self._add(
+                statement.start,
+                "Expected '{' after '%s'." % statement.text())
+
+
+class _Statement(object):
+    """The tokens of the statement or declaration that is being read."""
+
+    def __init__(self, base=0):
+        # The size of the stack when the statement started.
+        self.base = base
+        self.parts = []
+        self.start = None
+        self.at_rule = None
+        self.colon = None
+        self.name = None
+        self.extra_colon = None
+
+    @property
+    def is_empty(self):
+        return self.start is None
+
+    def add(self, text, offset):
+        if self.start is None:
+            self.start = offset
+        self.parts.append(text)
+
+    def depth(self, stack):
+        """Return the number of brackets that are open in the statement."""
+        return len(stack) - self.base
+
+    def text(self):
+        return ' '.join(part.strip() for part in self.parts).strip()
@@ -17,13 +17,7 @@ __all__ = [
 
 
 import _ast
-try:
-    from io import StringIO
-except ImportError:
-    # Pything 2.7 and below
-    from StringIO import StringIO  # pyflakes:ignore
-    IS_PY = False
-
+import atexit
 try:
     from html.entities import entitydefs
 except:
@@ -39,15 +33,29 @@ except ImportError:
     except ImportError:
         HAS_JSON = False
 
-import logging
+try:
+    from concurrent.futures import (
+        as_completed,
+        ThreadPoolExecutor,
+    )
+except ImportError:
+    # Python 2 without the futures package.
+    ThreadPoolExecutor = None
+
 import mimetypes
 from optparse import OptionParser
 import os
 import re
 import subprocess
 import sys
+import threading
 from tokenize import TokenError
-from xml.etree import ElementTree
+
+try:
+    from io import StringIO
+except ImportError:
+    # Python 2.7 and below
+    from StringIO import StringIO  # pyflakes:ignore
 
 try:
     from xml.etree.ElementTree import ParseError
@@ -63,13 +71,47 @@ try:
 except ImportError:
     HAS_CSSUTILS = False
 
-from pocketlint.formatdoctest import DoctestReviewer
+from pocketlint.cssscanner import CSSScanner
+from pocketlint.formatdoctest import (
+    check_docstrings,
+    DoctestReviewer,
+    )
+from pocketlint.gotools import run_go_tools
+from pocketlint.html5scanner import HTML5Scanner
+from pocketlint.jsonlines import (
+    check_records,
+    JSONLinesValidator,
+    )
+from pocketlint.jsonscanner import JSONScanner
+from pocketlint.jsscanner import JavaScriptScanner
+from pocketlint.jsworker import (
+    JSLintWorkerPool,
+    WorkerError,
+    )
+from pocketlint.procpool import (
+    DEFAULT_TIMEOUT as DEFAULT_TOOL_TIMEOUT,
+    get_process_pool,
+    ToolCall,
+    ToolError,
+    )
 from pocketlint.reporter import (
     css_report_handler,
+    Diagnostic,
+    FileReport,
+    report_diagnostic,
+    ReportAggregator,
     Reporter,
     )
+from pocketlint.sqlscanner import (
+    SQL_DIALECTS,
+    SQLScanner,
+    )
+from pocketlint.symbolindex import SymbolIndex
 import pep8
-from pocketlint.contrib.cssccc import CSSCodingConventionChecker
+from pocketlint.contrib.cssccc import (
+    CSSCodingConventionChecker,
+    tokenize as tokenize_css,
+)
 try:
     from pyflakes.checker import Checker as PyFlakesChecker
     PyFlakesChecker
@@ -112,6 +154,17 @@ JS = find_exec(['gjs', 'seed'])
 
 DEFAULT_MAX_LENGTH = 80
 
+# The formats of the reports that are written to the console.
+OUTPUT_FORMATS = ['console', 'jsonl', 'sarif']
+
+# The engines that can check CSS syntax.
+CSS_ENGINES = ['fast', 'cssutils']
+
+# XML, JSON and SQL files larger than this are checked as they are read,
+# in chunks.
+STREAM_SIZE = 8 * 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
 if IS_PY3:
     def u(string):
@@ -176,6 +229,7 @@ class Language(object):
     CSS = object()
     JAVASCRIPT = object()
     JSON = object()
+    JSONL = object()
     SH = object()
     XML = object()
     XSLT = object()
@@ -190,15 +244,21 @@ class Language(object):
 
     XML_LIKE = (XML, XSLT, HTML, ZPT, ZCML, DOCBOOK)
 
+    # Large files of these languages are checked as they are read.
+    STREAMED = XML_LIKE + (JSON, JSONL, SQL)
+
     # Sorted after extension.
     mimetypes.add_type('text/plain', '.bat')
     mimetypes.add_type('text/css', '.css')
     mimetypes.add_type('text/x-python-doctest', '.doctest')
+    mimetypes.add_type('text/x-go', '.go')
     mimetypes.add_type('text/html', '.html')
     mimetypes.add_type('text/plain', '.ini')
     mimetypes.add_type('application/javascript', '.js')
     mimetypes.add_type('application/json', '.json')
+    mimetypes.add_type('application/jsonl', '.jsonl')
     mimetypes.add_type('text/x-log', '.log')
+    mimetypes.add_type('application/x-ndjson', '.ndjson')
     mimetypes.add_type('application/x-zope-page-template', '.pt')
     mimetypes.add_type('text/x-python', '.py')
     mimetypes.add_type('text/x-rst', '.rst')
@@ -212,7 +272,9 @@ class Language(object):
     mime_type_language = {
         'application/javascript': JAVASCRIPT,
         'application/json': JSON,
+        'application/jsonl': JSONL,
         'application/xml': XML,
+        'application/x-ndjson': JSONL,
         'application/x-sh': SH,
         'application/x-zope-configuration': ZCML,
         'application/x-zope-page-template': ZPT,
@@ -269,6 +331,21 @@ class PocketLintOptions(object):
 
         self.jslint = {
             'enabled': True,
+            # Lint with persistent interpreters instead of one per file.
+            'worker': True,
+            # The number of worker interpreters; None is one per core.
+            'workers': None,
+            # Scan the script first; jslint is not run when the script is
+            # only whitespace and comments.
+            'prescan': True,
+            # The seconds to wait for jslint before it is killed.
+            'timeout': DEFAULT_TOOL_TIMEOUT,
+            }
+
+        self.jsonl = {
+            # The number of processes that validate the records of large
+            # files; None is one per core.
+            'workers': None,
             }
 
         self.closure_linter = {
@@ -279,6 +356,27 @@ class PocketLintOptions(object):
             'ignore': [110],
             }
 
+        self.css = {
+            # The 'fast' scanner checks the syntax; 'cssutils' also checks
+            # the properties and values, but it is much slower.
+            'engine': 'fast',
+            }
+
+        self.sql = {
+            # 'standard' SQL doubles quotes in literals, and knows the
+            # PostgreSQL extensions; 'mysql' escapes them with backslashes.
+            'dialect': 'standard',
+            }
+
+        self.gofmt = {
+            'enabled': True,
+            'command': 'gofmt',
+            # Also run go vet; it checks the files on disk.
+            'vet': False,
+            'vet_command': 'go',
+            'timeout': DEFAULT_TOOL_TIMEOUT,
+            }
+
         # See pep8.StyleGuide for available options.
         self.pep8 = {
             'max_line_length': pep8.MAX_LINE_LENGTH,
@@ -287,6 +385,12 @@ class PocketLintOptions(object):
 
         self.regex_line = []
 
+        # The GoToolReport of a gofmt run over many files, or None.
+        self.go_tool_report = None
+
+        # A SymbolIndex for cross-module Python checks, or None.
+        self.symbol_index = None
+
         if command_options:
             self._updateFromCommandLineOptions(command_options)
 
@@ -300,6 +404,14 @@ class PocketLintOptions(object):
         self.pep8['hang_closing'] = options.hang_closing
         if hasattr(options, 'regex_line'):
             self.regex_line = options.regex_line
+        self.symbol_index = getattr(options, 'symbol_index', None)
+        self.closure_linter['enabled'] = getattr(
+            options, 'closure_linter', False)
+        self.go_tool_report = getattr(options, 'go_tool_report', None)
+        self.gofmt['command'] = getattr(options, 'gofmt_command', 'gofmt')
+        self.gofmt['vet'] = getattr(options, 'go_vet', False)
+        self.css['engine'] = getattr(options, 'css_engine', 'fast')
+        self.sql['dialect'] = getattr(options, 'sql_dialect', 'standard')
 
 
 class BaseChecker(object):
@@ -314,7 +426,7 @@ class BaseChecker(object):
         self.base_dir = os.path.dirname(file_path)
         self.file_name = os.path.basename(file_path)
         self.text = text
-        if self.REENCODE:
+        if self.REENCODE and text is not None:
             self.text = u(text)
         self.set_reporter(reporter=reporter)
 
@@ -332,15 +444,21 @@ class BaseChecker(object):
         self._reporter = reporter
 
     def message(self, line_no, message, icon=None,
-                base_dir=None, file_name=None):
+                base_dir=None, file_name=None, column=0, rule=None):
         """Report the message."""
-        if base_dir is None:
-            base_dir = self.base_dir
-        if file_name is None:
-            file_name = self.file_name
-        self._reporter(
-            line_no, message, icon=icon,
-            base_dir=base_dir, file_name=file_name)
+        if base_dir is None and file_name is None:
+            path = self.file_path
+        else:
+            if base_dir is None:
+                base_dir = self.base_dir
+            if file_name is None:
+                file_name = self.file_name
+            path = os.path.join(base_dir, file_name)
+        self.report(Diagnostic(path, line_no, column, rule, icon, message))
+
+    def report(self, diagnostic):
+        """Report the Diagnostic."""
+        report_diagnostic(self._reporter, diagnostic)
 
     def check(self):
         """Check the content."""
@@ -378,15 +496,22 @@ class UniversalChecker(BaseChecker):
         elif self.language is Language.CSS:
             checker_class = CSSChecker
         elif self.language in Language.XML_LIKE:
-            checker_class = XMLChecker
+            if HTML5Checker.declares_html5(self.file_path, self.text):
+                checker_class = HTML5Checker
+            else:
+                checker_class = XMLChecker
         elif self.language is Language.JAVASCRIPT:
             checker_class = JavascriptChecker
         elif self.language is Language.JSON:
             checker_class = JSONChecker
+        elif self.language is Language.JSONL:
+            checker_class = JSONLinesChecker
         elif self.language is Language.RESTRUCTUREDTEXT:
             checker_class = ReStructuredTextChecker
         elif self.language is Language.GO:
             checker_class = GOChecker
+        elif self.language is Language.SQL:
+            checker_class = SQLChecker
         elif self.language is Language.LOG:
             # Log files are not source, but they are often in source code
             # trees.
@@ -430,14 +555,18 @@ class AnyTextMixin:
         """Check that file does not contains Windows newlines."""
         if self.text.find('\r\n') != -1:
             self.message(
-                0, 'File contains Windows new lines.', icon='info')
+                0, 'File contains Windows new lines.', icon='info',
+                rule='windows-newlines')
 
-    def check_empty_last_line(self, total_lines):
+    def check_empty_last_line(self, total_lines, text=None):
         """Check the files ends with an one empty line.
 
-        This will avoid merge conflicts.
+        This will avoid merge conflicts. The end of the text can be passed
+        when the file is checked as a stream.
         """
-        if self.text[-1] != '\n' or self.text[-2:] == '\n\n':
+        if text is None:
+            text = self.text
+        if text[-1] != '\n' or text[-2:] == '\n\n':
             self.message(
                 total_lines,
                 'File does not ends with an empty line.',
@@ -465,6 +594,11 @@ class AnyTextChecker(BaseChecker, AnyTextMixin):
     """Verify the text of the document."""
 
     def check(self):
+        """Check the lines and the newlines."""
+        self.check_text()
+        self.check_windows_endlines()
+
+    def check_text(self):
         """Call each line_method for each line in text."""
         for line_no, line in enumerate(self.text.splitlines()):
             line_no += 1
@@ -473,92 +607,125 @@ class AnyTextChecker(BaseChecker, AnyTextMixin):
             self.check_conflicts(line_no, line)
             self.check_regex_line(line_no, line)
 
-        self.check_windows_endlines()
-
 
 class SQLChecker(BaseChecker, AnyTextMixin):
-    """Verify SQL style."""
+    """Verify SQL style.
+
+    The lines are scanned for string literals, quoted identifiers and
+    comments, so the text inside literals is not checked. Large files are
+    checked as they are read.
+    """
 
     def check(self):
         """Call each line_method for each line in text."""
         # Consider http://code.google.com/p/python-sqlparse/ to verify
         # keywords and reformatting.
+        if self.text is None:
+            self.check_stream()
+            return
+        scanner = self.get_scanner()
         for line_no, line in enumerate(self.text.splitlines()):
             line_no += 1
-            self.check_trailing_whitespace(line_no, line)
-            self.check_tab(line_no, line)
-            self.check_conflicts(line_no, line)
-            self.check_regex_line(line_no, line)
-
+            self.check_line(line_no, line, scanner.scan_line(line))
+        self.report_problems(scanner.close())
         self.check_windows_endlines()
 
+    def check_stream(self):
+        """Check the file as it is read; the text is not kept in memory."""
+        scanner = self.get_scanner()
+        has_windows_newlines = False
+        for line_no, line in iter_stream(self.file_path, lambda chunk: None):
+            if line.endswith(b'\r'):
+                has_windows_newlines = True
+                line = line[:-1]
+            line = u(line)
+            self.check_line(line_no, line, scanner.scan_line(line))
+        self.report_problems(scanner.close())
+        if has_windows_newlines:
+            self.message(
+                0, 'File contains Windows new lines.', icon='info',
+                rule='windows-newlines')
+
+    def get_scanner(self):
+        """Return the scanner of the literals and comments."""
+        return SQLScanner(self.options.sql['dialect'])
 
-class FastTreeBuilder(ElementTree.TreeBuilder):
+    def check_line(self, line_no, line, code):
+        """Check the line; code is the line with its literals masked."""
+        self.check_trailing_whitespace(line_no, code)
+        self.check_tab(line_no, code)
+        self.check_conflicts(line_no, code)
+        self.check_regex_line(line_no, line)
 
-    def _flush(self):
-        if self._data:
-            if self._last is not None:
-                # Ensure all text is ascii; the data is never written back.
-                text = ''.join([b for b in str(self._data) if ord(b) < 128])
-                if self._tail:
-                    assert self._last.tail is None, "internal error (tail)"
-                    self._last.tail = text
-                else:
-                    assert self._last.text is None, "internal error (text)"
-                    self._last.text = text
-            self._data = []
+    def report_problems(self, problems):
+        for line_no, column, message in problems:
+            self.message(line_no, message, icon='error', column=column)
+
+
+class ValidatingParser(object):
+    """A parser that only checks well-formedness; it builds no tree.
 
+    The document is fed as bytes, in chunks of any size. Expat is told to
+    expect a DTD that is not read, so the entities that are not declared
+    are passed to the entity handler, which knows the HTML entities. Spaces
+    before the document are ignored.
 
-class FastParser(object):
-    """A simple and pure-python parser that checks well-formedness.
+    :param encoding: The encoding of the bytes; it overrides the encoding
+        declaration of the document when it is not None.
+    """
 
-     This parser works in py 2 and 3. It handles entities and ignores
-     namespaces. This parser works with python ElementTree.
-     """
+    leading_space_pattern = re.compile(b'(?:[ \t]|\xc2\xa0|\xef\xbb\xbf)*')
 
-    def __init__(self, html=0, target=None, encoding=None):
+    def __init__(self, encoding=None):
         parser = expat.ParserCreate(encoding, None)
-        target = FastTreeBuilder()
         self.parser = parser
-        self.target = target
         self._error = expat.error
-        self._names = {}  # Name memo cache
+        self._started = False
+        # The number of leading space characters that were not fed to expat.
+        self.column_offset = 0
+        parser.UseForeignDTD(True)
         parser.DefaultHandlerExpand = self._default
-        parser.StartElementHandler = target.start
-        parser.EndElementHandler = target.end
-        parser.CharacterDataHandler = target.data
-        parser.buffer_text = 1
-        # Py3, but not Py2.
-        # parser.ordered_attributes = 1
-        # parser.specified_attributes = 1
-        self._doctype = None
+        parser.SkippedEntityHandler = self._skipped
         self.entity = dict(entitydefs)
-        self.version = "Expat %d.%d.%d" % expat.version_info
 
     def _default(self, text):
         prefix = text[:1]
         if prefix == "&":
             # Deal with undefined entities.
-            data_handler = self.target.data
-            try:
-                data_handler(self.entity[text[1:-1]])
-            except KeyError:
-                err = expat.error(
-                    "undefined entity %s: line %d, column %d" %
-                    (text, self.parser.ErrorLineNumber,
-                     self.parser.ErrorColumnNumber))
-                err.code = 11  # XML_ERROR_UNDEFINED_ENTITY
-                err.lineno = self.parser.ErrorLineNumber
-                err.offset = self.parser.ErrorColumnNumber
-                raise err
+            self._entity(text[1:-1])
+
+    def _skipped(self, name, is_parameter_entity):
+        self._entity(name)
+
+    def _entity(self, name):
+        """Raise an error if the entity is not an HTML entity."""
+        if name in self.entity:
+            return
+        err = expat.error(
+            "undefined entity &%s;: line %d, column %d" %
+            (name, self.parser.ErrorLineNumber,
+             self.parser.ErrorColumnNumber))
+        err.code = 11  # XML_ERROR_UNDEFINED_ENTITY
+        err.lineno = self.parser.ErrorLineNumber
+        err.offset = self.parser.ErrorColumnNumber
+        raise err
 
     def _raiseerror(self, value):
         err = ParseError(value)
         err.code = value.code
-        err.position = value.lineno, value.offset
+        offset = value.offset
+        if value.lineno == 1:
+            offset += self.column_offset
+        err.position = value.lineno, offset
         raise err
 
     def feed(self, data):
+        if not self._started and data:
+            self._started = True
+            end = self.leading_space_pattern.match(data).end()
+            if end:
+                self.column_offset = len(data[:end].decode('utf-8'))
+                data = memoryview(data)[end:] if IS_PY3 else data[end:]
         try:
             self.parser.Parse(data, 0)
         except self._error as v:
@@ -566,95 +733,185 @@ class FastParser(object):
 
     def close(self):
         try:
-            self.parser.Parse('', 1)   # End of data.
+            self.parser.Parse(b'', 1)   # End of data.
         except self._error as v:
             self._raiseerror(v)
-        self.target.close()
 
 
 class XMLChecker(BaseChecker, AnyTextMixin):
     """Check XML documents."""
 
-    xml_decl_pattern = re.compile(r'<\?xml .*?\?>')
-    xhtml_doctype = (
-        '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" '
-        '"http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">')
     non_ns_types = (Language.ZPT, Language.ZCML)
 
     def check(self):
         """Check the syntax of the python code."""
-        # Reconcile the text and Expat checker text requriements.
+        if self.text is None:
+            self.check_stream()
+            return
         if self.text == '':
             return
-        parser = FastParser()
-        offset = 0
-        # The expat parser seems to be assuming ascii even when
-        # XMLParser(encoding='utf-8') is used above.
-        text = self.text.encode('utf-8').decode('ascii', 'ignore')
-        if text.find('<!DOCTYPE') == -1:
-            # Expat requires a doctype to honour parser.entity.
-            offset = 1
-            match = self.xml_decl_pattern.search(text)
-            if match is None:
-                text = self.xhtml_doctype + '\n' + text
-            else:
-                start, end = match.span(0)
-                text = text[:start] + self.xhtml_doctype + '\n' + text[end:]
-        elif text.find('<!DOCTYPE html>') != -1:
-            text = text.replace('<!DOCTYPE html>', self.xhtml_doctype)
+        # The text was decoded, so its encoding declaration is moot.
+        parser = ValidatingParser('utf-8')
         try:
-            ElementTree.parse(StringIO(text), parser)
+            parser.feed(self.text.encode('utf-8'))
+            parser.close()
         except (expat.ExpatError, ParseError) as error:
-            if hasattr(error, 'code'):
-                error_message = expat.ErrorString(error.code)
-                if hasattr(error, 'position') and error.position:
-                    error_lineno, error_charno = error.position
-                    error_lineno = error_lineno - offset
-                elif error.lineno:
-                    # Python 2.6-
-                    error_lineno = error.lineno - offset
-                else:
-                    error_lineno = 0
-            else:
-                error_message, location = str(error).rsplit(':')
-                error_lineno = int(location.split(',')[0].split()[1]) - offset
-            self.message(error_lineno, error_message, icon='error')
+            self.report_parse_error(error)
         self.check_text()
         self.check_windows_endlines()
 
+    def report_parse_error(self, error):
+        """Report the expat error."""
+        error_charno = 0
+        if hasattr(error, 'code'):
+            error_message = expat.ErrorString(error.code)
+            if hasattr(error, 'position') and error.position:
+                error_lineno, error_charno = error.position
+                error_charno += 1
+            elif error.lineno:
+                # Python 2.6-
+                error_lineno = error.lineno
+            else:
+                error_lineno = 0
+        else:
+            error_message, location = str(error).rsplit(':')
+            error_lineno = int(location.split(',')[0].split()[1])
+        self.message(
+            error_lineno, error_message, icon='error', column=error_charno)
+
+    def check_stream(self):
+        """Check the file as it is read; the text is not kept in memory.
+
+        The well-formedness and line checks are done on each chunk.
+        """
+        parser = self.get_stream_parser()
+        self._stream_parser = parser
+        has_windows_newlines = False
+        for line_no, line in iter_stream(self.file_path, self.feed_stream):
+            if line.endswith(b'\r'):
+                has_windows_newlines = True
+                line = line[:-1]
+            self.check_line(line_no, u(line))
+        self.finish_stream(parser)
+        if has_windows_newlines:
+            self.message(
+                0, 'File contains Windows new lines.', icon='info',
+                rule='windows-newlines')
+
+    def get_stream_parser(self):
+        """Return the parser that is fed the bytes of the file."""
+        return ValidatingParser()
+
+    def feed_stream(self, chunk):
+        """Feed the chunk to the parser; it is closed by an empty chunk."""
+        if self._stream_parser is None:
+            return
+        try:
+            if chunk:
+                self._stream_parser.feed(chunk)
+            else:
+                self._stream_parser.close()
+        except (expat.ExpatError, ParseError) as error:
+            self.report_parse_error(error)
+            self._stream_parser = None
+
+    def finish_stream(self, parser):
+        """Report the problems that the parser collected; expat raises."""
+
     def check_text(self):
         for line_no, line in enumerate(self.text.splitlines()):
             line_no += 1
-            self.check_trailing_whitespace(line_no, line)
-            self.check_conflicts(line_no, line)
-            self.check_regex_line(line_no, line)
+            self.check_line(line_no, line)
+
+    def check_line(self, line_no, line):
+        self.check_trailing_whitespace(line_no, line)
+        self.check_conflicts(line_no, line)
+        self.check_regex_line(line_no, line)
+
+
+class HTML5Checker(XMLChecker):
+    """Check HTML5 documents with a streaming tokenizer.
+
+    HTML5 is not XML; void elements and omitted end tags are valid. The
+    document is scanned in one pass without building a tree.
+    """
+
+    doctype_pattern = re.compile(
+        r'^(?:\s|\ufeff|<!--.*?-->)*<!DOCTYPE\s+html'
+        r'(?:\s+SYSTEM\s+["\']about:legacy-compat["\'])?\s*>',
+        re.IGNORECASE | re.DOTALL)
+
+    @classmethod
+    def declares_html5(cls, file_path, text):
+        """Return True when the document has the HTML5 doctype.
+
+        The start of the file is read when the text is None.
+        """
+        if text is None:
+            with open(file_path, 'rb') as file_:
+                text = u(file_.read(1024))
+        return cls.doctype_pattern.match(text) is not None
+
+    def check(self):
+        """Check the syntax of the HTML5 document."""
+        if self.text is None:
+            self.check_stream()
+            return
+        if self.text == '':
+            return
+        scanner = HTML5Scanner()
+        scanner.feed(self.text)
+        self.report_problems(scanner.close())
+        self.check_text()
+        self.check_windows_endlines()
+
+    def get_stream_parser(self):
+        """Return the scanner that is fed the bytes of the file."""
+        return HTML5Scanner()
+
+    def finish_stream(self, parser):
+        """Report the problems that the scanner found."""
+        self.report_problems(parser.problems)
+
+    def report_problems(self, problems):
+        for line_no, column, message in problems:
+            self.message(line_no, message, icon='error', column=column)
 
 
 class CSSChecker(BaseChecker, AnyTextMixin):
     """Check XML documents."""
 
-    message_pattern = re.compile(
-        r'[^ ]+ (?P<issue>.*) \[(?P<lineno>\d+):\d+: (?P<text>.+)\]')
-
     def check(self):
         """Check the syntax of the CSS code."""
         if self.text == '':
             return
 
-        self.check_cssutils()
+        # The text is tokenized once for the syntax and convention checks.
+        tokens = tokenize_css(self.text)
+        if self.options.css.get('engine') == 'cssutils':
+            self.check_cssutils()
+        else:
+            self.check_syntax(tokens)
         self.check_text()
         self.check_windows_endlines()
         # CSS coding conventoins checks should go last since they rely
         # on previous checks.
-        self.check_css_coding_conventions()
+        self.check_css_coding_conventions(tokens)
+
+    def check_syntax(self, tokens=None):
+        """Check the CSS syntax with the fast scanner."""
+        problems = CSSScanner(self.text, tokens=tokens).scan()
+        for line_no, column, message in problems:
+            self.message(
+                line_no, message, icon='error', column=column,
+                rule='cssscan')
 
     def check_cssutils(self):
         """Check the CSS code by parsing it using CSSUtils module."""
         if not HAS_CSSUTILS:
             return
-        with css_report_handler(self, 'pocket-lint') as log:
-            parser = cssutils.CSSParser(
-                log=log, loglevel=logging.INFO, raiseExceptions=False)
+        with css_report_handler(self, cssutils.log):
+            parser = cssutils.CSSParser(raiseExceptions=False)
             parser.parseString(self.text)
 
     def check_text(self):
@@ -667,9 +924,10 @@ class CSSChecker(BaseChecker, AnyTextMixin):
             self.check_regex_line(line_no, line)
             self.check_tab(line_no, line)
 
-    def check_css_coding_conventions(self):
+    def check_css_coding_conventions(self, tokens=None):
         """Check the input using CSS Coding Convention checker."""
-        CSSCodingConventionChecker(self.text, logger=self.message).check()
+        CSSCodingConventionChecker(
+            self.text, logger=self.message, tokens=tokens).check()
 
 
 class PEP8Report(pep8.StandardReport):
@@ -679,7 +937,9 @@ class PEP8Report(pep8.StandardReport):
         self.message = message_function
 
     def error(self, line_no, offset, message, check):
-        self.message(line_no, message, icon='info')
+        self.message(
+            line_no, message, icon='info', column=offset + 1,
+            rule=message[:4])
 
 
 class PythonChecker(BaseChecker, AnyTextMixin):
@@ -694,6 +954,7 @@ class PythonChecker(BaseChecker, AnyTextMixin):
         super(PythonChecker, self).__init__(
             file_path, text, reporter, options)
         self.encoding = 'ascii'
+        self.tree = None
 
     def check(self):
         """Check the syntax of the python code."""
@@ -701,12 +962,18 @@ class PythonChecker(BaseChecker, AnyTextMixin):
             return
         self.check_text()
         self.check_flakes()
-        self.check_pep8()
+        self.check_doctests()
+        self.check_symbols()
+        if isinstance(self.text, type('')):
+            self.check_pep8(lines=self.text.splitlines(True))
+        else:
+            self.check_pep8()
         self.check_pep257()
         self.check_windows_endlines()
 
     def check_flakes(self):
         """Check compilation and syntax."""
+        self.tree = None
         try:
             tree = compile(
                 self.text.encode(self.encoding),
@@ -721,20 +988,62 @@ class PythonChecker(BaseChecker, AnyTextMixin):
             message = '%s: %s' % (explanation, line.strip())
             self.message(line_no, message, icon='error')
         else:
-            warnings = PocketLintPyFlakesChecker(
-                tree, file_path=self.file_path, text=self.text)
-            for warning in warnings.messages:
-                dummy, line_no, message = str(warning).split(':')
-                self.message(int(line_no), message.strip(), icon='error')
-
-    def check_pep8(self):
-        """Check style."""
+            self.tree = tree
+            self.check_flakes_tree(tree)
+
+    def check_flakes_tree(self, tree, known_names=()):
+        """Report the pyflakes warnings for the tree.
+
+        :param known_names: Names defined outside of the tree; they are
+            not reported as undefined.
+        """
+        warnings = PocketLintPyFlakesChecker(
+            tree, file_path=self.file_path, text=self.text)
+        for warning in warnings.messages:
+            rule = warning.__class__.__name__
+            if (rule == 'UndefinedName' and
+                    warning.message_args[0] in known_names):
+                continue
+            self.message(
+                warning.lineno, warning.message % warning.message_args,
+                icon='error', column=getattr(warning, 'col', -1) + 1,
+                rule=rule)
+
+    def check_doctests(self):
+        """Check the doctests in the docstrings.
+
+        The docstrings are taken from the tree made by check_flakes.
+        """
+        if self.tree is None:
+            return
+        check_docstrings(
+            self.file_path, self.tree, self._reporter, self.options)
+
+    def check_symbols(self):
+        """Check the names shared with other modules.
+
+        The module is updated in the symbol index from the tree made by
+        check_flakes, then checked against the modules it imports.
+        """
+        symbol_index = self.options.symbol_index
+        if symbol_index is None or self.tree is None:
+            return
+        module_name = symbol_index.update(self.file_path, self.tree)
+        for line_no, message in symbol_index.check_module(module_name):
+            self.message(line_no, message, icon='error', rule='symbols')
+
+    def check_pep8(self, lines=None):
+        """Check style.
+
+        :param lines: The lines to check; the file is read when None.
+        """
         style_options = pep8.StyleGuide(**self.options.pep8)
         options = style_options.options
         pep8_report = PEP8Report(options, self.message)
         try:
             pep8_checker = pep8.Checker(
-                self.file_path, options=options, report=pep8_report)
+                self.file_path, lines=lines, options=options,
+                report=pep8_report)
             pep8_checker.check_all()
         except TokenError as er:
             message, location = er.args
@@ -760,7 +1069,9 @@ class PythonChecker(BaseChecker, AnyTextMixin):
             error_message = error.explanation.splitlines()[0]
             if error_message in ignore_list:
                 continue
-            self.message(error.line, error_message, icon='error')
+            self.message(
+                error.line, error_message, icon='error',
+                rule=getattr(error, 'code', None))
 
     def check_text(self):
         """Call each line_method for each line in text."""
@@ -803,6 +1114,34 @@ class PythonChecker(BaseChecker, AnyTextMixin):
                 icon='error')
 
 
+_jslint_pools = {}
+_jslint_pools_lock = threading.Lock()
+
+
+def get_jslint_pool(command, size=None, timeout=None):
+    """Return the shared JSLintWorkerPool that runs command.
+
+    The workers are stopped when Python exits.
+    """
+    key = (tuple(command), size, timeout)
+    with _jslint_pools_lock:
+        pool = _jslint_pools.get(key)
+        if pool is None:
+            if not _jslint_pools:
+                atexit.register(close_jslint_pools)
+            pool = _jslint_pools[key] = JSLintWorkerPool(
+                command, size, timeout)
+    return pool
+
+
+def close_jslint_pools():
+    """Stop the workers of all the shared pools."""
+    with _jslint_pools_lock:
+        for pool in _jslint_pools.values():
+            pool.close()
+        _jslint_pools.clear()
+
+
 class JavascriptChecker(BaseChecker, AnyTextMixin):
     """Check JavaScript source code."""
 
@@ -811,27 +1150,105 @@ class JavascriptChecker(BaseChecker, AnyTextMixin):
     JSREPORTER = os.path.join(HERE, 'jsreporter.js')
 
     def check(self):
-        """Check the syntax of the JavaScript code."""
-        self.check_jslint()
-        self.check_closure_linter()
-        self.check_text()
-        self.check_windows_endlines()
+        """Check the syntax of the JavaScript code.
+
+        jslint runs while the in-process checks are done; its messages are
+        still reported first.
+        """
+        jslint = self.start_jslint()
+        reporter = self._reporter
+        self.set_reporter(Reporter(Reporter.COLLECTOR))
+        try:
+            self.check_closure_linter()
+            self.check_text()
+            self.check_windows_endlines()
+            diagnostics = self._reporter.diagnostics
+        finally:
+            self.set_reporter(reporter)
+        self.report_jslint(jslint)
+        for diagnostic in diagnostics:
+            self.report(diagnostic)
 
     def check_jslint(self):
         """Check file using jslint."""
-        if JS is None or self.text == '' or not self.options.jslint['enabled']:
+        self.report_jslint(self.start_jslint())
+
+    def start_jslint(self):
+        """Start jslint; return the ToolCall for its issues, or None.
+
+        When there is no JS interpreter, the scanner's errors are reported
+        instead. When the prescan option is set, jslint is not run for a
+        script that the scanner finds is only whitespace and comments; the
+        scanner's errors may be wrong, so they never stop jslint.
+        """
+        if self.text == '' or not self.options.jslint['enabled']:
+            return None
+        if JS is None:
+            self.check_scan()
+            return None
+        if self.options.jslint.get('prescan'):
+            scanner = JavaScriptScanner(self._get_content())
+            if not scanner.scan() and not scanner.has_code:
+                return None
+        if self.options.jslint.get('worker'):
+            return ToolCall(self._lint_with_worker)
+        return ToolCall(self._lint_with_process)
+
+    def check_scan(self):
+        """Check the script with the JavaScriptScanner.
+
+        Return True when the script has code and no errors were found.
+        """
+        scanner = JavaScriptScanner(self._get_content())
+        for line_no, column, message in scanner.scan():
+            self.message(
+                line_no, message, icon='error', column=column, rule='jsscan')
+        return scanner.has_code and not scanner.problems
+
+    def report_jslint(self, jslint):
+        """Report the issues of the jslint ToolCall."""
+        if jslint is None:
             return
-        args = [JS, self.JSREPORTER, self.FULLJSLINT, self.file_path]
-        jslint = subprocess.Popen(
-            args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        issues, errors = jslint.communicate()
+        for issue in jslint.result():
+            self.message(
+                issue['line'] - 1, issue['reason'], icon='error',
+                column=issue['character'], rule='jslint')
+
+    @staticmethod
+    def _fatal_issue(reason):
+        return [{'line': 0, 'character': 0, 'reason': reason}]
+
+    def _lint_with_process(self):
+        """Return the jslint issues from a new interpreter."""
+        args = [JS, self.JSREPORTER, self.FULLJSLINT, '-']
+        try:
+            returncode, issues, errors = get_process_pool().run(
+                args, self._get_content().encode('utf-8'),
+                self.options.jslint.get('timeout'))
+        except ToolError as error:
+            return self._fatal_issue('JSLINT failed: %s' % error)
         issues = issues.strip().decode('utf-8')
-        if issues:
-            for issue in issues.splitlines():
-                line_no, char_no_, message = issue.split('::')
-                line_no = int(line_no)
-                line_no -= 1
-                self.message(line_no, message, icon='error')
+        if returncode != 0 and not issues:
+            return self._fatal_issue(
+                'JSLINT failed: %s' % errors.strip().decode('utf-8'))
+        return [json.loads(issue) for issue in issues.splitlines()]
+
+    def _get_content(self):
+        """Return the text to lint as unicode."""
+        if isinstance(self.text, bytes):
+            return self.text.decode('utf-8', 'replace')
+        return self.text
+
+    def _lint_with_worker(self):
+        """Return the jslint issues from a persistent interpreter."""
+        pool = get_jslint_pool(
+            [JS, self.JSREPORTER, self.FULLJSLINT, '--worker'],
+            self.options.jslint.get('workers'),
+            self.options.jslint.get('timeout'))
+        try:
+            return pool.lint(self._get_content())
+        except WorkerError as error:
+            return self._fatal_issue('JSLINT worker failed: %s' % error)
 
     def check_closure_linter(self):
         """Check file using Google Closure Linter."""
@@ -841,15 +1258,21 @@ class JavascriptChecker(BaseChecker, AnyTextMixin):
         from closure_linter import runner
         from closure_linter.common import erroraccumulator
 
+        # The runner lints one file per call; the text is already read.
         error_handler = erroraccumulator.ErrorAccumulator()
-        runner.Run(self.file_path, error_handler)
+        runner.Run(
+            self.file_path, error_handler,
+            source=StringIO(self._get_content()))
         for error in error_handler.GetErrors():
             if error.code in self.options.closure_linter['ignore']:
                 continue
             # Use a similar format as default Google Closure Linter formatter.
             # Line 12, E:0010: Missing semicolon at end of line
             message = 'E:%04d: %s' % (error.code, error.message)
-            self.message(error.token.line_number, message, icon='error')
+            self.message(
+                error.token.line_number, message, icon='error',
+                column=getattr(error.token, 'start_index', -1) + 1,
+                rule='E:%04d' % error.code)
 
     def check_debugger(self, line_no, line):
         """Check the length of the line."""
@@ -875,42 +1298,92 @@ class JSONChecker(BaseChecker, AnyTextMixin):
 
     def check(self):
         """Check JSON file using basic text checks and custom checks."""
+        if self.text is None:
+            self.check_stream()
+            return
         if not self.text:
             return
 
         # Line independent checks.
         for line_no, line in enumerate(self.text.splitlines()):
             line_no += 1
-            self.check_trailing_whitespace(line_no, line)
-            self.check_conflicts(line_no, line)
-            self.check_regex_line(line_no, line)
-            self.check_tab(line_no, line)
+            self.check_line(line_no, line)
         last_lineno = line_no
         self.check_load()
         self.check_empty_last_line(last_lineno)
 
+    def check_stream(self):
+        """Check the file as it is read; the text is not kept in memory."""
+        parser = self.get_stream_parser()
+        ending = [b'']
+
+        def feed(chunk):
+            parser.feed(chunk)
+            ending[0] = (ending[0] + chunk)[-2:]
+
+        line_no = 0
+        try:
+            for line_no, line in iter_stream(self.file_path, feed):
+                if line.endswith(b'\r'):
+                    line = line[:-1]
+                self.check_line(line_no, u(line))
+            problems = parser.close()
+        finally:
+            self.stop_stream_parser(parser)
+        if line_no == 0:
+            return
+        self.report_problems(problems)
+        self.check_empty_last_line(line_no, u(ending[0]))
+
+    def get_stream_parser(self):
+        """Return the scanner that is fed the bytes of the file."""
+        return JSONScanner()
+
+    def stop_stream_parser(self, parser):
+        """Release what the parser holds; the check may have failed."""
+        return
+
+    def check_line(self, line_no, line):
+        self.check_trailing_whitespace(line_no, line)
+        self.check_conflicts(line_no, line)
+        self.check_regex_line(line_no, line)
+        self.check_tab(line_no, line)
+
     def check_length(self, line_no, line):
         """JSON files can have long lines."""
         return
 
     def check_load(self):
-        """Check that JSON can be deserialized/loaded."""
-        if not HAS_JSON:
-            return
-        try:
-            json.loads(self.text)
-        except ValueError as error:
-            line_number = 0
-            message = str(error)
-            match = re.search(r"(.*): line (\d+)", message)
-            if match:
-                try:
-                    line_number = int(match.group(2))
-                except:
-                    # If we can not find the line number,
-                    # just fall back to default.
-                    line_number = 0
-            self.message(line_number, message, icon='error')
+        """Check that JSON can be deserialized/loaded.
+
+        The JSON is scanned; no values are built.
+        """
+        scanner = JSONScanner()
+        scanner.feed(self.text)
+        self.report_problems(scanner.close())
+
+    def report_problems(self, problems):
+        for line_no, column, message in problems:
+            self.message(line_no, message, icon='error', column=column)
+
+
+class JSONLinesChecker(JSONChecker):
+    """Check JSON Lines files; each line is a JSON record."""
+
+    def check_load(self):
+        """Check that each record can be loaded."""
+        self.report_problems(check_records(self.text.encode('utf-8')))
+
+    def get_stream_parser(self):
+        """Return the validator that is fed the bytes of the file.
+
+        The records are validated in parallel by worker processes.
+        """
+        return JSONLinesValidator(self.options.jsonl['workers'])
+
+    def stop_stream_parser(self, parser):
+        """Stop the worker processes of the validator."""
+        parser.terminate()
 
 
 class ReStructuredTextChecker(BaseChecker, AnyTextMixin):
@@ -920,10 +1393,45 @@ class ReStructuredTextChecker(BaseChecker, AnyTextMixin):
     delimiter_characters = [
         '=', '-', '`', ':', '\'', '"', '~', '^', '_', '*', '+', '#', '<', '>']
 
+    # The kinds of lines; a line can be a delimiter and a transition.
+    BLANK = 1
+    DELIMITER = 2
+    TRANSITION = 4
+    ANCHOR = 8
+    TABLE_HEADER = 16
+
     def __init__(self, file_path, text, reporter=None, options=None):
         super(ReStructuredTextChecker, self).__init__(
             file_path, text, reporter, options)
         self.lines = self.text.splitlines()
+        self.kinds = self.classify_lines(self.lines)
+
+    @classmethod
+    def classify_lines(cls, lines):
+        """Return the list of the kinds of each line.
+
+        The section and transition rules look at the lines around each
+        marker; they look up the kinds instead of inspecting the text again.
+        """
+        delimiters = frozenset(cls.delimiter_characters)
+        kinds = []
+        for line in lines:
+            if not line:
+                kinds.append(cls.BLANK)
+                continue
+            kind = 0
+            first = line[0]
+            if first in delimiters and line[1:3] == first * 2:
+                if ' ' in line:
+                    kind = cls.TABLE_HEADER
+                else:
+                    kind = cls.DELIMITER
+                if line[3:4] == first:
+                    kind |= cls.TRANSITION
+            elif line.startswith('.. _'):
+                kind = cls.ANCHOR
+            kinds.append(kind)
+        return kinds
 
     def check(self):
         """Check the syntax of the reStructuredText code."""
@@ -936,6 +1444,8 @@ class ReStructuredTextChecker(BaseChecker, AnyTextMixin):
 
     def check_lines(self):
         """Call each line checker for each line in text."""
+        kinds = self.kinds
+        markers = self.DELIMITER | self.TRANSITION
         for line_no, line in enumerate(self.lines):
             line_no += 1
             self.check_length(line_no, line)
@@ -944,68 +1454,50 @@ class ReStructuredTextChecker(BaseChecker, AnyTextMixin):
             self.check_conflicts(line_no, line)
             self.check_regex_line(line_no, line)
 
+            if not kinds[line_no - 1] & markers:
+                continue
             if self.isTransition(line_no - 1):
                 self.check_transition(line_no - 1)
             elif self.isSectionDelimiter(line_no - 1):
                 self.check_section_delimiter(line_no - 1)
-            else:
-                pass
+
+    def _isBlank(self, line_number):
+        """Return True if the line exists and is empty."""
+        return (
+            0 <= line_number < len(self.kinds) and
+            self.kinds[line_number] == self.BLANK)
 
     def isTransition(self, line_number):
         '''Return True if the current line is a line transition.'''
-        line = self.lines[line_number]
-        if len(line) < 4:
-            return False
-
         if len(self.lines) < 3:
             return False
 
-        succesive_characters = (
-            line[0] == line[1] == line[2] == line[3] and
-            line[0] in self.delimiter_characters)
-
-        if not succesive_characters:
-            return False
-
-        emply_lines_bounded = (
-            self.lines[line_number - 1] == '' and
-            self.lines[line_number + 1] == '')
-
-        if not emply_lines_bounded:
+        if not self.kinds[line_number] & self.TRANSITION:
             return False
 
-        return True
+        return (
+            self._isBlank(line_number - 1) and self._isBlank(line_number + 1))
 
     def check_transition(self, line_number):
         '''Transitions should be delimited by a single emtpy line.'''
-        if (self.lines[line_number - 2] == '' or
-                self.lines[line_number + 2] == ''):
+        if self._isBlank(line_number - 2) or self._isBlank(line_number + 2):
             self.message(
                 line_number + 1,
                 'Transition markers should be bounded by single empty lines.',
                 icon='info')
 
     def isSectionDelimiter(self, line_number):
-        '''Return true if the line is a section delimiter.'''
+        '''Return true if the line is a section delimiter.
+
+        A line of delimiters with a space is a table header.
+        '''
         if len(self.lines) < 3:
             return False
 
         if line_number >= len(self.lines):
             return False
 
-        line = self.lines[line_number]
-        if len(line) < 3:
-            return False
-
-        if (line[0] == line[1] == line[2] and line[0] in
-                self.delimiter_characters):
-            if ' ' in line:
-                # We have a table header.
-                return False
-            else:
-                return True
-
-        return False
+        return bool(self.kinds[line_number] & self.DELIMITER)
 
     def check_section_delimiter(self, line_number):
         """Checks for section delimiter.
@@ -1069,8 +1561,10 @@ class ReStructuredTextChecker(BaseChecker, AnyTextMixin):
             top_marker = top_marker - 2
 
         # Check underline length for bottom marker,
-        # since top marker can be the same as text line.
-        if len(self.lines[bottom_marker]) != len(self.lines[text_line]):
+        # since top marker can be the same as text line. A marker on the
+        # first line has no text line.
+        if (text_line >= 0 and
+                len(self.lines[bottom_marker]) != len(self.lines[text_line])):
             self.message(
                 human_line_number,
                 'Section marker has wrong length.',
@@ -1092,15 +1586,12 @@ class ReStructuredTextChecker(BaseChecker, AnyTextMixin):
         if (top_marker - 2) < 0:
             return False
 
-        if self.lines[top_marker - 2].startswith('.. _'):
-            return True
-
-        return False
+        return bool(self.kinds[top_marker - 2] & self.ANCHOR)
 
     def _haveGoodSpacingBeforeSection(self, top_marker):
         '''Return True if we have good spacing before the section.'''
         if top_marker > 0:
-            if self.lines[top_marker - 1] != '':
+            if not self._isBlank(top_marker - 1):
                 return False
 
         # If we are on the second line, there is no space for 2 empty lines
@@ -1109,33 +1600,30 @@ class ReStructuredTextChecker(BaseChecker, AnyTextMixin):
             return False
 
         if top_marker > 1:
-            if self.lines[top_marker - 2] != '':
+            if not self._isBlank(top_marker - 2):
                 return False
 
         if top_marker > 2:
-            if self.lines[top_marker - 3] == '':
+            if self._isBlank(top_marker - 3):
                 return False
 
         return True
 
     def _haveGoodSpacingAfterSection(self, bottom_marker):
         '''Return True if we have good spacing after the section.'''
-        lines_count = len(self.lines)
-
-        if bottom_marker < lines_count - 1:
-            if self.lines[bottom_marker + 1] != '':
+        if not self._isBlank(bottom_marker + 1):
+            if bottom_marker + 1 < len(self.lines):
                 return False
 
-        if bottom_marker < lines_count - 2:
-            if self.lines[bottom_marker + 2] == '':
-                # If the section is followed by 2 empty spaces and then
-                # followed by a section delimiter, the section delimiter
-                # rules will take priority
-                if self.isSectionDelimiter(bottom_marker + 3):
-                    return True
-                if self.isSectionDelimiter(bottom_marker + 4):
-                    return True
-                return False
+        if self._isBlank(bottom_marker + 2):
+            # If the section is followed by 2 empty spaces and then
+            # followed by a section delimiter, the section delimiter
+            # rules will take priority
+            if self.isSectionDelimiter(bottom_marker + 3):
+                return True
+            if self.isSectionDelimiter(bottom_marker + 4):
+                return True
+            return False
 
         return True
 
@@ -1155,9 +1643,24 @@ class GOChecker(BaseChecker, AnyTextMixin):
         """Check the syntax code."""
         if self.text == '':
             return
-        # need to call out to go to get the report.
+        self.check_go_tools()
         self.check_text()
 
+    def check_go_tools(self):
+        """Check the file with gofmt and optionally go vet.
+
+        The checks are skipped when the go tools are not installed.
+        """
+        if not self.options.gofmt['enabled']:
+            return
+        report = self.options.go_tool_report
+        if report is None or self.file_path not in report:
+            report = run_go_tools(
+                [(self.file_path, self.text)], self.options.gofmt)
+        for line_no, column, rule, icon, message in report.get_problems(
+                self.file_path):
+            self.message(line_no, message, icon=icon, column=column, rule=rule)
+
     def check_text(self):
         """Call each line_method for each line in text."""
         for line_no, line in enumerate(self.text.splitlines()):
@@ -1190,8 +1693,43 @@ def get_option_parser():
     parser.add_option(
         "-m", "--max-length", dest="max_line_length", type="int",
         help="Set the max line length (default %s)" % DEFAULT_MAX_LENGTH)
+    parser.add_option(
+        "-s", "--symbol-index", dest="symbol_index_path",
+        help="Check Python names across modules using the index at this "
+             "path; it is created or updated as needed.")
+    parser.add_option(
+        "-c", "--closure-linter", dest="closure_linter", action="store_true",
+        help="Check JavaScript with Google Closure Linter.")
+    parser.add_option(
+        "--gofmt", dest="gofmt_command", metavar="COMMAND",
+        help="The gofmt command to check Go files with (default gofmt).")
+    parser.add_option(
+        "--go-vet", dest="go_vet", action="store_true",
+        help="Also check Go files with go vet.")
+    parser.add_option(
+        "--css-engine", dest="css_engine", choices=CSS_ENGINES,
+        help="Check CSS syntax with the 'fast' scanner or with 'cssutils' "
+             "(default fast).")
+    parser.add_option(
+        "--sql-dialect", dest="sql_dialect", choices=SQL_DIALECTS,
+        help="Read SQL literals as 'standard' or 'mysql' SQL "
+             "(default standard).")
+    parser.add_option(
+        "--output-format", dest="output_format", choices=OUTPUT_FORMATS,
+        help="Write the messages as 'console' text, as 'jsonl' records or "
+             "as a 'sarif' log (default console).")
+    parser.add_option(
+        "-j", "--jobs", dest="jobs", type="int",
+        help="Check this many files at a time in threads.")
     parser.set_defaults(
         verbose=True,
+        closure_linter=False,
+        jobs=1,
+        gofmt_command='gofmt',
+        go_vet=False,
+        css_engine='fast',
+        sql_dialect='standard',
+        output_format='console',
         do_format=False,
         hang_closing=True,
         is_interactive=False,
@@ -1200,26 +1738,149 @@ def get_option_parser():
     return parser
 
 
+def prepare_sources(sources, options):
+    """Return the paths of the sources to check.
+
+    The checks that are batched over many files are run.
+    """
+    symbol_index_path = getattr(options, 'symbol_index_path', None)
+    if symbol_index_path:
+        options.symbol_index = SymbolIndex(symbol_index_path)
+    gofmt = PocketLintOptions(command_options=options).gofmt
+    if gofmt['enabled']:
+        # Check all the go files with one gofmt.
+        options.go_tool_report = run_go_tools(
+            [(os.path.normpath(source), None) for source in sources
+             if not os.path.isdir(source) and
+             Language.get_language(source) is Language.GO], gofmt)
+    return [
+        os.path.normpath(source) for source in sources
+        if not os.path.isdir(source) and Language.is_editable(source)]
+
+
+def iter_stream(file_path, feed):
+    """Yield the numbered lines of the file as it is read in chunks.
+
+    Each chunk of bytes is passed to feed before its lines are yielded;
+    an empty chunk is passed at the end of the file. The lines are bytes
+    that may end with a carriage return.
+    """
+    line_no = 0
+    pending = b''
+    with open(file_path, 'rb') as file_:
+        while True:
+            chunk = file_.read(STREAM_CHUNK_SIZE)
+            feed(chunk)
+            if chunk:
+                lines = (pending + chunk).split(b'\n')
+                pending = lines.pop()
+            else:
+                lines = [pending] if pending else []
+            for line in lines:
+                line_no += 1
+                yield line_no, line
+            if not chunk:
+                break
+
+
+def read_source(file_path):
+    """Return the text of the source file.
+
+    None is returned for large XML, JSON and SQL files; they are checked
+    as a stream.
+    """
+    if (Language.get_language(file_path) in Language.STREAMED and
+            os.path.getsize(file_path) > STREAM_SIZE):
+        return None
+    with open(file_path, 'rt') as file_:
+        return file_.read()
+
+
+def check_source(file_path, text, options, reporter):
+    """Check the text of the source file.
+
+    A doctest that is formatted is checked by its formatter, so the checks
+    see the saved text, and share the parse when the text did not change.
+    """
+    language = Language.get_language(file_path)
+    if language is Language.DOCTEST and options.do_format:
+        formatter = DoctestReviewer(file_path, text, reporter, options)
+        formatter.format_and_save(options.is_interactive)
+        formatter.check()
+        return
+    checker = UniversalChecker(
+        file_path, text, language, reporter, options=options)
+    checker.check()
+
+
+def check_file(index, file_path, options):
+    """Read and check the file; return its FileReport.
+
+    The check shares no reporter with the checks of other files, so files
+    can be checked in threads or processes; a ReportAggregator merges the
+    reports in the order of their index.
+    """
+    file_report = FileReport(index, file_path)
+    check_source(file_path, read_source(file_path), options, file_report)
+    return file_report
+
+
+def finish_sources(options):
+    """Save the state that the checks of the sources updated."""
+    if getattr(options, 'symbol_index_path', None):
+        options.symbol_index.save()
+
+
 def check_sources(sources, options, reporter=None):
     if reporter is None:
         reporter = Reporter(Reporter.CONSOLE)
     reporter.call_count = 0
-    for source in sources:
-        file_path = os.path.normpath(source)
-        if os.path.isdir(source) or not Language.is_editable(source):
-            continue
-        language = Language.get_language(file_path)
-        with open(file_path, 'rt') as file_:
-            text = file_.read()
-        if language is Language.DOCTEST and options.do_format:
-            formatter = DoctestReviewer(text, file_path, reporter)
-            formatter.format_and_save(options.is_interactive)
-        checker = UniversalChecker(
-            file_path, text, language, reporter, options=options)
-        checker.check()
+    flush = getattr(reporter, 'flush', None)
+    for file_path in prepare_sources(sources, options):
+        check_source(file_path, read_source(file_path), options, reporter)
+        if flush is not None:
+            flush()
+    finish_sources(options)
     return reporter.call_count
 
 
+def check_sources_concurrently(sources, options, reporter=None, jobs=4):
+    """Check the sources in a pool of jobs threads.
+
+    Each thread reads and checks a file, so the reads and the waits for
+    external tools overlap with the checks of other files. The messages are
+    reported file by file in the order of the sources. Return the number
+    of messages.
+    """
+    if reporter is None:
+        reporter = Reporter(Reporter.CONSOLE)
+    reporter.call_count = 0
+    aggregator = ReportAggregator(reporter)
+    file_paths = prepare_sources(sources, options)
+    with ThreadPoolExecutor(jobs) as executor:
+        futures = [
+            executor.submit(check_file, index, file_path, options)
+            for index, file_path in enumerate(file_paths)]
+        try:
+            # Each report is merged as soon as the reports before it are.
+            for future in as_completed(futures):
+                aggregator.add(future.result())
+        finally:
+            for future in futures:
+                future.cancel()
+    finish_sources(options)
+    return reporter.call_count
+
+
+def get_report_type(output_format):
+    """Return the Reporter report type of the output format."""
+    return {
+        'console': Reporter.CONSOLE,
+        'jsonl': Reporter.JSONL,
+        'sarif': Reporter.SARIF,
+        }[output_format]
+
+
 def main(argv=None):
     """Run the command line operations."""
     if argv is None:
@@ -1229,9 +1890,20 @@ def main(argv=None):
     # Handle standard args.
     if len(sources) == 0:
         parser.error("Expected file paths.")
-    reporter = Reporter(Reporter.CONSOLE)
+    if options.closure_linter and closure_linter is None:
+        parser.error("Google Closure Linter is not installed.")
+    if options.jobs > 1 and ThreadPoolExecutor is None:
+        parser.error("--jobs requires Python 3 or the futures package.")
+    if options.jobs > 1 and options.is_interactive:
+        parser.error("--jobs cannot be used with --interactive.")
+    reporter = Reporter(get_report_type(options.output_format))
     reporter.error_only = not options.verbose
-    return check_sources(sources, options, reporter)
+    if options.jobs > 1:
+        check_sources_concurrently(sources, options, reporter, options.jobs)
+    else:
+        check_sources(sources, options, reporter)
+    # The exit code is the number of messages, up to 255.
+    return reporter.close()
 
 
 if __name__ == '__main__':
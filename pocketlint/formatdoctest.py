@@ -11,26 +11,41 @@ from __future__ import (
 
 
 __all__ = [
+    'check_docstrings',
+    'DocstringReviewer',
     'DoctestReviewer',
 ]
 
 
 import _ast
+import ast
 import os
 import re
+import shutil
 import sys
+import tempfile
 from difflib import unified_diff
 from doctest import DocTestParser, Example
 from optparse import OptionParser
 from textwrap import wrap
 
-from pocketlint.reporter import Reporter
+from pocketlint.reporter import (
+    Diagnostic,
+    report_diagnostic,
+    Reporter,
+)
 try:
     from pyflakes.checker import Checker as PyFlakesChecker
     PyFlakesChecker
 except ImportError:
     from pocketlint import PyFlakesChecker
 
+try:
+    replace = os.replace
+except AttributeError:
+    # Python 2 renames over the file on POSIX.
+    replace = os.rename
+
 
 class DoctestReviewer(object):
     """Check and reformat doctests."""
@@ -55,28 +70,41 @@ class DoctestReviewer(object):
         self.has_printed_filename = False
         self._reporter = reporter or Reporter(Reporter.CONSOLE)
         self.options = options
+        # The doctest that was parsed, and its parts.
+        self._parsed = (None, [])
 
     def get_parts(self):
+        """Return the parts of the doctest.
+
+        The doctest is parsed once; format() and the checks share the parts
+        until the doctest is changed.
+        """
+        doctest, parts = self._parsed
+        if doctest is self.doctest:
+            return parts
         parser = DocTestParser()
         try:
-            return parser.parse(self.doctest, self.file_path)
+            parts = parser.parse(self.doctest, self.file_path)
         except ValueError as error:
             # Output code without unicode literals needs to be normalised
             # largely for the test suite, and somewhat for the person reading
             # message.
             message = str(error).replace("u'", "'")
             self._print_message(message, 0)
-            return []
+            parts = []
+        self._parsed = (self.doctest, parts)
+        return parts
 
-    def _print_message(self, message, lineno):
+    def _print_message(self, message, lineno, column=0, rule=None):
         """Print the error message with the lineno.
 
         :param message: The message to print.
         :param lineno: The line number the message pertains to.
+        :param column: The column the message pertains to, if known.
+        :param rule: The name of the rule that was broken, if known.
         """
-        self._reporter(
-            int(lineno), message,
-            base_dir=self.base_dir, file_name=self.file_name)
+        report_diagnostic(self._reporter, Diagnostic(
+            self.file_path, int(lineno), column, rule, None, message))
 
     def _is_formatted(self, text):
         """Return True if the text is pre-formatted, otherwise False.
@@ -171,6 +199,16 @@ class DoctestReviewer(object):
         3. Check indentation.
         4. Check trailing whitespace.
         """
+        self.check_style()
+        code = '\n'.join(self.code_lines)
+        self.check_source_code(code)
+
+    def check_style(self):
+        """Check the doctest for style issues.
+
+        The source lines of the examples are collected in code_lines so
+        that the caller can check them.
+        """
         self.code_lines = []
         self.last_bad_indent = 0
         self.block_method = self.preserve_block
@@ -184,8 +222,6 @@ class DoctestReviewer(object):
             self.check_trailing_whitespace,
         ]
         self._apply(line_checkers)
-        code = '\n'.join(self.code_lines)
-        self.check_source_code(code)
 
     def format(self):
         """Reformat doctest.
@@ -330,10 +366,12 @@ class DoctestReviewer(object):
         else:
             warnings = PyFlakesChecker(tree)
             for warning in warnings.messages:
-                if 'undefined name ' in str(warning):
+                message = warning.message % warning.message_args
+                if 'undefined name ' in message:
                     continue
-                dummy, lineno, message = str(warning).split(':')
-                self._print_message(message.strip(), lineno)
+                self._print_message(
+                    message, warning.lineno, getattr(warning, 'col', -1) + 1,
+                    warning.__class__.__name__)
 
     def fix_trailing_whitespace(self, lineno, line, kind, previous_kind):
         """Return the line striped of trailing whitespace."""
@@ -386,6 +424,11 @@ class DoctestReviewer(object):
         return line
 
     def format_and_save(self, is_interactive=False):
+        """Format the doctest and save it if it changed.
+
+        The saved doctest becomes the doctest to check; it replaces the file
+        at once, so the file is never partly written.
+        """
         new_doctest = self.format()
         if new_doctest != self.doctest:
             if is_interactive:
@@ -401,10 +444,112 @@ class DoctestReviewer(object):
                     'Do you wish to save the changes? S(ave) or C(ancel)?')
             else:
                 do_save = 'S'
-            self.doctest = new_doctest
             if do_save.upper() == 'S':
-                with open(self.file_path, 'wt') as doctest_file:
-                    doctest_file.write(new_doctest)
+                self.doctest = new_doctest
+                self.save()
+
+    def save(self):
+        """Replace the file with the doctest."""
+        file_descriptor, temp_path = tempfile.mkstemp(
+            prefix='.%s.' % self.file_name, suffix='.tmp',
+            dir=self.base_dir or os.curdir)
+        try:
+            with os.fdopen(file_descriptor, 'wt') as doctest_file:
+                doctest_file.write(self.doctest)
+            if os.path.exists(self.file_path):
+                shutil.copymode(self.file_path, temp_path)
+            replace(temp_path, self.file_path)
+        except:
+            os.remove(temp_path)
+            raise
+
+
+class DocstringReviewer(DoctestReviewer):
+    """Check the doctest in a Python docstring.
+
+    The docstring's lines are reported relative to the module; line_offset
+    is the number of module lines before the first line of the docstring.
+    """
+
+    def __init__(self, file_path, doctest, reporter=None, options=None,
+                 line_offset=0):
+        super(DocstringReviewer, self).__init__(
+            file_path, doctest, reporter, options)
+        self.line_offset = line_offset
+
+    def _print_message(self, message, lineno, column=0, rule=None):
+        """Print the error message with the module lineno."""
+        super(DocstringReviewer, self)._print_message(
+            message, int(lineno) + self.line_offset, column, rule)
+
+    def check_indentation(self, lineno, line, kind, previous_kind):
+        """Docstring examples are aligned with the docstring's margin."""
+        return line
+
+
+DOCSTRING_NODES = tuple(
+    getattr(ast, name) for name in
+    ('Module', 'ClassDef', 'FunctionDef', 'AsyncFunctionDef')
+    if hasattr(ast, name))
+
+
+def get_docstrings(tree):
+    """Return the first line number and dedented text of each docstring.
+
+    Only docstrings that contain examples are returned. The text has the
+    same number of lines as the docstring in the module. The docstrings
+    are in the order of the module; ast.walk() visits the docstrings of
+    nested classes and functions after those of later top-level ones.
+
+    :param tree: The AST of the module, as made by compile().
+    """
+    docstrings = []
+    for node in ast.walk(tree):
+        if not isinstance(node, DOCSTRING_NODES) or not node.body:
+            continue
+        statement = node.body[0]
+        if not isinstance(statement, ast.Expr):
+            continue
+        value = statement.value
+        text = getattr(value, 'value', getattr(value, 's', None))
+        if not isinstance(text, type('')) or '>>>' not in text:
+            continue
+        if getattr(value, 'end_lineno', None) is not None:
+            lineno = value.lineno
+        else:
+            # Python 3.7 and below report the last line of the string.
+            lineno = value.lineno - text.count('\n')
+        lines = text.expandtabs().split('\n')
+        indents = [
+            len(line) - len(line.lstrip()) for line in lines[1:]
+            if line.strip()]
+        margin = min(indents or [0])
+        lines[1:] = [line[margin:] for line in lines[1:]]
+        docstrings.append((lineno, '\n'.join(lines)))
+    docstrings.sort(key=lambda docstring: docstring[0])
+    return docstrings
+
+
+def check_docstrings(file_path, tree, reporter=None, options=None):
+    """Check the doctests in the docstrings of a Python module.
+
+    The style of each docstring is checked separately. The example code of
+    all the docstrings is placed at its module line numbers and checked
+    with a single compile.
+
+    :param file_path: The path of the module.
+    :param tree: The AST of the module, as made by compile().
+    """
+    code_lines = []
+    for lineno, docstring in get_docstrings(tree):
+        reviewer = DocstringReviewer(
+            file_path, docstring, reporter, options, line_offset=lineno - 1)
+        reviewer.check_style()
+        code_lines.extend([''] * (lineno - 1 - len(code_lines)))
+        code_lines.extend(reviewer.code_lines)
+    if code_lines:
+        reviewer = DoctestReviewer(file_path, '', reporter, options)
+        reviewer.check_source_code('\n'.join(code_lines))
 
 
 def get_option_parser():
@@ -0,0 +1,147 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+"""Check Go files with gofmt and go vet, many files per process."""
+
+from __future__ import (
+    absolute_import,
+    unicode_literals,
+    with_statement,
+)
+
+__all__ = [
+    'GoToolReport',
+    'run_go_tools',
+]
+
+
+import os
+import re
+
+from pocketlint.procpool import (
+    get_process_pool,
+    ToolError,
+    ToolMissing,
+)
+
+
+STDIN_PATH = '<standard input>'
+
+# path:line:column: message, as written by gofmt -e and go vet.
+PROBLEM_PATTERN = re.compile(
+    r'^(?:vet: )?(?P<path>[^:]+):(?P<line>\d+):(?:(?P<column>\d+):)?'
+    r' ?(?P<message>.*)$')
+
+
+class GoToolReport(object):
+    """The problems that gofmt and go vet found in many files.
+
+    Each problem is (line, column, rule, icon, message).
+    """
+
+    def __init__(self):
+        self.problems = {}
+
+    def __contains__(self, file_path):
+        return file_path in self.problems
+
+    def add_file(self, file_path):
+        """Record that the file was checked."""
+        self.problems.setdefault(file_path, [])
+
+    def add(self, file_path, line, column, rule, icon, message):
+        """Record a problem in the file."""
+        self.problems.setdefault(file_path, []).append(
+            (line, column, rule, icon, message))
+
+    def get_problems(self, file_path):
+        """Return the list of problems in the file."""
+        return self.problems.get(file_path, [])
+
+    def add_output(self, output, file_paths, rule, icon):
+        """Record the problems in the output of a tool.
+
+        Lines about files that were not checked, like the package comments
+        of go vet, are ignored.
+        """
+        for line in output.splitlines():
+            match = PROBLEM_PATTERN.match(line)
+            if match is None:
+                continue
+            file_path = match.group('path')
+            if file_path != STDIN_PATH:
+                file_path = os.path.abspath(file_path)
+            if file_path not in file_paths:
+                continue
+            self.add(
+                file_paths[file_path], int(match.group('line')),
+                int(match.group('column') or 0), rule, icon,
+                match.group('message'))
+
+
+def _run(pool, args, input, timeout, report, file_paths, rule):
+    """Run the tool and record its problems.
+
+    A missing tool is ignored; a tool that fails is reported against every
+    file it was checking. Return the stdout of the tool, or None.
+    """
+    try:
+        returncode, stdout, stderr = pool.run(args, input, timeout)
+    except ToolMissing:
+        return None
+    except ToolError as error:
+        for file_path in file_paths.values():
+            report.add(file_path, 0, 0, rule, 'error', str(error))
+        return None
+    report.add_output(
+        stderr.decode('utf-8', 'replace'), file_paths, rule, 'error')
+    return stdout.decode('utf-8', 'replace')
+
+
+def run_go_tools(scripts, options):
+    """Check the scripts with gofmt and go vet; return a GoToolReport.
+
+    :param scripts: A list of (file_path, text) pairs. gofmt reads the text
+        from stdin; when the text is None, all those files are passed to one
+        gofmt. go vet checks the files on disk, one process per directory.
+    :param options: The gofmt dict of PocketLintOptions.
+    """
+    report = GoToolReport()
+    pool = get_process_pool()
+    timeout = options.get('timeout')
+    gofmt = [options['command'], '-l', '-e']
+    on_disk = {}
+    for file_path, text in scripts:
+        report.add_file(file_path)
+        if text is None:
+            on_disk[os.path.abspath(file_path)] = file_path
+            continue
+        stdout = _run(
+            pool, gofmt, text.encode('utf-8'), timeout, report,
+            {STDIN_PATH: file_path}, 'gofmt')
+        if stdout and stdout.strip() == STDIN_PATH:
+            report.add(
+                file_path, 0, 0, 'gofmt', 'info',
+                'File is not gofmt formatted.')
+    if on_disk:
+        stdout = _run(
+            pool, gofmt + sorted(on_disk), None, timeout, report, on_disk,
+            'gofmt')
+        for line in (stdout or '').splitlines():
+            file_path = on_disk.get(os.path.abspath(line.strip()))
+            if file_path is not None:
+                report.add(
+                    file_path, 0, 0, 'gofmt', 'info',
+                    'File is not gofmt formatted.')
+    if not options.get('vet'):
+        return report
+    packages = {}
+    for file_path, text in scripts:
+        if os.path.isfile(file_path):
+            packages.setdefault(os.path.dirname(file_path), {})[
+                os.path.abspath(file_path)] = file_path
+    for directory in sorted(packages):
+        file_paths = packages[directory]
+        _run(
+            pool, [options['vet_command'], 'vet'] + sorted(file_paths),
+            None, timeout, report, file_paths, 'go-vet')
+    return report
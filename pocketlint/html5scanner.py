@@ -0,0 +1,134 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+"""A streaming scanner for the common errors in HTML5 documents."""
+
+from __future__ import (
+    absolute_import,
+    unicode_literals,
+    with_statement,
+)
+
+__all__ = [
+    'HTML5Scanner',
+]
+
+
+import codecs
+
+try:
+    from html.entities import html5 as entitydefs
+    from html.parser import HTMLParser
+except ImportError:
+    # Python 2.7 and below
+    from htmlentitydefs import entitydefs  # pyflakes:ignore
+    from HTMLParser import HTMLParser  # pyflakes:ignore
+
+
+# Elements that never have content or an end tag.
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'command', 'embed', 'hr', 'img', 'input',
+    'keygen', 'link', 'meta', 'param', 'source', 'track', 'wbr'])
+
+# Elements whose end tag may be omitted.
+OPTIONAL_END_ELEMENTS = frozenset([
+    'body', 'colgroup', 'dd', 'dt', 'head', 'html', 'li', 'optgroup',
+    'option', 'p', 'rp', 'rt', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr'])
+
+
+class HTML5Scanner(HTMLParser):
+    """Scan HTML5 for the errors that a tokenizer can see.
+
+    They are unclosed and misnested tags, end tags that were not opened,
+    unknown entities and character references, and duplicate attributes.
+    No tree is built; the scanner keeps the stack of open elements. The
+    document can be fed in chunks of text or bytes. After close(), problems
+    is a list of (line, column, message), counting from 1.
+
+    :param encoding: The encoding of the bytes that are fed.
+    """
+
+    def __init__(self, encoding='utf-8'):
+        try:
+            HTMLParser.__init__(self, convert_charrefs=False)
+        except TypeError:
+            # Python 2.7 and below never convert references.
+            HTMLParser.__init__(self)
+        self._decoder = codecs.getincrementaldecoder(encoding)('replace')
+        # The stack of (tag, line, column) that are open.
+        self.stack = []
+        self.problems = []
+
+    def feed(self, data):
+        """Scan the next chunk of the document."""
+        if isinstance(data, bytes):
+            data = self._decoder.decode(data)
+        HTMLParser.feed(self, data)
+
+    def close(self):
+        """Scan the rest of the document; return the list of problems."""
+        HTMLParser.feed(self, self._decoder.decode(b'', True))
+        HTMLParser.close(self)
+        for tag, line, column in self.stack:
+            if tag not in OPTIONAL_END_ELEMENTS:
+                self.problems.append((line, column, 'Unclosed <%s>.' % tag))
+        self.stack = []
+        self.problems.sort()
+        return self.problems
+
+    def _position(self):
+        line, offset = self.getpos()
+        return line, offset + 1
+
+    def _check_attributes(self, tag, attrs):
+        seen = set()
+        for name, value in attrs:
+            if name in seen:
+                self.problems.append(self._position() + (
+                    "Duplicate attribute '%s' in <%s>." % (name, tag), ))
+            seen.add(name)
+
+    def handle_starttag(self, tag, attrs):
+        self._check_attributes(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append((tag, ) + self._position())
+
+    def handle_startendtag(self, tag, attrs):
+        # Void and foreign elements may close themselves.
+        self._check_attributes(tag, attrs)
+
+    def handle_endtag(self, tag):
+        line, column = self._position()
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                break
+        else:
+            self.problems.append(
+                (line, column, 'Unexpected end tag </%s>.' % tag))
+            return
+        for open_tag, open_line, ignore in self.stack[index + 1:]:
+            if open_tag not in OPTIONAL_END_ELEMENTS:
+                self.problems.append((
+                    line, column,
+                    'Expected </%s> to close <%s> from line %s and '
+                    'instead saw </%s>.' % (
+                        open_tag, open_tag, open_line, tag)))
+        del self.stack[index:]
+
+    def handle_entityref(self, name):
+        if name not in entitydefs and name + ';' not in entitydefs:
+            self.problems.append(
+                self._position() + ('Unknown entity &%s;.' % name, ))
+
+    def handle_charref(self, name):
+        try:
+            if name[:1] in 'xX':
+                code_point = int(name[1:], 16)
+            else:
+                code_point = int(name)
+        except ValueError:
+            code_point = None
+        if (code_point is None or not 0 < code_point <= 0x10FFFF or
+                0xD800 <= code_point <= 0xDFFF):
+            self.problems.append(
+                self._position() +
+                ('Invalid character reference &#%s;.' % name, ))
@@ -0,0 +1,107 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+"""Validate the records of JSON Lines files in parallel."""
+
+from __future__ import (
+    absolute_import,
+    unicode_literals,
+    with_statement,
+)
+
+__all__ = [
+    'check_records',
+    'JSONLinesValidator',
+]
+
+
+from collections import deque
+import json
+import multiprocessing
+
+
+def check_records(data, line_no=1):
+    """Return the problems of the records as (line, column, message).
+
+    Each line is a record that is loaded on its own; blank lines are
+    ignored.
+
+    :param data: The bytes of whole lines.
+    :param line_no: The number of the first line.
+    """
+    problems = []
+    for line in data.split(b'\n'):
+        if line.strip():
+            try:
+                json.loads(line.decode('utf-8'))
+            except UnicodeDecodeError:
+                problems.append((line_no, 0, 'Record is not UTF-8.'))
+            except ValueError as error:
+                # JSONDecodeError knows the message and column.
+                problems.append((
+                    line_no, getattr(error, 'colno', 0),
+                    getattr(error, 'msg', str(error))))
+        line_no += 1
+    return problems
+
+
+class JSONLinesValidator(object):
+    """Validate the records of a JSON Lines file as it is fed in chunks.
+
+    The whole lines of each chunk are validated by a pool of worker
+    processes, and at most two blocks per worker wait for validation. The
+    problems are collected in the order of the lines; close() returns them.
+
+    :param workers: The number of worker processes; None is one per core.
+        The records are validated in this process when it is 1.
+    """
+
+    def __init__(self, workers=None):
+        if workers is None:
+            try:
+                workers = multiprocessing.cpu_count()
+            except NotImplementedError:
+                workers = 1
+        self._pool = None
+        if workers > 1:
+            self._pool = multiprocessing.Pool(workers)
+        self._max_pending = 2 * workers
+        self._pending = deque()
+        self._partial = b''
+        self._line_no = 1
+        self.problems = []
+
+    def feed(self, chunk):
+        """Validate the whole lines that the chunk completes."""
+        data = self._partial + chunk
+        end = data.rfind(b'\n') + 1
+        self._partial = data[end:]
+        if end:
+            self._submit(data[:end])
+
+    def close(self):
+        """Validate the last line; return the list of problems."""
+        if self._partial:
+            self._submit(self._partial)
+            self._partial = b''
+        while self._pending:
+            self.problems.extend(self._pending.popleft().get())
+        self.terminate()
+        return self.problems
+
+    def terminate(self):
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def _submit(self, data):
+        line_no = self._line_no
+        self._line_no += data.count(b'\n')
+        if self._pool is None:
+            self.problems.extend(check_records(data, line_no))
+            return
+        self._pending.append(
+            self._pool.apply_async(check_records, (data, line_no)))
+        while len(self._pending) > self._max_pending:
+            self.problems.extend(self._pending.popleft().get())
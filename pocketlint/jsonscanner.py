@@ -0,0 +1,286 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+"""A streaming validator of JSON documents."""
+
+from __future__ import (
+    absolute_import,
+    unicode_literals,
+    with_statement,
+)
+
+__all__ = [
+    'JSONScanner',
+]
+
+
+import codecs
+import re
+
+
+WHITESPACE_PATTERN = re.compile(r'[ \t\n\r]*')
+# The last escape is captured; like the json module, a \uXXXX escape at
+# the end of the document is invalid.
+STRING_PATTERN = re.compile(
+    r'(?:[^"\\\x00-\x1f]|(\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})))*')
+NUMBER_PATTERN = re.compile(
+    r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?')
+# The characters that could continue a number at the end of a chunk.
+PARTIAL_NUMBER_PATTERN = re.compile(
+    r'-?[0-9]*(?:\.[0-9]*)?(?:[eE][-+]?[0-9]*)?')
+
+# The runs of members and items with simple values are matched at once.
+# A value must be followed by the character after it, which could be in
+# the next chunk.
+_SPACE = r'[ \t\n\r]*'
+_STRING = r'"(?:[^"\\\x00-\x1f]|\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4}))*"'
+_SCALAR = (
+    r'(?:%s|-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?'
+    r'|true|false|null)(?=[ \t\n\r,\]}])' % _STRING)
+_MEMBER = r'{0}{1}{0}:{0}{2}'.format(_SPACE, _STRING, _SCALAR)
+_ITEM = _SPACE + _SCALAR
+RUN_PATTERNS = {
+    '{': re.compile(r'(?:{0},{1})*'.format(_SPACE, _MEMBER)),
+    '[': re.compile(r'(?:{0},{1})*'.format(_SPACE, _ITEM)),
+    }
+# The runs after the start of an object or array.
+FIRST_RUN_PATTERNS = {
+    '{': re.compile(r'{1}(?:{0},{1})*'.format(_SPACE, _MEMBER)),
+    '[': re.compile(r'{1}(?:{0},{1})*'.format(_SPACE, _ITEM)),
+    }
+
+# Like the json module, NaN and Infinity are accepted.
+LITERALS = {
+    'n': 'null',
+    't': 'true',
+    'f': 'false',
+    'N': 'NaN',
+    'I': 'Infinity',
+    }
+
+# What the scanner expects next.
+VALUE = 'value'
+VALUE_OR_CLOSE = 'value or ]'
+NAME_OR_CLOSE = 'name or }'
+NAME = 'name'
+COLON = 'colon'
+DELIMITER = 'delimiter'
+FAILED = 'failed'
+
+EXPECTING_VALUE = 'Expecting value'
+EXPECTING_NAME = 'Expecting property name enclosed in double quotes'
+EXPECTING_COLON = "Expecting ':' delimiter"
+EXPECTING_DELIMITER = "Expecting ',' delimiter"
+
+CLOSERS = {'{': '}', '[': ']'}
+
+
+class JSONScanner(object):
+    """Scan a JSON document for the first error, like json.loads().
+
+    The document can be fed in chunks of text or bytes. No values are
+    built; the scanner keeps the stack of open objects and arrays, and
+    the part of the last chunk that may continue in the next. After
+    close(), problems is an empty list or a list of one
+    (line, column, message), counting from 1. The messages are the
+    json module's.
+
+    :param encoding: The encoding of the bytes that are fed.
+    """
+
+    def __init__(self, encoding='utf-8'):
+        self._decoder = codecs.getincrementaldecoder(encoding)('replace')
+        self._buffer = ''
+        # The offset of the buffer in the document.
+        self._offset = 0
+        self._line = 1
+        self._line_start = 0
+        self._stack = []
+        self._state = VALUE
+        # The offset of the string that is being read, and what is
+        # expected after it.
+        self._string_start = None
+        self._after_string = None
+        self.problems = []
+
+    def feed(self, data):
+        """Scan the next chunk of the document."""
+        if isinstance(data, bytes):
+            data = self._decoder.decode(data)
+        if self._state is FAILED or not data:
+            return
+        self._buffer += data
+        self._scan(final=False)
+
+    def close(self):
+        """Scan the rest of the document; return the list of problems."""
+        self.feed(self._decoder.decode(b'', True))
+        if self._state is not FAILED:
+            self._scan(final=True)
+        return self.problems
+
+    def _fail(self, message, offset):
+        """Report the error at the offset in the document, and stop."""
+        column = offset - self._line_start + 1
+        self.problems.append((
+            self._line, column, '%s: line %d column %d (char %d)' % (
+                message, self._line, column, offset)))
+        self._state = FAILED
+        self._buffer = ''
+
+    def _skip(self, buf, pos, end):
+        """Return the end of the span of the buffer; count its lines."""
+        newlines = buf.count('\n', pos, end)
+        if newlines:
+            self._line += newlines
+            self._line_start = self._offset + buf.rindex('\n', pos, end) + 1
+        return end
+
+    def _scan(self, final):
+        """Scan the buffer; keep what may continue in the next chunk."""
+        buf = self._buffer
+        end = len(buf)
+        pos = 0
+        stack = self._stack
+        state = self._state
+        if self._offset == 0 and buf.startswith('\ufeff'):
+            self._fail('Unexpected UTF-8 BOM (decode using utf-8-sig)', 0)
+            return
+        while True:
+            if self._string_start is not None:
+                match = STRING_PATTERN.match(buf, pos)
+                pos = match.end()
+                if pos == end:
+                    if match.end(1) == end and match.group(1)[1] == 'u':
+                        if final:
+                            self._fail(
+                                'Invalid \\uXXXX escape',
+                                self._offset + pos - 5)
+                            return
+                        # The escape is scanned again with the next chunk.
+                        pos -= 6
+                        break
+                    if final:
+                        self._fail(
+                            'Unterminated string starting at',
+                            self._string_start)
+                        return
+                    break
+                char = buf[pos]
+                if char == '"':
+                    pos += 1
+                    self._string_start = None
+                    state = self._after_string
+                    continue
+                if char == '\\':
+                    escape = buf[pos + 1:pos + 2]
+                    if escape == 'u' and not final and end - pos < 6:
+                        break
+                    if not escape:
+                        if final:
+                            self._fail(
+                                'Unterminated string starting at',
+                                self._string_start)
+                            return
+                        break
+                    if escape == 'u':
+                        self._fail(
+                            'Invalid \\uXXXX escape', self._offset + pos + 1)
+                    else:
+                        self._fail('Invalid \\escape', self._offset + pos)
+                    return
+                self._fail('Invalid control character at', self._offset + pos)
+                return
+            space_end = WHITESPACE_PATTERN.match(buf, pos).end()
+            if space_end != pos:
+                pos = self._skip(buf, pos, space_end)
+            if pos == end:
+                break
+            char = buf[pos]
+            if state is DELIMITER:
+                if not stack:
+                    self._fail('Extra data', self._offset + pos)
+                    return
+                run_end = RUN_PATTERNS[stack[-1]].match(buf, pos).end()
+                if run_end != pos:
+                    pos = self._skip(buf, pos, run_end)
+                    continue
+                if char == ',':
+                    state = NAME if stack[-1] == '{' else VALUE
+                elif char == CLOSERS[stack[-1]]:
+                    stack.pop()
+                else:
+                    self._fail(EXPECTING_DELIMITER, self._offset + pos)
+                    return
+                pos += 1
+            elif state is COLON:
+                if char != ':':
+                    self._fail(EXPECTING_COLON, self._offset + pos)
+                    return
+                state = VALUE
+                pos += 1
+            elif state is NAME or state is NAME_OR_CLOSE:
+                if char == '"':
+                    self._string_start = self._offset + pos
+                    self._after_string = COLON
+                elif char == '}' and state is NAME_OR_CLOSE:
+                    stack.pop()
+                    state = DELIMITER
+                else:
+                    self._fail(EXPECTING_NAME, self._offset + pos)
+                    return
+                pos += 1
+            elif char == ']' and state is VALUE_OR_CLOSE:
+                stack.pop()
+                state = DELIMITER
+                pos += 1
+            elif char == '"':
+                self._string_start = self._offset + pos
+                self._after_string = DELIMITER
+                pos += 1
+            elif char == '{' or char == '[':
+                stack.append(char)
+                pos += 1
+                match = FIRST_RUN_PATTERNS[char].match(buf, pos)
+                if match is None:
+                    state = NAME_OR_CLOSE if char == '{' else VALUE_OR_CLOSE
+                else:
+                    pos = self._skip(buf, pos, match.end())
+                    state = DELIMITER
+            elif char in LITERALS or char == '-' and buf.startswith(
+                    '-Infinity', pos):
+                literal = LITERALS.get(char, '-Infinity')
+                if buf.startswith(literal, pos):
+                    state = DELIMITER
+                    pos += len(literal)
+                elif (not final and end - pos < len(literal) and
+                        literal.startswith(buf[pos:])):
+                    break
+                else:
+                    self._fail(EXPECTING_VALUE, self._offset + pos)
+                    return
+            else:
+                if (not final and
+                        PARTIAL_NUMBER_PATTERN.match(buf, pos).end() == end):
+                    break
+                if (not final and char == '-' and end - pos < 9 and
+                        '-Infinity'.startswith(buf[pos:])):
+                    break
+                match = NUMBER_PATTERN.match(buf, pos)
+                if match is None:
+                    self._fail(EXPECTING_VALUE, self._offset + pos)
+                    return
+                state = DELIMITER
+                pos = match.end()
+        if final:
+            if state is VALUE or state is VALUE_OR_CLOSE:
+                self._fail(EXPECTING_VALUE, self._offset + pos)
+            elif state is NAME or state is NAME_OR_CLOSE:
+                self._fail(EXPECTING_NAME, self._offset + pos)
+            elif state is COLON:
+                self._fail(EXPECTING_COLON, self._offset + pos)
+            elif stack:
+                self._fail(EXPECTING_DELIMITER, self._offset + pos)
+            return
+        self._state = state
+        self._buffer = buf[pos:]
+        self._offset += pos
@@ -3,6 +3,17 @@
 
 // Run like:
 // <seed|gjs> jsreporter.js <path/to/fulljslint.js> <path/file/to/lint.js>
+//
+// Pass - as the file to lint the script read from stdin.
+//
+// or run a worker that lints many files:
+// <seed|gjs> jsreporter.js <path/to/fulljslint.js> --worker
+//
+// The worker reads one JSON request per line from stdin:
+//     {"content": "var a = 1;\n"}
+// or {"path": "path/file/to/lint.js"} to read the script from the file,
+// and writes one JSON response per line to stdout:
+//     {"issues": [{"line": 1, "character": 1, "reason": "..."}, ...]}
 
 
 var ATTEMPT_TAG = false;
@@ -30,10 +41,15 @@ var JSLINT = imports.fulljslint.JSLINT;
 
 
 function get_file_content(file_path) {
-    // Return the content of the file.
+    // Return the content of the file, or of stdin when the path is -.
     var Gio = imports.gi.Gio;
-    var file = Gio.file_new_for_path(file_path);
-    var istream = file.read(null);
+    var istream;
+    if (file_path === '-') {
+        istream = new Gio.UnixInputStream({'fd': 0, 'close_fd': false});
+        }
+    else {
+        istream = Gio.file_new_for_path(file_path).read(null);
+        }
     var dstream = new Gio.DataInputStream({base_stream: istream});
     var content_and_count = dstream.read_upto("", -1, null);
     istream.close(null);
@@ -53,9 +69,13 @@ function report_implied_names() {
         }
     if (implied_names.length > 0) {
         implied_names.sort();
-        return '0::0::Implied globals:' + implied_names.join(', ');
+        return {
+            'line': 0,
+            'character': 0,
+            'reason': 'Implied globals:' + implied_names.join(', ')
+            };
         }
-    return '';
+    return null;
     }
 
 
@@ -73,30 +93,84 @@ function report_lint_errors() {
                 };
             }
         // Fix the line and character offset for editors.
-        error.line += 1;
-        error.character += 1;
-        errors.push(
-            [error.line, error.character, error.reason].join('::'));
+        errors.push({
+            'line': error.line + 1,
+            'character': error.character + 1,
+            'reason': error.reason
+            });
+        }
+    return errors;
+    }
+
+
+function lint_issues(script) {
+    // Lint the source and return the list of issues.
+    var issues = [];
+    if (! JSLINT(script)) {
+        issues = report_lint_errors();
+        var implied = report_implied_names();
+        if (implied) {
+            issues.push(implied);
+            }
+        }
+    return issues;
+    }
+
+
+function run_worker() {
+    // Lint the files requested on stdin until it is closed.
+    var Gio = imports.gi.Gio;
+    var stdin = new Gio.DataInputStream({
+        base_stream: new Gio.UnixInputStream({'fd': 0, 'close_fd': false})
+        });
+    var stdout = new Gio.UnixOutputStream({'fd': 1, 'close_fd': false});
+    while (true) {
+        var line = stdin.read_line(null)[0];
+        if (line === null) {
+            break;
+            }
+        if (typeof line !== 'string') {
+            // Newer gjs return a byte array.
+            line = imports.byteArray.toString(line);
+            }
+        var issues;
+        try {
+            var request = JSON.parse(line);
+            var script = request.content;
+            if (typeof script !== 'string') {
+                script = get_file_content(request.path);
+                }
+            issues = lint_issues(script);
+            }
+        catch (error) {
+            issues = [{
+                'line': 0,
+                'character': 0,
+                'reason': 'JSLINT had a fatal error: ' + error
+                }];
+            }
+        var response = JSON.stringify({'issues': issues}) + '\n';
+        stdout.write_all(response, null);
+        stdout.flush(null);
         }
-    return errors.join('\n');
     }
 
 
 function lint_script() {
     // Lint the source and report errors.
+    if (Seed.argv[3] === '--worker') {
+        run_worker();
+        return;
+        }
     var script = get_file_content(Seed.argv[3]);
-    var result = JSLINT(script);
-    if (! result) {
-        var issues = [];
-        errors = report_lint_errors();
-        if (errors) {
-            issues.push(errors);
-            }
-        implied = report_implied_names();
-        if (implied) {
-            issues.push(implied);
+    var issues = lint_issues(script);
+    if (issues.length > 0) {
+        var lines = [];
+        var i;
+        for (i = 0; i < issues.length; i++) {
+            lines.push(JSON.stringify(issues[i]));
             }
-        Seed.print(issues.join('\n'));
+        Seed.print(lines.join('\n'));
         }
     else {
         if (!ATTEMPT_TAG) {
@@ -0,0 +1,205 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+"""A fast, in-process scanner for common JavaScript syntax errors."""
+
+from __future__ import (
+    absolute_import,
+    unicode_literals,
+    with_statement,
+)
+
+__all__ = [
+    'JavaScriptScanner',
+]
+
+
+import re
+
+
+OPENERS = {'(': ')', '[': ']', '{': '}'}
+CLOSERS = {')': '(', ']': '[', '}': '{'}
+
+# A / after these words starts a regular expression, not a division.
+REGEX_KEYWORDS = frozenset([
+    'case', 'delete', 'do', 'else', 'in', 'instanceof', 'new', 'return',
+    'throw', 'typeof', 'void', 'yield'])
+
+WORD_PATTERN = re.compile(r'[\w$]+', re.UNICODE)
+SPACE_PATTERN = re.compile('[ \t\r\f\v\u00a0\ufeff]+')
+
+
+class JavaScriptScanner(object):
+    """Scan JavaScript for the syntax errors that a tokenizer can see.
+
+    They are unbalanced brackets, unclosed strings, comments and regular
+    expressions, and extra commas before a closing bracket. The scanner
+    only tokenizes the script, so it is much faster than jslint, but it
+    cannot see most syntax errors. After scan(), problems is a list of
+    (line, column, message), counting from 1, and has_code is False when
+    the script is only whitespace and comments.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.problems = []
+        self.has_code = False
+
+    def scan(self):
+        """Scan the text; return the list of problems."""
+        text = self.text
+        length = len(text)
+        # The stack of (bracket, line, column) that are open.
+        stack = []
+        # The significant token before the current one, and where the last
+        # comma was when it is the previous token.
+        previous = None
+        comma = None
+        self.line = 1
+        self.line_start = 0
+        i = 0
+        while i < length:
+            char = text[i]
+            if char == '\n':
+                self._newline(i)
+                i += 1
+                continue
+            match = SPACE_PATTERN.match(text, i)
+            if match:
+                i = match.end()
+                continue
+            if text.startswith('//', i):
+                end = text.find('\n', i)
+                i = length if end == -1 else end
+                continue
+            if text.startswith('/*', i):
+                i = self._skip_comment(i)
+                continue
+            self.has_code = True
+            column = i - self.line_start + 1
+            if char in OPENERS:
+                stack.append((char, self.line, column))
+            elif char in CLOSERS:
+                if comma is not None and char in '}]':
+                    self.problems.append(comma + ('Extra comma.', ))
+                if not stack:
+                    self.problems.append((
+                        self.line, column, "Unexpected '%s'." % char))
+                else:
+                    opener, line, ignore = stack.pop()
+                    if opener != CLOSERS[char]:
+                        self.problems.append((
+                            self.line, column,
+                            "Expected '%s' to match '%s' from line %s and "
+                            "instead saw '%s'." % (
+                                OPENERS[opener], opener, line, char)))
+            comma = (self.line, column) if char == ',' else None
+            if char in '\'"`':
+                i = self._skip_string(i, char)
+                previous = 'string'
+                continue
+            if char == '/' and self._starts_regex(previous):
+                i = self._skip_regex(i)
+                previous = 'regex'
+                continue
+            match = WORD_PATTERN.match(text, i)
+            if match:
+                previous = match.group()
+                i = match.end()
+                continue
+            if char in '+-' and text.startswith(char * 2, i):
+                # An increment or decrement; a / after it is a division.
+                previous = char * 2
+                i += 2
+                continue
+            previous = char
+            i += 1
+        for opener, line, column in stack:
+            self.problems.append((
+                line, column, "Unclosed '%s'." % opener))
+        self.problems.sort()
+        return self.problems
+
+    def _newline(self, i):
+        self.line += 1
+        self.line_start = i + 1
+
+    @staticmethod
+    def _starts_regex(previous):
+        """Return True if a / after the previous token starts a regex."""
+        if previous is None:
+            return True
+        if previous in ('string', 'regex', '++', '--'):
+            return False
+        if previous in (')', ']', '}'):
+            return False
+        if previous[0].isalnum() or previous[0] in '_$':
+            return previous in REGEX_KEYWORDS
+        return True
+
+    def _skip_comment(self, i):
+        """Return the index after the block comment that starts at i."""
+        line, column = self.line, i - self.line_start + 1
+        end = self.text.find('*/', i + 2)
+        if end == -1:
+            end = len(self.text)
+            self.problems.append((line, column, 'Unclosed comment.'))
+        else:
+            end += 2
+        start = i
+        while True:
+            newline = self.text.find('\n', start, end)
+            if newline == -1:
+                break
+            self._newline(newline)
+            start = newline + 1
+        return end
+
+    def _skip_string(self, i, quote):
+        """Return the index after the string that starts at i.
+
+        Template strings may span lines; the other strings end at a line
+        break that is not escaped.
+        """
+        text = self.text
+        line, column = self.line, i - self.line_start + 1
+        i += 1
+        while i < len(text):
+            char = text[i]
+            if char == '\\':
+                if text[i + 1:i + 2] == '\n':
+                    self._newline(i + 1)
+                i += 2
+                continue
+            if char == quote:
+                return i + 1
+            if char == '\n':
+                if quote != '`':
+                    break
+                self._newline(i)
+            i += 1
+        self.problems.append((line, column, 'Unclosed string.'))
+        return i
+
+    def _skip_regex(self, i):
+        """Return the index after the regular expression that starts at i."""
+        text = self.text
+        line, column = self.line, i - self.line_start + 1
+        in_class = False
+        i += 1
+        while i < len(text):
+            char = text[i]
+            if char == '\\' and text[i + 1:i + 2] != '\n':
+                i += 2
+                continue
+            if char == '\n':
+                break
+            if char == '[':
+                in_class = True
+            elif char == ']':
+                in_class = False
+            elif char == '/' and not in_class:
+                match = WORD_PATTERN.match(text, i + 1)
+                return match.end() if match else i + 1
+            i += 1
+        self.problems.append((line, column, 'Unclosed regular expression.'))
+        return i
@@ -0,0 +1,177 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+"""Persistent JavaScript interpreters that lint many files."""
+
+from __future__ import (
+    absolute_import,
+    unicode_literals,
+    with_statement,
+)
+
+__all__ = [
+    'JSLintWorker',
+    'JSLintWorkerPool',
+    'WorkerError',
+    'WorkerTimeout',
+]
+
+
+import json
+import multiprocessing
+import os
+import subprocess
+import threading
+try:
+    from queue import Queue
+except ImportError:
+    # Python 2.7 and below.
+    from Queue import Queue  # pyflakes:ignore
+
+from pocketlint.procpool import Deadline
+
+
+class WorkerError(Exception):
+    """The worker process died or replied with garbage."""
+
+
+class WorkerTimeout(WorkerError):
+    """The worker process did not reply in time."""
+
+
+class JSLintWorker(object):
+    """A gjs or seed process running jsreporter.js --worker.
+
+    Each request is a JSON line with the script to lint; each response is a
+    JSON line with the list of issues. The interpreter and jslint are
+    loaded once for all the files.
+    """
+
+    def __init__(self, command, timeout=None):
+        """Create a worker.
+
+        :param command: The argument list that starts the worker, such as
+            [js, jsreporter.js, fulljslint.js, '--worker'].
+        :param timeout: The seconds to wait for a response before the worker
+            is killed, or None to wait forever.
+        """
+        self.command = command
+        self.timeout = timeout
+        self.process = None
+
+    def start(self):
+        """Start the worker process."""
+        with open(os.devnull, 'wb') as devnull:
+            self.process = subprocess.Popen(
+                self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=devnull)
+
+    def stop(self):
+        """Stop the worker process."""
+        process = self.process
+        self.process = None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except (IOError, OSError):
+            pass
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        process.stdout.close()
+
+    def _request(self, request):
+        """Send the request and return the response."""
+        if self.process is None or self.process.poll() is not None:
+            self.stop()
+            self.start()
+        data = json.dumps(request).encode('utf-8') + b'\n'
+        process = self.process
+        deadline = Deadline(process, self.timeout)
+        try:
+            process.stdin.write(data)
+            process.stdin.flush()
+            response = process.stdout.readline()
+        except (IOError, OSError) as error:
+            response = None
+            message = str(error)
+        timed_out = deadline.finish()
+        if timed_out:
+            # The process is dead, though the reply may have been read.
+            self.stop()
+            if not response or not response.endswith(b'\n'):
+                raise WorkerTimeout(
+                    'The worker did not finish in %s seconds.' % self.timeout)
+        if response is None:
+            self.stop()
+            raise WorkerError(message)
+        if not response:
+            self.stop()
+            raise WorkerError('The worker exited.')
+        try:
+            return json.loads(response.decode('utf-8'))
+        except ValueError:
+            self.stop()
+            raise WorkerError('The worker replied: %s' % response.strip())
+
+    def lint(self, content):
+        """Return the list of issues in the script content.
+
+        A worker that dies is restarted and the request is tried once more;
+        WorkerError is raised if the second attempt fails too. A worker that
+        hangs is killed, and the request is not tried again.
+        """
+        request = {'content': content}
+        try:
+            response = self._request(request)
+        except WorkerTimeout:
+            raise
+        except WorkerError:
+            response = self._request(request)
+        return response['issues']
+
+
+class JSLintWorkerPool(object):
+    """A pool of JSLintWorkers; by default one per core.
+
+    The workers start when they are first needed. The pool can be used from
+    several threads.
+    """
+
+    def __init__(self, command, size=None, timeout=None):
+        if size is None:
+            try:
+                size = multiprocessing.cpu_count()
+            except NotImplementedError:
+                size = 1
+        self.command = command
+        self.size = size
+        self.timeout = timeout
+        self._idle = Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        """Return an idle worker, creating one when the pool has room."""
+        with self._lock:
+            if self._idle.empty() and len(self._workers) < self.size:
+                worker = JSLintWorker(self.command, self.timeout)
+                self._workers.append(worker)
+                return worker
+        return self._idle.get()
+
+    def lint(self, content):
+        """Return the list of issues in the script content."""
+        worker = self._acquire()
+        try:
+            return worker.lint(content)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        """Stop all the workers."""
+        with self._lock:
+            for worker in self._workers:
+                worker.stop()
+            self._workers = []
+            self._idle = Queue()
@@ -0,0 +1,172 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+"""Run external tools with a limit on processes and time."""
+
+from __future__ import (
+    absolute_import,
+    unicode_literals,
+    with_statement,
+)
+
+__all__ = [
+    'Deadline',
+    'DEFAULT_TIMEOUT',
+    'get_process_pool',
+    'ProcessPool',
+    'ToolCall',
+    'ToolError',
+    'ToolMissing',
+]
+
+
+import errno
+import multiprocessing
+import subprocess
+import threading
+
+
+DEFAULT_TIMEOUT = 60
+
+
+class ToolError(Exception):
+    """The tool could not start, timed out, or was killed."""
+
+
+class ToolMissing(ToolError):
+    """The tool is not installed."""
+
+
+class Deadline(object):
+    """Kill the process when its reply is not read in time.
+
+    The reply and the kill are guarded by one lock, so the process is
+    never killed after finish() is called or after it exited.
+    """
+
+    def __init__(self, process, timeout):
+        self.process = process
+        self.timed_out = False
+        self._done = False
+        self._lock = threading.Lock()
+        self._timer = None
+        if timeout is not None:
+            self._timer = threading.Timer(timeout, self.expire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def expire(self):
+        """Kill the process unless the reply was read."""
+        with self._lock:
+            if self._done or self.process.poll() is not None:
+                return
+            self.timed_out = True
+            try:
+                self.process.kill()
+            except OSError:
+                pass
+
+    def finish(self):
+        """Stop the timer; return True when the process was killed."""
+        with self._lock:
+            self._done = True
+            if self._timer is not None:
+                self._timer.cancel()
+            return self.timed_out
+
+
+class ToolCall(object):
+    """A function running in a thread; result() waits for it to finish."""
+
+    def __init__(self, function, *args):
+        self._result = None
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._run, args=(function, args))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self, function, args):
+        try:
+            self._result = function(*args)
+        except Exception as error:
+            self._error = error
+
+    def result(self):
+        """Return the result of the function or raise its error."""
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class ProcessPool(object):
+    """Run external tools, at most max_processes at once.
+
+    Each run is killed when it takes longer than its timeout. Tools can be
+    run in the calling thread with run(), or started with submit() so that
+    the caller can do other work while the tool runs.
+    """
+
+    def __init__(self, max_processes=None, timeout=DEFAULT_TIMEOUT):
+        if max_processes is None:
+            try:
+                max_processes = multiprocessing.cpu_count()
+            except NotImplementedError:
+                max_processes = 1
+        self.max_processes = max_processes
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_processes)
+
+    def run(self, args, input=None, timeout=None):
+        """Run the tool and return (returncode, stdout, stderr).
+
+        :param args: The argument list of the tool.
+        :param input: The bytes to write to the tool's stdin, or None.
+        :param timeout: The seconds to wait before the tool is killed; the
+            pool's timeout is used when it is None.
+        :raises ToolError: when the tool cannot be started, is killed
+            because it took too long, or is killed by a signal.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        with self._slots:
+            try:
+                process = subprocess.Popen(
+                    args, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE)
+            except OSError as error:
+                if error.errno == errno.ENOENT:
+                    raise ToolMissing('%s is not installed.' % args[0])
+                raise ToolError('%s could not start: %s' % (args[0], error))
+            deadline = Deadline(process, timeout)
+            try:
+                stdout, stderr = process.communicate(input)
+            finally:
+                timed_out = deadline.finish()
+        if timed_out:
+            raise ToolError(
+                '%s did not finish in %s seconds.' % (args[0], timeout))
+        if process.returncode < 0:
+            raise ToolError(
+                '%s was killed by signal %s.' % (args[0], -process.returncode))
+        return process.returncode, stdout, stderr
+
+    def submit(self, args, input=None, timeout=None):
+        """Start the tool in a thread and return its ToolCall.
+
+        The result of the ToolCall is (returncode, stdout, stderr).
+        """
+        return ToolCall(self.run, args, input, timeout)
+
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """Return the ProcessPool shared by the checkers."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPool()
+    return _process_pool
@@ -0,0 +1,273 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+"""Re-check the edited region of a file for editors."""
+
+from __future__ import (
+    absolute_import,
+    unicode_literals,
+    with_statement,
+)
+
+__all__ = [
+    'IncrementalChecker',
+]
+
+
+import _ast
+import ast
+
+from pocketlint.formatcheck import (
+    AnyTextChecker,
+    Language,
+    PythonChecker,
+    UniversalChecker,
+)
+from pocketlint.reporter import Reporter
+from pocketlint.symbolindex import get_module_symbols
+
+
+TOP_LEVEL_NODES = tuple(
+    getattr(ast, name) for name in
+    ('FunctionDef', 'AsyncFunctionDef', 'ClassDef') if hasattr(ast, name))
+
+# pep257 rules about the module; a block is not a module.
+MODULE_DOCSTRING_RULES = ('D100', 'D104')
+MODULE_DOCSTRING_MESSAGE = 'All modules should have docstrings.'
+
+
+class IncrementalChecker(object):
+    """Check a file, then re-check only the regions that are edited.
+
+    check() checks all the text. recheck() is passed the new text and the
+    edited line range; the results of the previous check are kept for the
+    lines outside the region, and moved when lines were added or removed.
+
+    Plain text is re-checked line by line. A Python edit that is inside one
+    top-level function or class is re-checked by compiling, pyflaking and
+    pep8ing just that definition; names defined elsewhere in the module are
+    known from the previous check. An edit that changes the module names
+    that the definition uses or binds changes the module's unused names,
+    so it gets a full check, like every other edit, and other languages
+    whose checks are not local to lines.
+    """
+
+    def __init__(self, file_path, language=None, options=None):
+        self.file_path = file_path
+        if language is None:
+            language = Language.get_language(file_path)
+        self.language = language
+        self.options = options
+        self.text = None
+        self.diagnostics = []
+        # The [first, last, name] lines of the top-level definitions.
+        self.blocks = []
+        self.module_names = set()
+
+    def check(self, text):
+        """Check all of the text; return the list of Diagnostics."""
+        reporter = Reporter(Reporter.COLLECTOR)
+        self.blocks = []
+        self.module_names = set()
+        if self.language is Language.PYTHON:
+            checker = PythonChecker(
+                self.file_path, text, reporter, self.options)
+            checker.check()
+            self._index_blocks(checker.tree)
+        else:
+            checker = UniversalChecker(
+                self.file_path, text, self.language, reporter, self.options)
+            checker.check()
+        self.text = text
+        self.diagnostics = self._sorted(reporter.diagnostics)
+        return list(self.diagnostics)
+
+    def recheck(self, text, first, last, delta=0):
+        """Re-check the edited lines; return the merged list of Diagnostics.
+
+        :param text: The new text.
+        :param first: The first edited line in the new text, from 1.
+        :param last: The last edited line in the new text.
+        :param delta: The number of lines added by the edit; negative when
+            lines were removed.
+        """
+        if self.text is None:
+            return self.check(text)
+        lines = text.splitlines()
+        if self.language is Language.PYTHON:
+            region = self._find_block(first, last - delta)
+            if region is None:
+                return self.check(text)
+            old_first, old_last = region
+            diagnostics = self._check_python_block(
+                lines, old_first, old_last + delta)
+            if diagnostics is None:
+                return self.check(text)
+        elif self.language is Language.TEXT:
+            old_first, old_last = first, last - delta
+            diagnostics = self._check_text_lines(lines, first, last)
+        else:
+            return self.check(text)
+        self._merge(text, diagnostics, old_first, old_last, delta)
+        return list(self.diagnostics)
+
+    def _index_blocks(self, tree):
+        """Record the lines and names of the top-level definitions."""
+        if tree is None:
+            return
+        self.module_names = set(get_module_symbols(tree)['definitions'])
+        for node in tree.body:
+            if not isinstance(node, TOP_LEVEL_NODES):
+                continue
+            last = getattr(node, 'end_lineno', None)
+            if last is None:
+                # The extent of the definition is unknown before py 3.8.
+                self.blocks = []
+                return
+            first = min(
+                [node.lineno] + [
+                    decorator.lineno for decorator in node.decorator_list])
+            self.blocks.append([first, last, node.name])
+
+    def _find_block(self, first, last):
+        """Return the [first, last] lines of the definition with the edit.
+
+        The edit lines are in the old text. None is returned when the edit
+        is not inside exactly one top-level definition.
+        """
+        for block_first, block_last, name in self.blocks:
+            if block_first <= first and last <= block_last:
+                return block_first, block_last
+        return None
+
+    def _offset(self, diagnostics, offset, skip=0):
+        """Return the diagnostics moved down offset lines.
+
+        The diagnostics on the first skip lines are context; they are
+        dropped.
+        """
+        return [
+            diagnostic._replace(
+                path=self.file_path, line=diagnostic.line + offset)
+            for diagnostic in diagnostics if diagnostic.line > skip]
+
+    def _check_text_lines(self, lines, first, last):
+        """Return the diagnostics of the lines checks for the region."""
+        reporter = Reporter(Reporter.COLLECTOR)
+        text = '\n'.join(lines[first - 1:last])
+        checker = AnyTextChecker(self.file_path, text, reporter, self.options)
+        checker.check_text()
+        return self._offset(reporter.diagnostics, first - 1)
+
+    def _check_python_block(self, lines, first, last):
+        """Return the diagnostics for the top-level definition.
+
+        None is returned when the definition cannot be checked alone.
+        """
+        text = '\n'.join(lines[first - 1:last]) + '\n'
+        try:
+            tree = compile(text, self.file_path, 'exec', _ast.PyCF_ONLY_AST)
+        except (SyntaxError, IndentationError, ValueError, TypeError):
+            return None
+        if len(tree.body) != 1:
+            return None
+        if not isinstance(tree.body[0], TOP_LEVEL_NODES):
+            return None
+        old_names = [
+            name for block_first, block_last, name in self.blocks
+            if block_first == first]
+        if old_names != [tree.body[0].name]:
+            return None
+        if tree.body[0].end_lineno != last - first + 1:
+            # Lines after the definition, like blank lines, were edited.
+            return None
+        if self._module_references(tree) != self._old_module_references(
+                first):
+            # The module's unused and undefined names may have changed.
+            return None
+        reporter = Reporter(Reporter.COLLECTOR)
+        checker = PythonChecker(self.file_path, text, reporter, self.options)
+        # The encoding is declared by the module, not the definition.
+        for line in lines[:2]:
+            match = PythonChecker.encoding_pattern.search(line)
+            if match:
+                checker.encoding = match.group(1).lower()
+        checker.check_text()
+        checker.tree = tree
+        checker.check_flakes_tree(tree, known_names=self.module_names)
+        checker.check_doctests()
+        checker.check_pep257()
+        diagnostics = [
+            diagnostic for diagnostic in reporter.diagnostics
+            if diagnostic.rule not in MODULE_DOCSTRING_RULES and
+            diagnostic.message != MODULE_DOCSTRING_MESSAGE]
+        diagnostics = self._offset(diagnostics, first - 1)
+        # pep8's blank line rules need the lines before the definition.
+        context = []
+        line_no = first - 1
+        while line_no > 0 and (
+                not lines[line_no - 1].strip() or
+                lines[line_no - 1].startswith('#')):
+            context.insert(0, lines[line_no - 1])
+            line_no -= 1
+        if line_no > 0:
+            context.insert(0, 'pass')
+        reporter = Reporter(Reporter.COLLECTOR)
+        checker.set_reporter(reporter)
+        pep8_lines = [
+            line + '\n' for line in context + lines[first - 1:last]]
+        checker.check_pep8(lines=pep8_lines)
+        diagnostics.extend(self._offset(
+            reporter.diagnostics, first - 1 - len(context), len(context)))
+        return diagnostics
+
+    def _module_references(self, tree):
+        """Return the module names that the definition uses or binds."""
+        names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and node.id in self.module_names:
+                names.add(node.id)
+            elif isinstance(node, (ast.Global, getattr(ast, 'Nonlocal', ()))):
+                names.update(node.names)
+        return names
+
+    def _old_module_references(self, first):
+        """Return the module names that the definition used before."""
+        lines = self.text.splitlines()
+        for block_first, block_last, name in self.blocks:
+            if block_first == first:
+                text = '\n'.join(lines[block_first - 1:block_last]) + '\n'
+                tree = compile(
+                    text, self.file_path, 'exec', _ast.PyCF_ONLY_AST)
+                return self._module_references(tree)
+        return None
+
+    def _merge(self, text, diagnostics, old_first, old_last, delta):
+        """Replace the diagnostics of the old region with the new ones.
+
+        The file-wide newline check is repeated because it is cheap.
+        """
+        merged = []
+        for diagnostic in self.diagnostics:
+            if diagnostic.rule == 'windows-newlines':
+                continue
+            if diagnostic.line < old_first:
+                merged.append(diagnostic)
+            elif diagnostic.line > old_last:
+                merged.append(
+                    diagnostic._replace(line=diagnostic.line + delta))
+        merged.extend(diagnostics)
+        reporter = Reporter(Reporter.COLLECTOR)
+        checker = AnyTextChecker(self.file_path, text, reporter, self.options)
+        checker.check_windows_endlines()
+        merged.extend(reporter.diagnostics)
+        for block in self.blocks:
+            if block[0] > old_last:
+                block[0] += delta
+            if block[1] >= old_last:
+                block[1] += delta
+        self.text = text
+        self.diagnostics = self._sorted(merged)
+
+    @staticmethod
+    def _sorted(diagnostics):
+        return sorted(diagnostics, key=lambda diagnostic: diagnostic.line)
@@ -3,47 +3,155 @@
 """Reporting and output helpers."""
 
 __all__ = [
+    'ConsoleWriter',
     'css_report_handler',
+    'Diagnostic',
+    'FileReport',
+    'report_diagnostic',
+    'ReportAggregator',
     'Reporter',
 ]
 
+import atexit
+from collections import namedtuple
 from contextlib import contextmanager
-import logging
+import json
 import os
 import re
 import sys
+import threading
 
+try:
+    from urllib.request import pathname2url
+except ImportError:
+    from urllib import pathname2url
 
-class ConsoleHandler(logging.StreamHandler):
-    """A handler that logs to console."""
 
-    def __init__(self):
-        logging.StreamHandler.__init__(self)
-        self.stream = None  # Not used.
+class ConsoleWriter(object):
+    """Write lines to the console in batches.
 
-    def emit(self, record):
-        self.__emit(record, sys.stdout)
+    The lines are kept until flush() is called, or until max_lines are
+    kept; the output is the same as one write per line. The stream is
+    sys.stdout when it is None; it is looked up when the lines are written.
+    """
 
-    def __emit(self, record, stream):
+    def __init__(self, stream=None, max_lines=1024):
         self.stream = stream
-        logging.StreamHandler.emit(self, record)
+        self.max_lines = max_lines
+        self._lines = []
+
+    def write_line(self, line):
+        """Write the line and a newline."""
+        self._lines.append(line)
+        if len(self._lines) >= self.max_lines:
+            self.flush()
 
     def flush(self):
-        is_flushable = self.stream and hasattr(self.stream, 'flush')
-        if is_flushable and not self.stream.closed:
-            logging.StreamHandler.flush(self)
+        """Write the lines that are kept."""
+        if not self._lines:
+            return
+        lines = self._lines
+        self._lines = []
+        stream = self.stream or sys.stdout
+        if stream is None or getattr(stream, 'closed', False):
+            return
+        lines.append('')
+        stream.write('\n'.join(lines))
+        stream.flush()
+
+
+# The console of all the CONSOLE reporters; the lines are written in the
+# order they were reported.
+console = ConsoleWriter()
+atexit.register(console.flush)
+
+
+class Diagnostic(namedtuple(
+        'Diagnostic', ['path', 'line', 'column', 'rule', 'severity',
+                       'message'])):
+    """A problem found in a file.
+
+    The path is None when the file is unknown. The column counts from 1; it
+    is 0 and the rule is None when the tool does not provide them. The
+    severity is the icon name: 'error', 'info', or None.
+    """
+    __slots__ = ()
+
+    @property
+    def base_dir(self):
+        if self.path is None:
+            return None
+        return os.path.dirname(self.path)
 
+    @property
+    def file_name(self):
+        if self.path is None:
+            return None
+        return os.path.basename(self.path)
 
-logger = logging.getLogger()
-logger.propagate = False
-logger.addHandler(ConsoleHandler())
+
+def report_diagnostic(reporter, diagnostic):
+    """Send the Diagnostic to the reporter.
+
+    Reporters that only provide the __call__ signature are passed the
+    diagnostic's fields.
+    """
+    report = getattr(reporter, 'report', None)
+    if report is not None:
+        report(diagnostic)
+    else:
+        reporter(
+            diagnostic.line, diagnostic.message, icon=diagnostic.severity,
+            base_dir=diagnostic.base_dir, file_name=diagnostic.file_name)
+
+
+# The SARIF levels of the severities.
+SARIF_LEVELS = {
+    'error': 'error',
+    'info': 'note',
+    None: 'warning',
+    }
+SARIF_HEADER = (
+    '{"$schema": "https://json.schemastore.org/sarif-2.1.0.json", '
+    '"version": "2.1.0", "runs": [{"tool": {"driver": {'
+    '"name": "pocketlint", '
+    '"informationUri": "https://launchpad.net/pocket-lint"}}, '
+    '"results": [')
+
+
+def get_sarif_result(diagnostic):
+    """Return the SARIF result of the Diagnostic."""
+    result = {
+        'level': SARIF_LEVELS.get(diagnostic.severity, 'warning'),
+        'message': {'text': diagnostic.message},
+        }
+    if diagnostic.rule is not None:
+        result['ruleId'] = diagnostic.rule
+    if diagnostic.path is not None:
+        uri = pathname2url(diagnostic.path)
+        if os.path.isabs(diagnostic.path):
+            uri = 'file://' + uri
+        location = {'artifactLocation': {'uri': uri}}
+        # Line 0 is the whole file.
+        if diagnostic.line and diagnostic.line > 0:
+            location['region'] = {'startLine': diagnostic.line}
+            if diagnostic.column > 0:
+                location['region']['startColumn'] = diagnostic.column
+        result['locations'] = [{'physicalLocation': location}]
+    return result
 
 
 class Reporter(object):
-    """Common rules for checkers."""
+    """Common rules for checkers.
+
+    The CONSOLE, JSONL and SARIF reports are written to the console as
+    each file is checked; close() finishes them.
+    """
     CONSOLE = object()
     FILE_LINES = object()
     COLLECTOR = object()
+    JSONL = object()
+    SARIF = object()
 
     def __init__(self, report_type, treeview=None):
         self.report_type = report_type
@@ -52,95 +160,341 @@ class Reporter(object):
             self.treestore = self.file_lines_view.get_model()
         self.piter = None
         self._last_file_name = None
+        self._last_path = None
         self.call_count = 0
+        self.error_count = 0
+        self.file_count = 0
         self.error_only = False
         self.messages = []
+        self.diagnostics = []
+        self._sarif_started = False
 
     def __call__(self, line_no, message, icon=None,
                  base_dir=None, file_name=None):
         """Report a message."""
         if self.error_only and icon != 'error':
             return
+        if file_name is None:
+            path = None
+        else:
+            path = os.path.join(base_dir or '', file_name)
+        self.report(Diagnostic(path, line_no, 0, None, icon, message))
+
+    def report(self, diagnostic):
+        """Report a Diagnostic."""
+        if self.error_only and diagnostic.severity != 'error':
+            return
         self.call_count += 1
-        args = (line_no, message, icon, base_dir, file_name)
+        if diagnostic.severity == 'error':
+            self.error_count += 1
+        if diagnostic.path is not None and diagnostic.path != self._last_path:
+            self._last_path = diagnostic.path
+            self.file_count += 1
         if self.report_type == self.FILE_LINES:
-            self._message_file_lines(*args)
+            self._message_file_lines(diagnostic)
         elif self.report_type == self.COLLECTOR:
-            self._message_collector(*args)
+            self._message_collector(diagnostic)
+        elif self.report_type == self.JSONL:
+            self._message_jsonl(diagnostic)
+        elif self.report_type == self.SARIF:
+            self._message_sarif(diagnostic)
         else:
-            self._message_console(*args)
+            self._message_console(diagnostic)
+
+    @property
+    def writes_console(self):
+        """True when the report is written to the console."""
+        return self.report_type in (self.CONSOLE, self.JSONL, self.SARIF)
+
+    @property
+    def exit_code(self):
+        """The number of messages, up to the largest exit status."""
+        return min(self.call_count, 255)
+
+    def flush(self):
+        """Write the console messages that are buffered."""
+        if self.writes_console:
+            console.flush()
 
-    def _message_console(self, line_no, message, icon=None,
-                         base_dir=None, file_name=None):
+    def close(self):
+        """Finish the report; return the exit code.
+
+        The JSONL report ends with a summary record; the SARIF report ends
+        with the invocation that has the exit code.
+        """
+        if self.report_type == self.JSONL:
+            console.write_line(json.dumps({'summary': {
+                'messages': self.call_count,
+                'errors': self.error_count,
+                'files': self.file_count,
+                'exit_code': self.exit_code,
+                }}, sort_keys=True))
+        elif self.report_type == self.SARIF:
+            if not self._sarif_started:
+                console.write_line(SARIF_HEADER)
+            console.write_line('], "invocations": [%s]}]}' % json.dumps({
+                'executionSuccessful': True,
+                'exitCode': self.exit_code,
+                }, sort_keys=True))
+            self._sarif_started = False
+        self.flush()
+        return self.exit_code
+
+    def _message_jsonl(self, diagnostic):
+        """Write the diagnostic as a JSON record on one line."""
+        console.write_line(json.dumps(
+            dict(zip(diagnostic._fields, diagnostic)), sort_keys=True))
+
+    def _message_sarif(self, diagnostic):
+        """Write the diagnostic as a result of the SARIF run."""
+        if self._sarif_started:
+            separator = ','
+        else:
+            console.write_line(SARIF_HEADER)
+            separator = ''
+            self._sarif_started = True
+        console.write_line(separator + json.dumps(
+            get_sarif_result(diagnostic), sort_keys=True))
+
+    def _message_console(self, diagnostic):
         """Print the messages to the console."""
-        self._message_console_group(base_dir, file_name)
-        logger.error('    %4s: %s' % (line_no, message))
+        self._message_console_group(diagnostic)
+        console.write_line(
+            '    %4s: %s' % (diagnostic.line, diagnostic.message))
+
+    def _message_console_group(self, diagnostic):
+        """Print the file name is it has not been seen yet.
 
-    def _message_console_group(self, base_dir, file_name):
-        """Print the file name is it has not been seen yet."""
-        source = (base_dir, file_name)
-        if file_name is not None and source != self._last_file_name:
+        The messages of the previous file are written first.
+        """
+        source = (diagnostic.base_dir, diagnostic.file_name)
+        if diagnostic.path is not None and source != self._last_file_name:
             self._last_file_name = source
-            logger.error('%s' % os.path.join('./', base_dir, file_name))
+            console.flush()
+            console.write_line('%s' % os.path.join('./', diagnostic.path))
 
-    def _message_file_lines(self, line_no, message, icon=None,
-                            base_dir=None, file_name=None):
+    def _message_file_lines(self, diagnostic):
         """Display the messages in the file_lines_view."""
+        file_name = diagnostic.file_name
+        base_dir = diagnostic.base_dir
         if self.piter is None:
             mime_type = 'gnome-mime-text'
             self.piter = self.treestore.append(
                 None, (file_name, mime_type, 0, None, base_dir))
         self.treestore.append(
-            self.piter, (file_name, icon, line_no, message, base_dir))
+            self.piter, (file_name, diagnostic.severity, diagnostic.line,
+                         diagnostic.message, base_dir))
 
-    def _message_collector(self, line_no, message, icon=None,
-                           base_dir=None, file_name=None):
-        self._last_file_name = (base_dir, file_name)
-        self.messages.append((line_no, message))
+    def _message_collector(self, diagnostic):
+        self._last_file_name = (diagnostic.base_dir, diagnostic.file_name)
+        self.messages.append((diagnostic.line, diagnostic.message))
+        self.diagnostics.append(diagnostic)
 
 
-class CSSReporterHandler(logging.Handler):
-    """A logging handler that uses the checker to report issues."""
+class FileReport(object):
+    """The diagnostics of one file, kept by the worker that checks it.
 
-    error_pattern = re.compile(
-        r'(?P<issue>[^(]+): \((?P<text>[^,]+, [^,]+), (?P<lineno>\d+).*')
-    message_pattern = re.compile(
-        r'(?P<issue>[^:]+:[^:]+): (?P<text>.*) (?P<lineno>0)$')
+    A FileReport is a reporter that shares nothing, so each thread,
+    process or task can check a file with its own. The diagnostics are
+    tuples that can be pickled. A ReportAggregator merges the reports.
 
-    def __init__(self, checker):
-        logging.Handler.__init__(self, logging.INFO)
-        self.checker = checker
+    :param index: The position of the file in the run, from 0.
+    :param path: The path of the file.
+    """
 
-    def handleError(self, record):
-        pass
+    def __init__(self, index, path=None):
+        self.index = index
+        self.path = path
+        self.diagnostics = []
 
-    def emit(self, record):
-        if record.levelname == 'ERROR':
-            icon = 'error'
+    def __call__(self, line_no, message, icon=None,
+                 base_dir=None, file_name=None):
+        """Report a message."""
+        if file_name is None:
+            path = None
         else:
-            icon = 'info'
-        matches = self.checker.message_pattern.search(record.getMessage())
-        if matches is None:
-            matches = self.error_pattern.search(record.getMessage())
-        try:
-            issue = matches.group('issue')
-            text = matches.group('text')
-            if 'Level 2.1' in issue and issue.endswith('rem'):
-                # Do not suggest that using CSS3 is bad.
+            path = os.path.join(base_dir or '', file_name)
+        self.report(Diagnostic(path, line_no, 0, None, icon, message))
+
+    def report(self, diagnostic):
+        """Keep the Diagnostic."""
+        self.diagnostics.append(diagnostic)
+
+
+class ReportAggregator(object):
+    """Merge the FileReports of concurrent workers into one reporter.
+
+    The reports are passed to the reporter in the order of their index,
+    whatever order they are added in; a report waits until the reports
+    before it are merged. add() can be called from any thread, but only
+    one report is merged at a time. The reporter sees the same calls as
+    when the files are checked one after another, so its totals and the
+    grouping of its messages by file are the same.
+
+    :param reporter: A Reporter, or a callable with its signature.
+    :param start: The index of the first report.
+    """
+
+    def __init__(self, reporter, start=0):
+        self.reporter = reporter
+        self._next_index = start
+        self._waiting = {}
+        self._lock = threading.Lock()
+
+    @property
+    def waiting(self):
+        """The number of reports that wait for the reports before them."""
+        return len(self._waiting)
+
+    def add(self, file_report):
+        """Merge the report, and the waiting reports that follow it."""
+        with self._lock:
+            self._waiting[file_report.index] = file_report
+            while self._next_index in self._waiting:
+                self._merge(self._waiting.pop(self._next_index))
+                self._next_index += 1
+
+    def close(self):
+        """Merge the waiting reports in order, though some are missing."""
+        with self._lock:
+            for index in sorted(self._waiting):
+                self._merge(self._waiting.pop(index))
+                self._next_index = index + 1
+
+    def _merge(self, file_report):
+        for diagnostic in file_report.diagnostics:
+            report_diagnostic(self.reporter, diagnostic)
+        flush = getattr(self.reporter, 'flush', None)
+        if flush is not None:
+            flush()
+
+
+class CSSReporterHandler(object):
+    """Report the problems that cssutils logs during a parse to a checker.
+
+    The problems are read from the arguments of cssutils' log calls: the
+    message, and the token that has the line and column. When no token is
+    passed, the (type, value, line, col) token tuple is read from the log
+    args, or from the end of the message that cssutils formatted with it.
+    """
+
+    # The icons of the cssutils log calls; debug calls are not reported.
+    icons = {
+        'debug': None,
+        'info': 'info',
+        'warn': 'info',
+        'warning': 'info',
+        'error': 'error',
+        'critical': 'error',
+        'fatal': 'error',
+        }
+
+    token_pattern = re.compile(
+        r'^(?P<message>.+): \((?P<value>[^,]+, [^,]+), '
+        r'(?P<line>\d+), (?P<col>\d+)\)$', re.DOTALL)
+
+    def __init__(self, checker):
+        self.checker = checker
+
+    def handle(self, icon, message, token=None, args=None):
+        """Report the message at the token."""
+        message = '%s' % message
+        if token is None:
+            token = self.find_token(args)
+        if token is None:
+            match = self.token_pattern.match(message)
+            if match is None:
+                self.checker.message(0, message, icon=icon)
                 return
-            line_no = matches.group('lineno')
-            message = "%s: %s" % (issue, text)
-        except AttributeError:
-            line_no = 0
-            message = record.getMessage()
-        self.checker.message(int(line_no), message, icon=icon)
+            message, value = match.group('message', 'value')
+            line_no, column = int(match.group('line')), int(match.group('col'))
+        elif isinstance(token, tuple):
+            value, line_no, column = token[1:4]
+        else:
+            value, line_no, column = token.value, token.line, token.col
+        if 'Level 2.1' in message and message.endswith('rem'):
+            # Do not suggest that using CSS3 is bad.
+            return
+        self.checker.message(
+            line_no, '%s: %s' % (message, value), icon=icon, column=column)
+
+    @staticmethod
+    def find_token(args):
+        """Return the (type, value, line, col) token in the args, or None."""
+        if not isinstance(args, (tuple, list)):
+            args = [args]
+        for arg in args:
+            if (isinstance(arg, tuple) and len(arg) >= 4 and
+                    isinstance(arg[2], int) and isinstance(arg[3], int)):
+                return arg
+        return None
+
+
+# The CSSReporterHandler of the parse in each thread.
+_css_parse = threading.local()
+_css_hooks_lock = threading.Lock()
+# The number of checks that are using the hooks of each ErrorHandler.
+_css_hooks_users = {}
+
+
+def _make_css_hook(error_handler, name, icon):
+    """Return the hook for the error_handler's log call name."""
+    log_call = type(error_handler).__getattr__
+
+    def hook(msg='', token=None, error=None, neverraise=False, args=None):
+        handler = getattr(_css_parse, 'handler', None)
+        if handler is None:
+            # The parse was not started by pocketlint.
+            return log_call(error_handler, name)(
+                msg, token=token, error=error, neverraise=neverraise,
+                args=args)
+        if icon is not None and error_handler.enabled:
+            handler.handle(icon, msg, token, args)
+
+    return hook
+
+
+def install_css_hooks(error_handler):
+    """Send cssutils' log calls to the handler of the current thread.
+
+    All cssutils ErrorHandlers share their state, so the hooks are set
+    by the first check that is running, and are found before the log calls
+    of the ErrorHandler class. Each call must be paired with a call to
+    uninstall_css_hooks().
+    """
+    with _css_hooks_lock:
+        key = id(error_handler.__dict__)
+        users = _css_hooks_users.get(key, 0)
+        if users == 0:
+            for name, icon in CSSReporterHandler.icons.items():
+                setattr(error_handler, name, _make_css_hook(
+                    error_handler, name, icon))
+        _css_hooks_users[key] = users + 1
+
+
+def uninstall_css_hooks(error_handler):
+    """Restore cssutils' log calls when the last check is done."""
+    with _css_hooks_lock:
+        key = id(error_handler.__dict__)
+        users = _css_hooks_users.pop(key) - 1
+        if users > 0:
+            _css_hooks_users[key] = users
+            return
+        for name in CSSReporterHandler.icons:
+            error_handler.__dict__.pop(name, None)
 
 
 @contextmanager
-def css_report_handler(checker, log_name):
-    handler = CSSReporterHandler(checker)
-    log = logging.getLogger(log_name)
-    log.addHandler(handler)
-    log.propagate = False
-    yield log
-    log.removeHandler(handler)
+def css_report_handler(checker, error_handler):
+    """Report the problems of cssutils parses in this thread to the checker.
+
+    :param error_handler: The cssutils.log ErrorHandler.
+    """
+    install_css_hooks(error_handler)
+    previous = getattr(_css_parse, 'handler', None)
+    _css_parse.handler = CSSReporterHandler(checker)
+    try:
+        yield _css_parse.handler
+    finally:
+        _css_parse.handler = previous
+        uninstall_css_hooks(error_handler)
@@ -0,0 +1,182 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+"""A streaming tokenizer of SQL that finds the literals and comments."""
+
+from __future__ import (
+    absolute_import,
+    unicode_literals,
+    with_statement,
+)
+
+__all__ = [
+    'SQL_DIALECTS',
+    'SQLScanner',
+]
+
+
+import re
+
+
+SQL_DIALECTS = ['standard', 'mysql']
+
+# The states of the scanner.
+CODE = 'code'
+STRING = 'string'
+IDENTIFIER = 'identifier'
+COMMENT = 'comment'
+DOLLAR_STRING = 'dollar string'
+
+# The openers of literals and comments. Standard SQL doubles the quotes
+# in literals; PostgreSQL adds E'' strings with backslash escapes, nested
+# comments and $tag$ strings. MySQL escapes with backslashes.
+STANDARD_OPENER_PATTERN = re.compile(
+    r"--|/\*|(?<![\w$])[eE]'|'|\"|(?<![\w$])\$(?:[^\W\d]\w*)?\$",
+    re.UNICODE)
+MYSQL_OPENER_PATTERN = re.compile(r"--(?=\s|$)|#|/\*|'|\"|`")
+
+# The bodies of the literals; the literal is closed when the body is
+# followed by the quote. A backslash at the end of a line escapes the
+# newline.
+BODY_PATTERNS = {
+    "'": re.compile(r"(?:[^']|'')*"),
+    '"': re.compile(r'(?:[^"]|"")*'),
+    '`': re.compile(r'(?:[^`]|``)*'),
+    "\\'": re.compile(r"(?:[^'\\]|''|\\.|\\$)*"),
+    '\\"': re.compile(r'(?:[^"\\]|""|\\.|\\$)*'),
+    }
+STANDARD_COMMENT_PATTERN = re.compile(r'/\*|\*/')
+MYSQL_COMMENT_PATTERN = re.compile(r'\*/')
+
+UNCLOSED = {
+    STRING: 'Unclosed string.',
+    IDENTIFIER: 'Unclosed quoted identifier.',
+    COMMENT: 'Unclosed comment.',
+    DOLLAR_STRING: 'Unclosed dollar-quoted string.',
+    }
+
+# The character that replaces the text of literals.
+MASK = 'x'
+
+
+class SQLScanner(object):
+    """Scan SQL line by line for its literals and comments.
+
+    Only the state at the end of the line is kept between lines, so a dump
+    of any size is scanned in constant memory. scan_line() returns the line
+    with the text inside string literals and quoted identifiers masked, so
+    the checks of the line do not see the data. After close(), problems is
+    a list of the (line, column, message) of the unclosed literals and
+    comments, counting from 1.
+
+    :param dialect: 'standard' SQL with the PostgreSQL extensions, or
+        'mysql', which escapes quotes with backslashes.
+    """
+
+    def __init__(self, dialect='standard'):
+        if dialect not in SQL_DIALECTS:
+            raise ValueError('Unknown SQL dialect: %s' % dialect)
+        self.is_mysql = dialect == 'mysql'
+        if self.is_mysql:
+            self._opener_pattern = MYSQL_OPENER_PATTERN
+            self._comment_pattern = MYSQL_COMMENT_PATTERN
+        else:
+            self._opener_pattern = STANDARD_OPENER_PATTERN
+            self._comment_pattern = STANDARD_COMMENT_PATTERN
+        self.line_no = 0
+        self.problems = []
+        self._state = CODE
+        # The key of the body pattern, the tag of a dollar string, or the
+        # depth of a comment.
+        self._closer = None
+        # The (line, column) where the literal or comment started.
+        self._start = None
+
+    def scan_line(self, line):
+        """Scan the next line, without its newline; return it masked."""
+        self.line_no += 1
+        if self._state is CODE and not self._opener_pattern.search(line):
+            return line
+        parts = []
+        pos = 0
+        end = len(line)
+        while pos < end:
+            state = self._state
+            if state is CODE:
+                match = self._opener_pattern.search(line, pos)
+                if match is None:
+                    parts.append(line[pos:])
+                    break
+                parts.append(line[pos:match.end()])
+                pos = match.end()
+                self._open(match.group(), match.start())
+                if self._state is CODE:
+                    # A line comment.
+                    parts.append(line[pos:])
+                    break
+            elif state is COMMENT:
+                pos = self._scan_comment(line, pos, parts)
+            elif state is DOLLAR_STRING:
+                close = line.find(self._closer, pos)
+                if close == -1:
+                    parts.append(MASK * (end - pos))
+                    break
+                parts.append(MASK * (close - pos))
+                parts.append(self._closer)
+                pos = close + len(self._closer)
+                self._state = CODE
+            else:
+                body_end = BODY_PATTERNS[self._closer].match(line, pos).end()
+                parts.append(MASK * (body_end - pos))
+                if body_end == end:
+                    break
+                parts.append(line[body_end])
+                pos = body_end + 1
+                self._state = CODE
+        return ''.join(parts)
+
+    def close(self):
+        """Return the list of problems; the literal that is open is one."""
+        if self._state is not CODE:
+            line_no, column = self._start
+            self.problems.append((line_no, column, UNCLOSED[self._state]))
+            self._state = CODE
+        return self.problems
+
+    def _open(self, opener, offset):
+        """Enter the literal or comment that the opener starts."""
+        self._start = (self.line_no, offset + 1)
+        if opener in ('--', '#'):
+            return
+        if opener == '/*':
+            self._state = COMMENT
+            self._closer = 1
+        elif opener.startswith('$'):
+            self._state = DOLLAR_STRING
+            self._closer = opener
+        else:
+            quote = opener[-1]
+            if quote == "'" or (self.is_mysql and quote == '"'):
+                self._state = STRING
+            else:
+                self._state = IDENTIFIER
+            if opener[0] in 'eE' or (self.is_mysql and quote != '`'):
+                self._closer = '\\' + quote
+            else:
+                self._closer = quote
+
+    def _scan_comment(self, line, pos, parts):
+        """Scan the comment; return the position after it or the line."""
+        while True:
+            match = self._comment_pattern.search(line, pos)
+            if match is None:
+                parts.append(line[pos:])
+                return len(line)
+            parts.append(line[pos:match.end()])
+            pos = match.end()
+            if match.group() == '/*':
+                self._closer += 1
+                continue
+            self._closer -= 1
+            if self._closer == 0:
+                self._state = CODE
+                return pos
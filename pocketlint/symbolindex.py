@@ -0,0 +1,421 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+"""A persistent index of the top-level symbols of Python modules."""
+
+from __future__ import (
+    absolute_import,
+    unicode_literals,
+    with_statement,
+)
+
+__all__ = [
+    'get_module_symbols',
+    'SymbolIndex',
+]
+
+
+import _ast
+import ast
+import json
+import os
+import threading
+
+
+DEFINITION_NODES = tuple(
+    getattr(ast, name) for name in
+    ('FunctionDef', 'AsyncFunctionDef', 'ClassDef') if hasattr(ast, name))
+
+# Statements whose bodies bind names in the module namespace.
+COMPOUND_NODES = tuple(
+    getattr(ast, name) for name in (
+        'If', 'For', 'AsyncFor', 'While', 'With', 'AsyncWith', 'Try',
+        'TryExcept', 'TryFinally', 'TryStar', 'Match')
+    if hasattr(ast, name))
+
+LOOP_NODES = tuple(
+    getattr(ast, name) for name in ('For', 'AsyncFor') if hasattr(ast, name))
+
+WITH_NODES = tuple(
+    getattr(ast, name) for name in ('With', 'AsyncWith')
+    if hasattr(ast, name))
+
+try:
+    replace = os.replace
+except AttributeError:
+    # Python 2 renames over the file on POSIX.
+    replace = os.rename
+
+
+def _iter_bound_statements(body):
+    """Yield the statements that bind names in the namespace of body."""
+    for node in body:
+        yield node
+        if isinstance(node, COMPOUND_NODES):
+            for field in ('body', 'orelse', 'finalbody'):
+                for child in _iter_bound_statements(getattr(node, field, [])):
+                    yield child
+            for handler in getattr(node, 'handlers', []):
+                for child in _iter_bound_statements(handler.body):
+                    yield child
+            for case in getattr(node, 'cases', []):
+                for child in _iter_bound_statements(case.body):
+                    yield child
+
+
+def _target_names(target):
+    """Return the names bound by an assignment target."""
+    if isinstance(target, ast.Name):
+        return [target.id]
+    if isinstance(target, (ast.Tuple, ast.List)):
+        names = []
+        for element in target.elts:
+            names.extend(_target_names(element))
+        return names
+    if isinstance(target, getattr(ast, 'Starred', ())):
+        return _target_names(target.value)
+    return []
+
+
+def _pattern_names(node):
+    """Return the names bound by the patterns of a match statement."""
+    names = []
+    for case in node.cases:
+        for child in ast.walk(case.pattern):
+            for field in ('name', 'rest'):
+                name = getattr(child, field, None)
+                if isinstance(name, type('')):
+                    names.append(name)
+    return names
+
+
+def _global_names(node):
+    """Return the module names that the definition binds as globals."""
+    declared = set()
+    bound = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Global):
+            declared.update(child.names)
+        elif isinstance(child, ast.Name) and isinstance(
+                child.ctx, (ast.Store, ast.Del)):
+            bound.add(child.id)
+        elif isinstance(child, DEFINITION_NODES) and child is not node:
+            bound.add(child.name)
+        elif isinstance(child, (ast.Import, ast.ImportFrom)):
+            bound.update(
+                alias.asname or alias.name.split('.')[0]
+                for alias in child.names)
+    return declared & bound
+
+
+def _string_list(node):
+    """Return the strings in a list or tuple literal, or None."""
+    if not isinstance(node, (ast.List, ast.Tuple)):
+        return None
+    strings = []
+    for element in node.elts:
+        value = getattr(element, 'value', getattr(element, 's', None))
+        if not isinstance(value, type('')):
+            return None
+        strings.append(value)
+    return strings
+
+
+def get_module_symbols(tree, module_name='', is_package=False):
+    """Return the top-level definitions, imports and __all__ of the tree.
+
+    The result is a dict that can be stored as JSON:
+
+    * definitions: the names bound at the top level, and the names that
+      functions bind after declaring them global.
+    * imports: [module, name, lineno] for each `from module import name`;
+      relative modules are resolved with module_name and is_package.
+    * star_imports: the modules imported with `from module import *`.
+    * all: the names listed in __all__, or None.
+    * all_lineno: the line number of the __all__ assignment.
+    """
+    definitions = set()
+    imports = []
+    star_imports = []
+    all_names = None
+    all_lineno = 0
+    for node in _iter_bound_statements(tree.body):
+        if isinstance(node, DEFINITION_NODES):
+            definitions.add(node.name)
+            definitions.update(_global_names(node))
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                definitions.add(alias.asname or alias.name.split('.')[0])
+        elif isinstance(node, ast.ImportFrom):
+            module = resolve_module(
+                module_name, node.module, node.level, is_package)
+            for alias in node.names:
+                if alias.name == '*':
+                    star_imports.append(module)
+                    continue
+                definitions.add(alias.asname or alias.name)
+                imports.append([module, alias.name, node.lineno])
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                names = _target_names(target)
+                definitions.update(names)
+                if names == ['__all__']:
+                    all_names = _string_list(node.value)
+                    all_lineno = node.lineno
+        elif isinstance(node, (ast.AugAssign, getattr(ast, 'AnnAssign', ()))):
+            names = _target_names(node.target)
+            definitions.update(names)
+            if names == ['__all__'] and all_names is not None:
+                extra = _string_list(getattr(node, 'value', None))
+                if extra is None:
+                    all_names = None
+                else:
+                    all_names.extend(extra)
+        elif isinstance(node, LOOP_NODES):
+            definitions.update(_target_names(node.target))
+        elif isinstance(node, WITH_NODES):
+            for item in node.items:
+                if item.optional_vars is not None:
+                    definitions.update(_target_names(item.optional_vars))
+        elif isinstance(node, getattr(ast, 'Match', ())):
+            definitions.update(_pattern_names(node))
+    return {
+        'definitions': sorted(definitions),
+        'imports': imports,
+        'star_imports': star_imports,
+        'all': all_names,
+        'all_lineno': all_lineno,
+        }
+
+
+def resolve_module(module_name, module, level, is_package=False):
+    """Return the absolute name of a module imported from module_name."""
+    if not level:
+        return module
+    package = module_name.split('.')
+    if not is_package:
+        # A module's package is its parent.
+        level += 1
+    package = package[:max(len(package) - level + 1, 0)]
+    if module:
+        package.append(module)
+    return '.'.join(package)
+
+
+def get_module_name(file_path):
+    """Return the dotted module name and the root directory of file_path.
+
+    The package is found by climbing the directories with an __init__.py.
+    """
+    directory, file_name = os.path.split(os.path.abspath(file_path))
+    name = os.path.splitext(file_name)[0]
+    parts = [] if name == '__init__' else [name]
+    while os.path.isfile(os.path.join(directory, '__init__.py')):
+        directory, package = os.path.split(directory)
+        parts.insert(0, package)
+    return '.'.join(parts), directory
+
+
+class SymbolIndex(object):
+    """A persistent index of the top-level symbols of Python modules.
+
+    The index is stored as JSON in index_path. Each entry records the
+    modification time and size of the module so that only changed modules
+    are re-indexed. Modules are added from the trees that the checkers
+    build; a module that is needed by a check but is missing or stale is
+    parsed on demand.
+
+    The index is shared by the checks that run in threads, so its entries
+    are read and changed under a lock.
+    """
+
+    VERSION = 2
+
+    def __init__(self, index_path=None):
+        self.index_path = index_path
+        self.modules = {}
+        self.roots = set()
+        self.is_dirty = False
+        self._lock = threading.Lock()
+        if index_path and os.path.isfile(index_path):
+            self.load()
+
+    def load(self):
+        """Load the index from index_path."""
+        try:
+            with open(self.index_path, 'rt') as index_file:
+                data = json.load(index_file)
+        except (IOError, ValueError):
+            return
+        if data.get('version') != self.VERSION:
+            return
+        self.modules = data['modules']
+        self.roots = set(data['roots'])
+
+    def save(self):
+        """Save the index to index_path if it changed."""
+        with self._lock:
+            if not self.index_path or not self.is_dirty:
+                return
+            data = {
+                'version': self.VERSION,
+                'roots': sorted(self.roots),
+                'modules': self.modules,
+                }
+            temp_path = self.index_path + '.tmp'
+            with open(temp_path, 'wt') as index_file:
+                json.dump(data, index_file, sort_keys=True)
+            replace(temp_path, self.index_path)
+            self.is_dirty = False
+
+    @staticmethod
+    def _stamp(file_path):
+        """Return the modification time and size of file_path, or None."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return [stat.st_mtime, stat.st_size]
+
+    def is_current(self, module_name, file_path):
+        """Return True when the entry for the module is up to date."""
+        with self._lock:
+            entry = self.modules.get(module_name)
+        if entry is None or entry['path'] != os.path.abspath(file_path):
+            return False
+        return entry['stamp'] == self._stamp(file_path)
+
+    def update(self, file_path, tree=None):
+        """Index the module at file_path; return its name.
+
+        The tree is parsed from the file when it is not provided and the
+        entry is stale.
+        """
+        module_name, root = get_module_name(file_path)
+        with self._lock:
+            self.roots.add(root)
+        if self.is_current(module_name, file_path):
+            return module_name
+        if tree is None:
+            try:
+                with open(file_path, 'rb') as module_file:
+                    tree = compile(
+                        module_file.read(), file_path, 'exec',
+                        _ast.PyCF_ONLY_AST)
+            except (IOError, SyntaxError, ValueError, TypeError):
+                with self._lock:
+                    self.modules.pop(module_name, None)
+                    self.is_dirty = True
+                return module_name
+        is_package = os.path.basename(file_path) == '__init__.py'
+        entry = {
+            'path': os.path.abspath(file_path),
+            'stamp': self._stamp(file_path),
+            'symbols': get_module_symbols(tree, module_name, is_package),
+            }
+        with self._lock:
+            self.modules[module_name] = entry
+            self.is_dirty = True
+        return module_name
+
+    def find_path(self, module_name):
+        """Return the file path of the module, or None."""
+        parts = module_name.split('.')
+        with self._lock:
+            roots = sorted(self.roots)
+        for root in roots:
+            base = os.path.join(root, *parts)
+            for file_path in (
+                    base + '.py', os.path.join(base, '__init__.py')):
+                if os.path.isfile(file_path):
+                    return file_path
+        return None
+
+    def get_symbols(self, module_name):
+        """Return the symbols of the module, or None if it is unknown.
+
+        Missing and stale entries are re-indexed from the module's file.
+        """
+        with self._lock:
+            entry = self.modules.get(module_name)
+        if entry is not None and entry['stamp'] == self._stamp(entry['path']):
+            return entry['symbols']
+        file_path = self.find_path(module_name)
+        if file_path is None:
+            return None
+        self.update(file_path)
+        with self._lock:
+            entry = self.modules.get(module_name)
+        if entry is None:
+            return None
+        return entry['symbols']
+
+    def get_names(self, module_name, _seen=None):
+        """Return the set of names the module provides, or None if unknown.
+
+        The names include those from star imports. None is returned when
+        any module in the chain is unknown.
+        """
+        symbols = self.get_symbols(module_name)
+        if symbols is None:
+            return None
+        names = set(symbols['definitions'])
+        _seen = _seen or set()
+        _seen.add(module_name)
+        for star_module in symbols['star_imports']:
+            if star_module in _seen:
+                continue
+            exports = self.get_exports(star_module, _seen)
+            if exports is None:
+                return None
+            names.update(exports)
+        return names
+
+    def get_exports(self, module_name, _seen=None):
+        """Return the names a star import of the module binds, or None."""
+        symbols = self.get_symbols(module_name)
+        if symbols is None:
+            return None
+        if symbols['all'] is not None:
+            return set(symbols['all'])
+        names = self.get_names(module_name, _seen)
+        if names is None:
+            return None
+        return set(name for name in names if not name.startswith('_'))
+
+    def is_submodule(self, module_name, name):
+        """Return True if name is a module in the module_name package."""
+        return self.find_path('%s.%s' % (module_name, name)) is not None
+
+    def check_module(self, module_name):
+        """Yield (lineno, message) for the cross-module problems.
+
+        * A from-import of a name the target module does not provide.
+        * A name in __all__ that the module does not provide when it
+          star-imports other modules; pyflakes reports the other cases.
+
+        A module that defines a module-level __getattr__ (PEP 562) may
+        provide any name, so its names are not checked.
+        """
+        symbols = self.get_symbols(module_name)
+        if symbols is None:
+            return
+        for target, name, lineno in symbols['imports']:
+            if not target:
+                continue
+            names = self.get_names(target)
+            if names is None or name in names or '__getattr__' in names:
+                continue
+            if self.is_submodule(target, name):
+                continue
+            yield lineno, "Module '%s' does not define '%s'." % (target, name)
+        if symbols['all'] is None or not symbols['star_imports']:
+            return
+        names = self.get_names(module_name)
+        if names is None or '__getattr__' in names:
+            return
+        for name in symbols['all']:
+            if name in names or self.is_submodule(module_name, name):
+                continue
+            yield (
+                symbols['all_lineno'],
+                "__all__ lists '%s', which is not defined." % name)
@@ -0,0 +1,77 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+import os
+import shutil
+from tempfile import mkdtemp
+import unittest
+
+from pocketlint.formatcheck import (
+    check_file,
+    check_sources,
+    check_sources_concurrently,
+    get_option_parser,
+    Reporter,
+    ThreadPoolExecutor,
+)
+from pocketlint.reporter import ReportAggregator
+from pocketlint.tests import CheckerTestCase
+
+
+class TestConcurrentChecks(CheckerTestCase):
+    """Verify the concurrent checks report like the sequential checks."""
+
+    def setUp(self):
+        if ThreadPoolExecutor is None:
+            raise unittest.SkipTest('concurrent.futures is not installed.')
+        super(TestConcurrentChecks, self).setUp()
+        self.root = mkdtemp(prefix='pocketlint_')
+        self.sources = []
+        for number in range(12):
+            self.sources.append(self.write(
+                'module%02d.py' % number,
+                'import os\n\n\ndef f():  \n    return %d\n' % number))
+            self.sources.append(self.write(
+                'notes%02d.txt' % number, 'trailing %d \n' % number))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, name, text):
+        path = os.path.join(self.root, name)
+        with open(path, 'wt') as source:
+            source.write(text)
+        return path
+
+    def test_same_messages_in_source_order(self):
+        options, sources = get_option_parser().parse_args(self.sources)
+        count = check_sources(sources, options, self.reporter)
+        reporter = Reporter(Reporter.COLLECTOR)
+        concurrent_count = check_sources_concurrently(
+            sources, options, reporter, jobs=4)
+        self.assertEqual(count, concurrent_count)
+        self.assertEqual(self.reporter.diagnostics, reporter.diagnostics)
+        paths = []
+        for diagnostic in reporter.diagnostics:
+            if diagnostic.path not in paths:
+                paths.append(diagnostic.path)
+        self.assertEqual(self.sources, paths)
+
+    def test_check_file_reports_out_of_order(self):
+        options, sources = get_option_parser().parse_args(self.sources)
+        count = check_sources(sources, options, self.reporter)
+        reporter = Reporter(Reporter.COLLECTOR)
+        aggregator = ReportAggregator(reporter)
+        reports = [
+            check_file(index, file_path, options)
+            for index, file_path in enumerate(sources)]
+        for report in reversed(reports):
+            aggregator.add(report)
+        self.assertEqual(count, reporter.call_count)
+        self.assertEqual(self.reporter.diagnostics, reporter.diagnostics)
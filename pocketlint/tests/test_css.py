@@ -7,11 +7,16 @@ from __future__ import (
     unicode_literals,
 )
 
+import threading
+
+from pocketlint.cssscanner import CSSScanner
 from pocketlint.formatcheck import(
     CSSChecker,
     HAS_CSSUTILS,
     IS_PY3,
+    PocketLintOptions,
 )
+from pocketlint.reporter import Reporter
 from pocketlint.tests import CheckerTestCase
 from pocketlint.tests.test_text import TestAnyTextMixin
 
@@ -42,6 +47,61 @@ body {
     }
 """
 
+ill_formed_blocks = """\
+{ color: red; }
+@charset "utf-8"
+a { : red; margin: ; 1x: y; color: (red; }
+b { content: "open
+}
+}
+/* unclosed
+"""
+
+
+class TestCSSScanner(CheckerTestCase):
+    """Verify the fast CSS syntax scanner."""
+
+    def test_good_css(self):
+        self.assertEqual([], CSSScanner(good_css).scan())
+        self.assertEqual([], CSSScanner(css3).scan())
+
+    def test_at_rules_and_nesting(self):
+        css = (
+            '@import url(foo.css);\n'
+            '@media screen and (max-width: 10px), print {\n'
+            '    a { color: red }\n'
+            '    }\n'
+            '@page { margin: 1in; @top-center { content: "x" } }\n'
+            'a { --x: ; --y: {a: b}; &:hover { color: red } }\n'
+            'a { background: url(data:image/png;base64,AA==); }\n'
+            'a { filter: progid:DXImageTransform.Microsoft.Alpha(x=1); }\n')
+        self.assertEqual([], CSSScanner(css).scan())
+
+    def test_ill_formed_property(self):
+        self.assertEqual(
+            [(3, 10, "Unexpected ':' in the value of 'font-family'.")],
+            CSSScanner(ill_formed_property).scan())
+
+    def test_ill_formed_blocks(self):
+        self.assertEqual(
+            [(1, 1, "Expected a selector before '{'."),
+             (2, 1, "Expected ';' to end '@charset'."),
+             (3, 5, "Expected a property before ':'."),
+             (3, 18, "Expected a value for 'margin'."),
+             (3, 22, "Invalid property '1x'."),
+             (3, 42, "Expected ')' to match '(' from line 3 and instead "
+                     "saw '}'."),
+             (4, 14, 'Unclosed string.'),
+             (6, 1, "Unexpected '}'."),
+             (7, 1, 'Unclosed comment.')],
+            CSSScanner(ill_formed_blocks).scan())
+
+    def test_unclosed_block(self):
+        self.assertEqual(
+            [(1, 3, "Unclosed '{'."),
+             (2, 1, "Expected ':' after 'b'.")],
+            CSSScanner('a { color: red;\nb').scan())
+
 
 class TestCSS(CheckerTestCase):
     """Verify CSS integration."""
@@ -56,6 +116,27 @@ class TestCSS(CheckerTestCase):
         checker.check()
         self.assertEqual([], self.reporter.messages)
 
+    def test_fast_engine(self):
+        checker = CSSChecker('bogus', ill_formed_property, self.reporter)
+        checker.check()
+        self.assertEqual(
+            [(3, "Unexpected ':' in the value of 'font-family'."),
+             (2, 'I009: Wrong separator on property: value pair.')],
+            self.reporter.messages)
+        self.assertEqual('cssscan', self.reporter.diagnostics[0].rule)
+        self.assertEqual(10, self.reporter.diagnostics[0].column)
+
+    def test_cssutils_engine(self):
+        if not HAS_CSSUTILS:
+            return
+        options = PocketLintOptions()
+        options.css['engine'] = 'cssutils'
+        checker = CSSChecker(
+            'bogus', invalid_value, self.reporter, options=options)
+        checker.check()
+        self.assertEqual(1, len(self.reporter.messages))
+        self.assertIn('Invalid value for', self.reporter.messages[0][1])
+
     def test_ill_formed_property(self):
         if not HAS_CSSUTILS:
             return
@@ -74,6 +155,17 @@ class TestCSS(CheckerTestCase):
                 'font-family: Ubuntu\n    color: #333'),
             self.reporter.messages)
 
+    def test_cssutils_hooks_are_removed(self):
+        # The shared cssutils log is only hooked during the check.
+        if not HAS_CSSUTILS:
+            return
+        import cssutils
+        checker = CSSChecker('bogus', ill_formed_property, self.reporter)
+        checker.check_cssutils()
+        self.assertEqual(10, self.reporter.diagnostics[0].column)
+        for name in ('info', 'warn', 'error'):
+            self.assertNotIn(name, cssutils.log.__dict__)
+
     def test_invalid_value(self):
         if not HAS_CSSUTILS:
             return
@@ -88,6 +180,40 @@ class TestCSS(CheckerTestCase):
         self.assertIn('Invalid value for', message[1])
         self.assertIn('property: speckled: color', message[1])
 
+    def test_token_position(self):
+        if not HAS_CSSUTILS:
+            return
+        checker = CSSChecker('bogus', invalid_value, self.reporter)
+        checker.check_cssutils()
+        self.assertEqual(
+            [(2, 'Property: Invalid value for "CSS Level 2.1" '
+                 'property: speckled: color')],
+            self.reporter.messages)
+        self.assertEqual(5, self.reporter.diagnostics[0].column)
+        self.assertEqual('error', self.reporter.diagnostics[0].severity)
+
+    def test_threads(self):
+        # Each thread's parse reports to its own checker.
+        if not HAS_CSSUTILS:
+            return
+        reporters = [Reporter(Reporter.COLLECTOR) for index in range(8)]
+        texts = [invalid_value, good_css] * 4
+
+        def check(reporter, text):
+            for repeat in range(10):
+                CSSChecker('bogus', text, reporter).check_cssutils()
+
+        threads = [
+            threading.Thread(target=check, args=pair)
+            for pair in zip(reporters, texts)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for reporter, text in zip(reporters, texts):
+            expected = 10 if text is invalid_value else 0
+            self.assertEqual(expected, len(reporter.messages))
+
     def test_multiple_files(self):
         # The logging and handler for each instance is added and
         # removed between each call.
@@ -9,7 +9,8 @@ from __future__ import (
 from unittest import TestCase, main as unittest_main
 
 from pocketlint.contrib.cssccc import (
-    CSSCodingConventionChecker, CSSAtRule, CSSRuleSet, CSSStatementMember)
+    CSSCodingConventionChecker, CSSAtRule, CSSRuleSet, CSSStatementMember,
+    tokenize)
 
 
 class TestCSSCodingConventionChecker(TestCase):
@@ -260,6 +261,101 @@ class TestCSSCodingConventionChecker(TestCase):
         self.assertTrue(rule.type is CSSRuleSet.type)
         self.failUnlessRaises(StopIteration, lint.getNextRule)
 
+    def test_get_at_media_rule(self):
+        '''Test for @media
+
+        @media print {
+            html {
+                background: #fff;
+                }
+            }
+        '''
+        text = 'r1{st1}\n@media print {\n    html {\n        bg;\n}\n}\nr2{}'
+        lint = CSSCodingConventionChecker(text)
+        rule = lint.getNextRule()
+        self.assertTrue(rule.type is CSSRuleSet.type)
+        rule = lint.getNextRule()
+        self.assertTrue(rule.type is CSSAtRule.type)
+        self.assertEqual('media', rule.identifier)
+        self.assertEqual('\n@media print ', rule.keyword.text)
+        rule = lint.getNextRule()
+        self.assertTrue(rule.type is CSSRuleSet.type)
+        self.assertEqual('\n    html ', rule.selector.text)
+        self.assertEqual('\n        bg;\n', rule.declarations.text)
+        self.assertEqual('    ', rule.indent)
+        self.assertTrue(rule.first)
+        rule = lint.getNextRule()
+        self.assertTrue(rule.type is CSSRuleSet.type)
+        self.assertEqual('\nr2', rule.selector.text)
+        self.assertEqual('', rule.indent)
+        self.assertRaises(StopIteration, lint.getNextRule)
+
+    def test_get_unknown_at_rule(self):
+        text = '@-ms-viewport { width: 1px; }\n@foo bar;\nr2{st2}'
+        lint = CSSCodingConventionChecker(text)
+        rule = lint.getNextRule()
+        self.assertTrue(rule.type is CSSAtRule.type)
+        self.assertEqual(' width: 1px; ', rule.block.text)
+        rule = lint.getNextRule()
+        self.assertTrue(rule.type is CSSAtRule.type)
+        self.assertEqual('bar', rule.text.text)
+        rule = lint.getNextRule()
+        self.assertTrue(rule.type is CSSRuleSet.type)
+        self.assertEqual('st2', rule.declarations.text)
+
+    def test_getNextRule_at_sign_in_comment_and_braces_in_string(self):
+        text = '/* @import */\nr1 {\n    content: "{;}";\n}\n'
+        lint = CSSCodingConventionChecker(text)
+        rule = lint.getNextRule()
+        self.assertTrue(rule.type is CSSRuleSet.type)
+        self.assertEqual('r1 ', rule.selector.text)
+        self.assertEqual('\n    content: "{;}";\n', rule.declarations.text)
+
+    def test_check_media_rule(self):
+        text = (
+            'body {\n'
+            '    color: red;\n'
+            '    }\n'
+            '\n'
+            '@media print {\n'
+            '    html {\n'
+            '        background: #fff;\n'
+            '        }\n'
+            '\n'
+            '    body {\n'
+            '      padding: 1in;\n'
+            '        }\n'
+            '    }\n')
+        logs = []
+        lint = CSSCodingConventionChecker(
+            text, logger=lambda line, message, icon: logs.append(
+                (line, message[:4])))
+        lint.check()
+        self.assertEqual([(11, 'I008')], logs)
+
+
+class TestTokenize(TestCase):
+    '''Tests for tokenize.'''
+
+    def test_tokenize(self):
+        text = '@media a{b:"c;"/* d */}'
+        self.assertEqual(
+            [('at_keyword', '@media', 0),
+             ('text', ' a', 6),
+             ('delimiter', '{', 8),
+             ('text', 'b', 9),
+             ('delimiter', ':', 10),
+             ('string', '"c;"', 11),
+             ('comment', '/* d */', 15),
+             ('delimiter', '}', 22)],
+            tokenize(text))
+
+    def test_tokenize_bad_string_and_comment(self):
+        self.assertEqual(
+            [('bad_string', '"a', 0), ('text', '\n', 2),
+             ('bad_comment', '/* b', 3)],
+            tokenize('"a\n/* b'))
+
 
 class TestCSSStatementMember(TestCase):
     '''Tests for CSSStatementMember.'''
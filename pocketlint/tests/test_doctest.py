@@ -8,10 +8,16 @@ from __future__ import (
     with_statement,
 )
 
+import os
+import stat
 from tempfile import NamedTemporaryFile
 
+from pocketlint.formatcheck import check_source
 from pocketlint.formatdoctest import DoctestReviewer
-from pocketlint.tests import CheckerTestCase
+from pocketlint.tests import (
+    Bunch,
+    CheckerTestCase,
+    )
 
 
 good_doctest = """\
@@ -250,8 +256,9 @@ class TestDoctest(CheckerTestCase):
             "    >>> very_very_very_very_very.long_long_long_long("
             "method_method_method_method)\n"
             "    True\n\n\n")
-        self.file.seek(0)
-        text = self.file.read().decode('utf-8')
+        # The file was replaced; it is read again.
+        with open(self.file.name, 'rb') as doctest_file:
+            text = doctest_file.read().decode('utf-8')
         self.assertEqual(expected, text)
         self.assertEqual(expected, checker.doctest)
         # Source code issues cannot be fixed by the formatter.
@@ -259,3 +266,50 @@ class TestDoctest(CheckerTestCase):
         self.assertEqual(
             [(6, 'source exceeds 78 characters.')],
             self.reporter.messages)
+
+    def test_format_and_save_keeps_mode(self):
+        doctest = "narrative\n    >>> a = 1  \n"
+        self.write_to_file(self.file, doctest)
+        os.chmod(self.file.name, 0o640)
+        checker = DoctestReviewer(self.file.name, doctest, self.reporter)
+        checker.format_and_save()
+        self.assertEqual(0o640, stat.S_IMODE(os.stat(self.file.name).st_mode))
+        self.assertEqual(
+            [os.path.basename(self.file.name)],
+            [name for name in os.listdir(os.path.dirname(self.file.name))
+             if name.startswith(os.path.basename(self.file.name)) or
+             name.startswith('.' + os.path.basename(self.file.name))])
+
+    def test_format_and_save_unchanged(self):
+        doctest = good_doctest
+        for ignore in range(2):
+            doctest = DoctestReviewer(
+                self.file.name, doctest, self.reporter).format()
+        self.write_to_file(self.file, doctest)
+        inode = os.stat(self.file.name).st_ino
+        checker = DoctestReviewer(self.file.name, doctest, self.reporter)
+        checker.format_and_save()
+        self.assertIs(doctest, checker.doctest)
+        self.assertEqual(inode, os.stat(self.file.name).st_ino)
+
+    def test_format_and_check_parse_once(self):
+        self.write_to_file(self.file, good_doctest)
+        checker = DoctestReviewer(self.file.name, good_doctest, self.reporter)
+        parts = checker.get_parts()
+        checker.format()
+        checker.check()
+        self.assertIs(parts, checker.get_parts())
+        checker.doctest = malformed_doctest
+        self.assertIsNot(parts, checker.get_parts())
+
+    def test_check_source_checks_formatted_doctest(self):
+        doctest = "narrative  \n    >>> a = 1  \n"
+        with NamedTemporaryFile(
+                prefix='pocketlint_', suffix='.doctest') as doctest_file:
+            self.write_to_file(doctest_file, doctest)
+            options = Bunch(do_format=True, is_interactive=False)
+            check_source(doctest_file.name, doctest, options, self.reporter)
+            with open(doctest_file.name, 'rb') as saved_file:
+                text = saved_file.read().decode('utf-8')
+        self.assertEqual('narrative\n\n    >>> a = 1\n\n', text)
+        self.assertEqual([], self.reporter.messages)
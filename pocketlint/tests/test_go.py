@@ -7,16 +7,155 @@ from __future__ import (
     unicode_literals,
 )
 
-from pocketlint.formatcheck import GOChecker
+import os
+import shutil
+import stat
+import sys
+from tempfile import mkdtemp
+
+from pocketlint.formatcheck import (
+    check_sources,
+    get_option_parser,
+    GOChecker,
+)
 from pocketlint.tests import CheckerTestCase
 from pocketlint.tests.test_text import TestAnyTextMixin
 
 
+# A gofmt that reports a syntax error in files that contain "syntax error"
+# and lists the files that contain "unformatted". Each run is logged.
+stub_gofmt = """\
+import sys
+
+with open(%(log)r, 'a') as log:
+    log.write(' '.join(sys.argv[1:]) + '\\n')
+paths = [arg for arg in sys.argv[1:] if not arg.startswith('-')]
+if paths:
+    sources = []
+    for path in paths:
+        with open(path) as source:
+            sources.append((path, source.read()))
+else:
+    sources = [('<standard input>', sys.stdin.read())]
+returncode = 0
+for path, text in sources:
+    for line_no, line in enumerate(text.splitlines()):
+        if 'syntax error' in line:
+            sys.stderr.write(
+                '%%s:%%s:3: expected declaration\\n' %% (path, line_no + 1))
+            returncode = 2
+    if 'unformatted' in text:
+        sys.stdout.write(path + '\\n')
+sys.exit(returncode)
+"""
+
+
+# A go that only knows vet; it reports the first line of each file.
+stub_go = """\
+import os
+import sys
+
+assert sys.argv[1] == 'vet'
+sys.stderr.write('# main\\n')
+for path in sys.argv[2:]:
+    path = os.path.relpath(path)
+    sys.stderr.write('vet: ./%s:1:1: first line\\n' % path)
+sys.exit(1)
+"""
+
+
+class TestGoTools(CheckerTestCase):
+    """Verify the gofmt integration."""
+
+    def setUp(self):
+        super(TestGoTools, self).setUp()
+        self.root = mkdtemp(prefix='pocketlint_')
+        self.log = os.path.join(self.root, 'log')
+        self.gofmt = self.write(
+            'gofmt', '#!%s\n%s' % (
+                sys.executable, stub_gofmt % {'log': self.log}))
+        os.chmod(self.gofmt, stat.S_IRWXU)
+        self.go = self.write('go', '#!%s\n%s' % (sys.executable, stub_go))
+        os.chmod(self.go, stat.S_IRWXU)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, name, text):
+        path = os.path.join(self.root, name)
+        with open(path, 'wt') as source:
+            source.write(text)
+        return path
+
+    def check(self, text, command=None):
+        checker = GOChecker('bogus.go', text, self.reporter)
+        checker.options.gofmt['command'] = command or self.gofmt
+        checker.check_go_tools()
+
+    def test_syntax_error(self):
+        self.check('package main\n\nsyntax error\n')
+        self.assertEqual(
+            [(3, 'expected declaration')], self.reporter.messages)
+        diagnostic = self.reporter.diagnostics[0]
+        self.assertEqual(3, diagnostic.column)
+        self.assertEqual('gofmt', diagnostic.rule)
+        self.assertEqual('error', diagnostic.severity)
+
+    def test_unformatted(self):
+        self.check('package main\n// unformatted\n')
+        self.assertEqual(
+            [(0, 'File is not gofmt formatted.')], self.reporter.messages)
+
+    def test_good(self):
+        self.check('package main\n')
+        self.assertEqual([], self.reporter.messages)
+
+    def test_missing_gofmt(self):
+        self.check('package main\n\nsyntax error\n', 'pocketlint-no-gofmt')
+        self.assertEqual([], self.reporter.messages)
+
+    def test_check_sources_routes_problems(self):
+        good = self.write('good.go', 'package main\n')
+        bad = self.write('bad.go', 'package main\nsyntax error\n')
+        ugly = self.write('ugly.go', 'package main\n// unformatted\n')
+        parser = get_option_parser()
+        options, sources = parser.parse_args(
+            ['--gofmt', self.gofmt, good, bad, ugly])
+        check_sources(sources, options, self.reporter)
+        self.assertEqual(
+            [(2, 'expected declaration'),
+             (0, 'File is not gofmt formatted.')],
+            self.reporter.messages)
+        self.assertEqual(
+            [bad, ugly], [d.path for d in self.reporter.diagnostics])
+
+    def test_check_sources_runs_one_gofmt_process(self):
+        paths = [
+            self.write('%s.go' % name, 'package main\n')
+            for name in ('a', 'b', 'c')]
+        parser = get_option_parser()
+        options, sources = parser.parse_args(['--gofmt', self.gofmt] + paths)
+        check_sources(sources, options, self.reporter)
+        with open(self.log) as log:
+            runs = log.read().splitlines()
+        self.assertEqual(1, len(runs))
+
+    def test_go_vet(self):
+        path = self.write('main.go', 'package main\n')
+        checker = GOChecker(path, 'package main\n', self.reporter)
+        checker.options.gofmt.update(
+            {'command': self.gofmt, 'vet': True, 'vet_command': self.go})
+        checker.check_go_tools()
+        self.assertEqual([(1, 'first line')], self.reporter.messages)
+        self.assertEqual('go-vet', self.reporter.diagnostics[0].rule)
+
+
 class TestText(CheckerTestCase, TestAnyTextMixin):
     """Verify text integration."""
 
     def create_and_check(self, file_name, text, options=None):
         checker = GOChecker(file_name, text, self.reporter, options)
+        checker.options.gofmt['enabled'] = False
         checker.check()
 
     def test_long_length(self):
@@ -0,0 +1,164 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+import os
+import shutil
+from tempfile import mkdtemp
+
+from pocketlint.formatcheck import (
+    HTML5Checker,
+    Language,
+    UniversalChecker,
+)
+from pocketlint import formatcheck
+from pocketlint.html5scanner import HTML5Scanner
+from pocketlint.tests import CheckerTestCase
+
+
+good_markup = """\
+<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>hello&nbsp;world &copy; &#169; &#x1F600;</title>
+  <link rel=stylesheet href="site.css">
+<body>
+  <ul><li>one<li>two</ul>
+  <p>first<br>second<img src="a.png" alt="">
+  <svg><path d="M0 0"/></svg>
+  <script>if (a < b) { document.write("</div>"); }</script>
+  <table><tr><td>1<td>2</table>
+</body>
+</html>
+"""
+
+bad_markup = """\
+<!DOCTYPE html>
+<div><span>hello</div>
+<p class="a" class="b">&bogus; &#xD800;</p>
+</em>
+<section>
+"""
+
+
+class TestHTML5Scanner(CheckerTestCase):
+    """Verify the streaming HTML5 scanner."""
+
+    def scan(self, markup):
+        scanner = HTML5Scanner()
+        scanner.feed(markup)
+        return scanner.close()
+
+    def test_good_markup(self):
+        self.assertEqual([], self.scan(good_markup))
+
+    def test_bad_markup(self):
+        self.assertEqual(
+            [(2, 17, 'Expected </span> to close <span> from line 2 and '
+                     'instead saw </div>.'),
+             (3, 1, "Duplicate attribute 'class' in <p>."),
+             (3, 24, 'Unknown entity &bogus;.'),
+             (3, 32, 'Invalid character reference &#xD800;.'),
+             (4, 1, 'Unexpected end tag </em>.'),
+             (5, 1, 'Unclosed <section>.')],
+            self.scan(bad_markup))
+
+    def test_feed_bytes_in_chunks(self):
+        markup = '<!DOCTYPE html>\n<p>h\xe9llo</b>\n'.encode('utf-8')
+        scanner = HTML5Scanner()
+        for index in range(len(markup)):
+            scanner.feed(markup[index:index + 1])
+        self.assertEqual(
+            [(2, 9, 'Unexpected end tag </b>.')], scanner.close())
+
+
+class TestHTML5Checker(CheckerTestCase):
+    """Verify HTML5 integration."""
+
+    def create_and_check(self, file_name, text):
+        checker = HTML5Checker(file_name, text, self.reporter)
+        checker.check()
+
+    def test_good_markup(self):
+        self.create_and_check('bogus', good_markup)
+        self.assertEqual([], self.reporter.messages)
+
+    def test_bad_markup(self):
+        self.create_and_check('bogus', bad_markup)
+        self.assertEqual(
+            [(2, 'Expected </span> to close <span> from line 2 and '
+                 'instead saw </div>.'),
+             (3, "Duplicate attribute 'class' in <p>."),
+             (3, 'Unknown entity &bogus;.'),
+             (3, 'Invalid character reference &#xD800;.'),
+             (4, 'Unexpected end tag </em>.'),
+             (5, 'Unclosed <section>.')],
+            self.reporter.messages)
+        self.assertEqual(17, self.reporter.diagnostics[0].column)
+
+    def test_declares_html5(self):
+        self.assertTrue(HTML5Checker.declares_html5('bogus', good_markup))
+        self.assertTrue(HTML5Checker.declares_html5(
+            'bogus', '\ufeff<!-- a -->\n<!doctype HTML>\n'))
+        self.assertTrue(HTML5Checker.declares_html5(
+            'bogus',
+            '<!DOCTYPE html SYSTEM "about:legacy-compat">\n<html></html>'))
+        self.assertFalse(HTML5Checker.declares_html5(
+            'bogus', '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0//EN">'))
+        self.assertFalse(HTML5Checker.declares_html5('bogus', '<html/>'))
+
+    def test_universal_checker_dispatch(self):
+        # Void elements are errors for XML, but not for HTML5.
+        checker = UniversalChecker(
+            'bogus.html', good_markup, Language.HTML, self.reporter)
+        checker.check()
+        self.assertEqual([], self.reporter.messages)
+        checker = UniversalChecker(
+            'bogus.html', '<html><br></html>\n', Language.HTML, self.reporter)
+        checker.check()
+        self.assertEqual([(1, 'mismatched tag')], self.reporter.messages)
+
+
+class TestHTML5Stream(CheckerTestCase):
+    """Verify the streaming check of large HTML5 files."""
+
+    def setUp(self):
+        super(TestHTML5Stream, self).setUp()
+        self.root = mkdtemp(prefix='pocketlint_')
+        self.chunk_size = formatcheck.STREAM_CHUNK_SIZE
+        formatcheck.STREAM_CHUNK_SIZE = 7
+
+    def tearDown(self):
+        formatcheck.STREAM_CHUNK_SIZE = self.chunk_size
+        shutil.rmtree(self.root)
+
+    def check_stream(self, markup):
+        path = os.path.join(self.root, 'bogus.html')
+        with open(path, 'wb') as html_file:
+            html_file.write(markup.encode('utf-8'))
+        checker = UniversalChecker(path, None, Language.HTML, self.reporter)
+        checker.check()
+
+    def test_good_markup(self):
+        self.check_stream(good_markup)
+        self.assertEqual([], self.reporter.messages)
+
+    def test_bad_markup(self):
+        self.check_stream(bad_markup.replace('<section>', '<section>  '))
+        # The scanner's problems are reported after the line checks.
+        self.assertEqual(
+            [(5, 'Line has trailing whitespace.'),
+             (2, 'Expected </span> to close <span> from line 2 and '
+                 'instead saw </div>.'),
+             (3, "Duplicate attribute 'class' in <p>."),
+             (3, 'Unknown entity &bogus;.'),
+             (3, 'Invalid character reference &#xD800;.'),
+             (4, 'Unexpected end tag </em>.'),
+             (5, 'Unclosed <section>.')],
+            self.reporter.messages)
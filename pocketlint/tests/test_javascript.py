@@ -14,6 +14,7 @@ from pocketlint.formatcheck import(
     JavascriptChecker,
     JS
 )
+from pocketlint.jsscanner import JavaScriptScanner
 from pocketlint.tests import CheckerTestCase
 from pocketlint.tests.test_text import TestAnyTextMixin
 
@@ -73,9 +74,9 @@ class TestJavascript(CheckerTestCase):
         checker = JavascriptChecker(
             self.file.name, invalid_js, self.reporter)
         checker.options.closure_linter.update({
-                'enabled': True,
-                'ignore': [],
-                })
+            'enabled': True,
+            'ignore': [],
+            })
 
         checker.check()
 
@@ -91,9 +92,9 @@ class TestJavascript(CheckerTestCase):
         checker = JavascriptChecker(
             self.file.name, invalid_js, self.reporter)
         checker.options.closure_linter.update({
-                'enabled': True,
-                'ignore': [2],
-                })
+            'enabled': True,
+            'ignore': [2],
+            })
 
         checker.check()
 
@@ -105,15 +106,72 @@ class TestJavascript(CheckerTestCase):
         checker = JavascriptChecker(
             self.file.name, invalid_js, self.reporter)
         checker.options.closure_linter.update({
-                'enabled': False,
-                'ignore': [],
-                })
+            'enabled': False,
+            'ignore': [],
+            })
 
         checker.check()
 
         self.assertEqual([], self.reporter.messages)
 
 
+class TestJavaScriptScanner(CheckerTestCase):
+    """Verify the in-process scanner."""
+
+    def scan(self, script):
+        return JavaScriptScanner(script).scan()
+
+    def test_good(self):
+        script = (
+            'var a = {b: [1, 2], c: "}\\"]"};\n'
+            '/* ( */ // [\n'
+            'var r = /[/\\]]+/g, d = a.b[0] / 2 / 1;\n'
+            'function f() {\n'
+            '    return /}/.test(\'x\');\n'
+            '    }\n')
+        self.assertEqual([], self.scan(script))
+
+    def test_division_after_increment(self):
+        script = (
+            'var i = 4, j = i++ / 2;\n'
+            'var k = f(j-- / 2) / (i) / 1, s = k + /a/.source;\n')
+        self.assertEqual([], self.scan(script))
+
+    def test_unbalanced_brackets(self):
+        self.assertEqual(
+            [(1, 7, "Expected ')' to match '(' from line 1 and instead "
+                    "saw ']'.")],
+            self.scan('f(a, b];\n'))
+        self.assertEqual([(1, 1, "Unexpected '}'.")], self.scan('}\n'))
+        self.assertEqual(
+            [(2, 8, "Unclosed '{'.")], self.scan('\nif (a) {\n'))
+
+    def test_unclosed_string_comment_and_regex(self):
+        self.assertEqual(
+            [(1, 9, 'Unclosed string.')], self.scan("var s = 'a;\nb;\n"))
+        self.assertEqual(
+            [(2, 1, 'Unclosed comment.')], self.scan('a;\n/* b\n'))
+        self.assertEqual(
+            [(1, 9, 'Unclosed regular expression.')],
+            self.scan('var r = /ab;\n'))
+
+    def test_extra_comma(self):
+        self.assertEqual(
+            [(1, 14, 'Extra comma.'), (2, 13, 'Extra comma.')],
+            self.scan('var a = [1, 2,\n], b = {c: 1,\n};'))
+
+    def test_has_code(self):
+        scanner = JavaScriptScanner('// only a comment\n/* and more */\n')
+        scanner.scan()
+        self.assertFalse(scanner.has_code)
+
+    def test_checker_reports_scan(self):
+        checker = JavascriptChecker('bogus', 'f(a, b;\n', self.reporter)
+        checker.check()
+        self.assertEqual([(1, "Unclosed '('.")], self.reporter.messages)
+        self.assertEqual('jsscan', self.reporter.diagnostics[0].rule)
+
+
 class TestText(CheckerTestCase, TestAnyTextMixin):
     """Verify text integration."""
 
@@ -8,10 +8,37 @@ from __future__ import (
     unicode_literals,
 )
 
-from pocketlint.formatcheck import JSONChecker
+import os
+import shutil
+from tempfile import mkdtemp
+
+from pocketlint.formatcheck import (
+    JSONChecker,
+    JSONLinesChecker,
+    Language,
+    PocketLintOptions,
+    read_source,
+    UniversalChecker,
+)
+from pocketlint import formatcheck
+from pocketlint.jsonlines import (
+    check_records,
+    JSONLinesValidator,
+)
+from pocketlint.jsonscanner import JSONScanner
 from pocketlint.tests import CheckerTestCase
 
 
+good_json = """\
+{
+  "name": "pocketlint",
+  "tags": ["lint", "h\\u00e9llo", "\u2603"],
+  "version": [0, 1.5e3, -2],
+  "deps": {"pep8": null, "flakes": true, "none": {}, "empty": []}
+}
+"""
+
+
 class TestJSON(CheckerTestCase):
     """Verify JSON validation."""
 
@@ -111,3 +138,211 @@ class TestJSON(CheckerTestCase):
              'Extra data: line 2 column 1 - line 4 column 1 (char 3 - 7)')],
             self.reporter.messages)
         self.assertEqual(1, self.reporter.call_count)
+
+
+good_json_lines = """\
+{"name": "pocketlint", "tags": ["lint"]}
+[1, 2, 3]
+
+"h\u00e9llo"
+"""
+
+bad_json_lines = """\
+{"name": "pocketlint", "tags": ["lint"]}
+{"name": "pep8" "tags": []}
+[1, 2,
+"""
+
+
+class TestJSONScanner(CheckerTestCase):
+    """Verify the streaming JSON scanner."""
+
+    def scan(self, text, size=None):
+        scanner = JSONScanner()
+        if size is None:
+            scanner.feed(text)
+        else:
+            for index in range(0, len(text), size):
+                scanner.feed(text[index:index + size])
+        return scanner.close()
+
+    def test_good_json(self):
+        self.assertEqual([], self.scan(good_json))
+
+    def test_good_json_in_chunks(self):
+        data = good_json.encode('utf-8')
+        for size in (1, 2, 3, 5):
+            self.assertEqual([], self.scan(data, size))
+
+    def test_errors(self):
+        self.assertEqual(
+            [(2, 3, "Expecting ',' delimiter: line 2 column 3 (char 10)")],
+            self.scan('{"a": 1\n  "b" 2}'))
+        self.assertEqual(
+            [(1, 2, 'Unterminated string starting at: '
+                    'line 1 column 2 (char 1)')],
+            self.scan('["abc', 1))
+        self.assertEqual(
+            [(1, 5, 'Invalid control character at: '
+                    'line 1 column 5 (char 4)')],
+            self.scan('["ab\tc"]', 2))
+        self.assertEqual(
+            [(1, 2, 'Expecting value: line 1 column 2 (char 1)')],
+            self.scan('[-]', 1))
+
+    def test_numbers_and_literals_across_chunks(self):
+        self.assertEqual([], self.scan('[12345.5e-3, -Infinity, true]', 1))
+        self.assertEqual(
+            [(1, 3, "Expecting ',' delimiter: line 1 column 3 (char 2)")],
+            self.scan('[1.]', 1))
+
+    def test_same_as_json_module(self):
+        # The messages and positions match json.loads().
+        self.assertEqual(
+            [(2, 1, 'Expecting property name enclosed in double quotes: '
+                    'line 2 column 1 (char 2)')],
+            self.scan('{\n1: "something"}\n'))
+        self.assertEqual(
+            [(2, 1, 'Extra data: line 2 column 1 (char 3)')],
+            self.scan('{}\n}\n}\n'))
+
+
+class TestJSONStream(CheckerTestCase):
+    """Verify the streaming check of large JSON files."""
+
+    def setUp(self):
+        super(TestJSONStream, self).setUp()
+        self.root = mkdtemp(prefix='pocketlint_')
+        self.chunk_size = formatcheck.STREAM_CHUNK_SIZE
+        formatcheck.STREAM_CHUNK_SIZE = 7
+
+    def tearDown(self):
+        formatcheck.STREAM_CHUNK_SIZE = self.chunk_size
+        shutil.rmtree(self.root)
+
+    def check_stream(self, content):
+        path = os.path.join(self.root, 'bogus.json')
+        with open(path, 'wb') as json_file:
+            json_file.write(content.encode('utf-8'))
+        checker = UniversalChecker(path, None, Language.JSON, self.reporter)
+        checker.check()
+        return path
+
+    def test_good_json(self):
+        self.check_stream(good_json)
+        self.assertEqual([], self.reporter.messages)
+
+    def test_empty_file(self):
+        self.check_stream('')
+        self.assertEqual([], self.reporter.messages)
+
+    def test_problems(self):
+        self.check_stream('{"a": 1, \r\n\t"b": [1 2]}')
+        self.assertEqual(
+            [(1, 'Line has trailing whitespace.'),
+             (2, 'Line contains a tab character.'),
+             (2, "Expecting ',' delimiter: line 2 column 10 (char 20)"),
+             (2, 'File does not ends with an empty line.')],
+            self.reporter.messages)
+        self.assertEqual(10, self.reporter.diagnostics[2].column)
+
+    def test_read_source_streams_large_json(self):
+        path = self.check_stream(good_json)
+        self.assertEqual(good_json, read_source(path))
+        size = formatcheck.STREAM_SIZE
+        formatcheck.STREAM_SIZE = 10
+        try:
+            self.assertIs(None, read_source(path))
+        finally:
+            formatcheck.STREAM_SIZE = size
+
+
+class TestJSONLines(CheckerTestCase):
+    """Verify JSON Lines validation."""
+
+    def test_get_language(self):
+        self.assertIs(Language.JSONL, Language.get_language('data.jsonl'))
+        self.assertIs(Language.JSONL, Language.get_language('data.ndjson'))
+
+    def test_check_records(self):
+        self.assertEqual([], check_records(good_json_lines.encode('utf-8')))
+        self.assertEqual(
+            [(12, 17, "Expecting ',' delimiter"),
+             (13, 7, 'Expecting value'),
+             (14, 0, 'Record is not UTF-8.')],
+            check_records(
+                bad_json_lines.encode('utf-8')[41:] + b'"\xff"\n', 12))
+
+    def test_good_json_lines(self):
+        checker = JSONLinesChecker('bogus', good_json_lines, self.reporter)
+        checker.check()
+        self.assertEqual([], self.reporter.messages)
+
+    def test_bad_json_lines(self):
+        checker = JSONLinesChecker('bogus', bad_json_lines, self.reporter)
+        checker.check()
+        self.assertEqual(
+            [(2, "Expecting ',' delimiter"), (3, 'Expecting value')],
+            self.reporter.messages)
+        self.assertEqual(17, self.reporter.diagnostics[0].column)
+
+    def test_validator_keeps_the_order(self):
+        data = b'[1]\n{\n' * 50
+        expected = [
+            (line_no, 2, 'Expecting property name enclosed in double quotes')
+            for line_no in range(2, 101, 2)]
+        for workers in (1, 2):
+            validator = JSONLinesValidator(workers)
+            for index in range(0, len(data), 5):
+                validator.feed(data[index:index + 5])
+            self.assertEqual(expected, validator.close())
+
+
+class TestJSONLinesStream(TestJSONStream):
+    """Verify the streaming check of large JSON Lines files."""
+
+    def check_stream(self, content, workers=2):
+        path = os.path.join(self.root, 'bogus.jsonl')
+        with open(path, 'wb') as json_file:
+            json_file.write(content.encode('utf-8'))
+        options = PocketLintOptions()
+        options.jsonl['workers'] = workers
+        checker = UniversalChecker(
+            path, None, Language.JSONL, self.reporter, options)
+        checker.check()
+        return path
+
+    def test_good_json(self):
+        self.check_stream(good_json_lines)
+        self.assertEqual([], self.reporter.messages)
+
+    def test_failed_check_stops_workers(self):
+        validators = []
+
+        class Checker(JSONLinesChecker):
+
+            def get_stream_parser(self):
+                validators.append(
+                    super(Checker, self).get_stream_parser())
+                return validators[-1]
+
+            def check_line(self, line_no, line):
+                raise ValueError('bad line')
+
+        path = self.check_stream(good_json_lines)
+        options = PocketLintOptions()
+        options.jsonl['workers'] = 2
+        checker = Checker(path, None, self.reporter, options)
+        self.assertRaises(ValueError, checker.check_stream)
+        self.assertIs(None, validators[0]._pool)
+
+    def test_problems(self):
+        for workers in (1, 2):
+            self.reporter.messages = []
+            self.check_stream(bad_json_lines + '\t[] \r\n', workers)
+            self.assertEqual(
+                [(4, 'Line has trailing whitespace.'),
+                 (4, 'Line contains a tab character.'),
+                 (2, "Expecting ',' delimiter"),
+                 (3, 'Expecting value')],
+                self.reporter.messages)
@@ -0,0 +1,186 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+import json
+import os
+import shutil
+import sys
+from tempfile import mkdtemp
+import unittest
+
+from pocketlint.formatcheck import (
+    JavascriptChecker,
+    JS,
+)
+from pocketlint.jsworker import (
+    JSLintWorker,
+    JSLintWorkerPool,
+    WorkerError,
+    WorkerTimeout,
+)
+from pocketlint.procpool import Deadline
+from pocketlint.tests import CheckerTestCase
+
+
+# A worker that speaks the jsreporter.js protocol. It reports the script and
+# its pid. A script that starts with "crash" kills the first worker that
+# reads it, "die" kills every worker, "hang" never replies, and "garbage"
+# makes the worker reply with something that is not JSON.
+stub_worker = """\
+import json
+import os
+import sys
+import time
+
+while True:
+    line = sys.stdin.readline()
+    if not line:
+        break
+    content = json.loads(line)['content']
+    marker = os.path.join(sys.argv[1], 'crashed')
+    if content.startswith('crash') and not os.path.exists(marker):
+        open(marker, 'w').close()
+        sys.exit(1)
+    if content.startswith('die'):
+        sys.exit(1)
+    if content.startswith('hang'):
+        time.sleep(60)
+    if content.startswith('garbage'):
+        sys.stdout.write('garbage\\n')
+    else:
+        response = {'issues': [
+            {'line': 1, 'character': 1, 'reason': content.strip()},
+            {'line': 0, 'character': 0, 'reason': str(os.getpid())},
+            ]}
+        sys.stdout.write(json.dumps(response) + '\\n')
+    sys.stdout.flush()
+"""
+
+
+class TestJSLintWorker(CheckerTestCase):
+    """Verify the persistent jslint worker protocol."""
+
+    def setUp(self):
+        super(TestJSLintWorker, self).setUp()
+        self.root = mkdtemp(prefix='pocketlint_')
+        script = self.write('worker.py', stub_worker)
+        self.command = [sys.executable, script, self.root]
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, name, text):
+        path = os.path.join(self.root, name)
+        with open(path, 'wt') as script:
+            script.write(text)
+        return path
+
+    def test_lint_many_files_in_one_process(self):
+        worker = JSLintWorker(self.command)
+        try:
+            first = worker.lint('first')
+            second = worker.lint('second')
+        finally:
+            worker.stop()
+        self.assertEqual('first', first[0]['reason'])
+        self.assertEqual('second', second[0]['reason'])
+        self.assertEqual(first[1], second[1])
+
+    def test_restart_after_crash(self):
+        worker = JSLintWorker(self.command)
+        try:
+            first = worker.lint('first')
+            retried = worker.lint('crash')
+            second = worker.lint('second')
+        finally:
+            worker.stop()
+        self.assertEqual('crash', retried[0]['reason'])
+        self.assertNotEqual(first[1], retried[1])
+        self.assertEqual(retried[1], second[1])
+
+    def test_crash_on_retry(self):
+        worker = JSLintWorker(self.command)
+        try:
+            self.assertRaises(
+                WorkerError, worker.lint, 'die')
+            issues = worker.lint('good')
+        finally:
+            worker.stop()
+        self.assertEqual('good', issues[0]['reason'])
+
+    def test_timeout(self):
+        worker = JSLintWorker(self.command, timeout=0.5)
+        try:
+            self.assertRaises(WorkerTimeout, worker.lint, 'hang')
+            issues = worker.lint('good')
+        finally:
+            worker.stop()
+        self.assertEqual('good', issues[0]['reason'])
+
+    def test_deadline_after_reply(self):
+        # A deadline that expires after the reply was read does not kill
+        # the worker.
+        worker = JSLintWorker(self.command, timeout=60)
+        try:
+            first = worker.lint('first')
+            deadline = Deadline(worker.process, 60)
+            self.assertFalse(deadline.finish())
+            deadline.expire()
+            self.assertIs(None, worker.process.poll())
+            second = worker.lint('second')
+        finally:
+            worker.stop()
+        self.assertEqual(first[1], second[1])
+
+    def test_garbage_response(self):
+        worker = JSLintWorker(self.command)
+        try:
+            self.assertRaises(
+                WorkerError, worker.lint, 'garbage')
+            issues = worker.lint('good')
+        finally:
+            worker.stop()
+        self.assertEqual('good', issues[0]['reason'])
+
+    def test_pool_reuses_workers(self):
+        pool = JSLintWorkerPool(self.command, size=1)
+        try:
+            first = pool.lint('first')
+            second = pool.lint('second')
+        finally:
+            pool.close()
+        self.assertEqual(first[1], second[1])
+
+
+class TestJSReporterWorker(CheckerTestCase):
+    """Verify the worker mode of jsreporter.js."""
+
+    def setUp(self):
+        if JS is None:
+            raise unittest.SkipTest('No JS interpreter is installed.')
+        super(TestJSReporterWorker, self).setUp()
+        self.worker = JSLintWorker([
+            JS, JavascriptChecker.JSREPORTER, JavascriptChecker.FULLJSLINT,
+            '--worker'])
+
+    def tearDown(self):
+        self.worker.stop()
+
+    def test_bad_request_line(self):
+        # A request that is not JSON is reported; the worker keeps serving.
+        self.worker.start()
+        process = self.worker.process
+        process.stdin.write(b'{"content": "var a\n')
+        process.stdin.flush()
+        issues = json.loads(process.stdout.readline().decode('utf-8'))
+        self.assertTrue(
+            issues['issues'][0]['reason'].startswith(
+                'JSLINT had a fatal error: '))
+        self.assertEqual([], self.worker.lint('var a = 1;\n'))
+        self.assertIs(process, self.worker.process)
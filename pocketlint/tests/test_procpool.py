@@ -0,0 +1,100 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+import subprocess
+import sys
+import threading
+import time
+
+from pocketlint.procpool import (
+    ProcessPool,
+    ToolError,
+)
+from pocketlint.tests import CheckerTestCase
+
+
+class TestProcessPool(CheckerTestCase):
+    """Verify external tools are limited and timed out."""
+
+    def python(self, script):
+        return [sys.executable, '-c', script]
+
+    def test_run(self):
+        pool = ProcessPool(max_processes=1)
+        returncode, stdout, stderr = pool.run(
+            self.python('import sys; sys.stdout.write(sys.stdin.read())'),
+            b'hello')
+        self.assertEqual(0, returncode)
+        self.assertEqual(b'hello', stdout)
+
+    def test_run_timeout(self):
+        pool = ProcessPool(max_processes=1, timeout=0.2)
+        started = time.time()
+        self.assertRaises(
+            ToolError, pool.run, self.python('import time; time.sleep(10)'))
+        self.assertTrue(time.time() - started < 5)
+
+    def test_run_deadline_after_communicate(self):
+        # The deadline expires after communicate() returned, before the
+        # timer is cancelled; the finished run is not a timeout.
+        timers = []
+
+        class LateTimer(object):
+
+            def __init__(self, interval, function):
+                self.function = function
+                self.daemon = False
+                timers.append(self)
+
+            def start(self):
+                pass
+
+            def cancel(self):
+                pass
+
+        class LatePopen(subprocess.Popen):
+
+            def communicate(self, input=None):
+                output = super(LatePopen, self).communicate(input)
+                timers[-1].function()
+                return output
+
+        pool = ProcessPool(max_processes=1)
+        timer, popen = threading.Timer, subprocess.Popen
+        threading.Timer, subprocess.Popen = LateTimer, LatePopen
+        try:
+            returncode, stdout, stderr = pool.run(self.python('print(1)'))
+        finally:
+            threading.Timer, subprocess.Popen = timer, popen
+        self.assertEqual(0, returncode)
+        self.assertEqual(b'1', stdout.strip())
+
+    def test_run_missing_tool(self):
+        pool = ProcessPool(max_processes=1)
+        self.assertRaises(ToolError, pool.run, ['pocketlint-no-such-tool'])
+
+    def test_run_killed(self):
+        pool = ProcessPool(max_processes=1)
+        self.assertRaises(
+            ToolError, pool.run,
+            self.python('import os, signal; os.kill(os.getpid(), 9)'))
+
+    def test_submit(self):
+        pool = ProcessPool(max_processes=2)
+        calls = [
+            pool.submit(self.python('print(%d)' % number))
+            for number in range(4)]
+        self.assertEqual(
+            [b'0', b'1', b'2', b'3'],
+            [call.result()[1].strip() for call in calls])
+
+    def test_submit_timeout(self):
+        pool = ProcessPool(max_processes=1, timeout=0.2)
+        call = pool.submit(self.python('import time; time.sleep(10)'))
+        self.assertRaises(ToolError, call.result)
@@ -155,6 +155,18 @@ class TestPyflakes(CheckerTestCase):
              (3, "local variable 'a' is assigned to but never used")],
             self.reporter.messages)
         self.assertEqual(2, self.reporter.call_count)
+        self.assertEqual(
+            [(3, 13, 'UndefinedName'), (3, 9, 'UnusedVariable')],
+            [(diagnostic.line, diagnostic.column, diagnostic.rule)
+             for diagnostic in self.reporter.diagnostics])
+
+    def test_code_with_colon_in_path(self):
+        checker = PythonChecker('c:/lib/ugly.py', ugly_python, self.reporter)
+        checker.check_flakes()
+        self.assertEqual(
+            [(3, "undefined name 'b'"),
+             (3, "local variable 'a' is assigned to but never used")],
+            self.reporter.messages)
 
     def test_pyflakes_ignore(self):
         pyflakes_ignore = (
@@ -180,6 +192,77 @@ class TestPyflakes(CheckerTestCase):
         self.assertEqual([], self.reporter.messages)
 
 
+doctest_python = """\
+def double(value):
+    \"\"\"Return the value times two.
+
+        >>> import os
+        >>> double(2)
+        4
+    \"\"\"
+    return value * 2
+
+
+class Example:
+    \"\"\"An example.
+
+    = Heading =
+
+    >>> import sys
+    \"\"\"
+"""
+
+
+class TestDocstrings(CheckerTestCase):
+    """Verify doctests in docstrings are checked."""
+
+    def test_docstrings_without_examples(self):
+        checker = PythonChecker('bogus', good_python, self.reporter)
+        checker.check_flakes()
+        checker.check_doctests()
+        self.assertEqual([], self.reporter.messages)
+
+    def test_docstrings_with_issues(self):
+        checker = PythonChecker('bogus', doctest_python, self.reporter)
+        checker.check_flakes()
+        checker.check_doctests()
+        self.assertEqual(
+            [(14, 'narrative uses a moin header.'),
+             (4, "'os' imported but unused"),
+             (16, "'sys' imported but unused")],
+            self.reporter.messages)
+
+    def test_docstrings_in_source_order(self):
+        # The method's docstring is visited after the function's.
+        source = (
+            'class Example:\n'
+            '\n'
+            '    def method(self):\n'
+            '        """Example.\n'
+            '\n'
+            '        >>> import os\n'
+            '        """\n'
+            '\n'
+            '\n'
+            'def function():\n'
+            '    """Example.\n'
+            '\n'
+            '    >>> import sys\n'
+            '    """\n')
+        checker = PythonChecker('bogus', source, self.reporter)
+        checker.check_flakes()
+        checker.check_doctests()
+        self.assertEqual(
+            [(6, "'os' imported but unused"),
+             (13, "'sys' imported but unused")],
+            self.reporter.messages)
+
+    def test_docstrings_without_tree(self):
+        checker = PythonChecker('bogus', bad_syntax_python, self.reporter)
+        checker.check_doctests()
+        self.assertEqual([], self.reporter.messages)
+
+
 class TestPEP8(CheckerTestCase):
     """Verify PEP8 integration."""
 
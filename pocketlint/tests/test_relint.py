@@ -0,0 +1,111 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+from pocketlint.formatcheck import Language
+from pocketlint.relint import IncrementalChecker
+from pocketlint.tests import CheckerTestCase
+
+
+python_module = """\
+import os
+
+
+def first():
+    return os.sep
+
+
+class Second:
+
+    def method(self):
+        return first()
+
+
+third = Second()
+"""
+
+
+class TestIncrementalChecker(CheckerTestCase):
+    """Verify that re-checks match full checks."""
+
+    def assertRecheck(self, old_text, new_text, first, last, delta,
+                      language=Language.PYTHON):
+        checker = IncrementalChecker('bogus.py', language)
+        checker.check(old_text)
+        diagnostics = checker.recheck(new_text, first, last, delta)
+        expected = IncrementalChecker('bogus.py', language).check(new_text)
+        self.assertEqual(expected, diagnostics)
+        return checker
+
+    def test_check(self):
+        checker = IncrementalChecker('bogus.py')
+        self.assertEqual([], checker.check(python_module))
+        self.assertEqual(
+            [[4, 5, 'first'], [8, 11, 'Second']], checker.blocks)
+        self.assertEqual(
+            set(['os', 'first', 'Second', 'third']), checker.module_names)
+
+    def test_recheck_inside_definition(self):
+        new_text = python_module.replace(
+            '        return first()',
+            '        unused = 1\n        return first() +  missing')
+        checker = self.assertRecheck(python_module, new_text, 11, 12, 1)
+        self.assertEqual(
+            [(11, "local variable 'unused' is assigned to but never used"),
+             (12, "undefined name 'missing'"),
+             (12, 'E222 multiple spaces after operator')],
+            [(diagnostic.line, diagnostic.message)
+             for diagnostic in checker.diagnostics])
+        self.assertEqual(
+            [[4, 5, 'first'], [8, 12, 'Second']], checker.blocks)
+
+    def test_recheck_moves_later_diagnostics(self):
+        old_text = python_module + 'os.path  # ' + 'pdb.' + 'set_trace\n'
+        new_text = old_text.replace(
+            '    return os.sep', '    return os.sep\n\n')
+        self.assertRecheck(old_text, new_text, 5, 7, 2)
+
+    def test_recheck_module_level(self):
+        new_text = python_module.replace('import os', 'import os, sys')
+        checker = self.assertRecheck(python_module, new_text, 1, 1, 0)
+        self.assertEqual(
+            [(1, "'sys' imported but unused"),
+             (1, 'E401 multiple imports on one line')],
+            [(diagnostic.line, diagnostic.message)
+             for diagnostic in checker.diagnostics])
+
+    def test_recheck_removes_last_use_of_module_name(self):
+        new_text = python_module.replace(
+            '    return os.sep', "    return '/'")
+        checker = self.assertRecheck(python_module, new_text, 5, 5, 0)
+        self.assertEqual(
+            [(1, "'os' imported but unused")],
+            [(diagnostic.line, diagnostic.message)
+             for diagnostic in checker.diagnostics])
+
+    def test_recheck_adds_use_of_module_name(self):
+        old_text = python_module.replace(
+            '    return os.sep', "    return '/'")
+        self.assertRecheck(old_text, python_module, 5, 5, 0)
+
+    def test_recheck_binds_global_name(self):
+        old_text = python_module + 'print(fourth)\n'
+        new_text = old_text.replace(
+            '    return os.sep',
+            '    global fourth\n    fourth = 4\n    return os.sep')
+        self.assertRecheck(old_text, new_text, 5, 7, 2)
+
+    def test_recheck_syntax_error(self):
+        new_text = python_module.replace(
+            '        return first()', '        return first(')
+        self.assertRecheck(python_module, new_text, 11, 11, 0)
+
+    def test_recheck_text(self):
+        old_text = 'one\ntwo \nthree\n'
+        new_text = 'one \ntwo\n\nthree\n'
+        self.assertRecheck(old_text, new_text, 1, 3, 1, Language.TEXT)
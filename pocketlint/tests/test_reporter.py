@@ -7,6 +7,22 @@ from __future__ import (
     unicode_literals,
 )
 
+from io import StringIO
+import json
+import pickle
+import random
+import sys
+import threading
+
+from pocketlint import reporter
+from pocketlint.reporter import (
+    ConsoleWriter,
+    Diagnostic,
+    FileReport,
+    get_sarif_result,
+    ReportAggregator,
+    Reporter,
+    )
 from pocketlint.tests import CheckerTestCase
 
 
@@ -32,3 +48,266 @@ class ReporterTestCase(CheckerTestCase):
         self.reporter(
             9, "test", icon='error', base_dir='./lib', file_name='eg.py')
         self.assertIs(1, self.reporter.call_count)
+
+    def test_call_diagnostic(self):
+        self.reporter(
+            12, "test", icon='info', base_dir='./lib', file_name='eg.py')
+        self.assertEqual(
+            [Diagnostic('./lib/eg.py', 12, 0, None, 'info', 'test')],
+            self.reporter.diagnostics)
+
+    def test_report(self):
+        diagnostic = Diagnostic('./lib/eg.py', 3, 7, 'E1', 'error', 'test')
+        self.reporter.report(diagnostic)
+        self.assertIs(1, self.reporter.call_count)
+        self.assertEqual(('./lib', 'eg.py'), self.reporter._last_file_name)
+        self.assertEqual([(3, 'test')], self.reporter.messages)
+        self.assertEqual([diagnostic], self.reporter.diagnostics)
+
+    def test_report_error_only(self):
+        self.reporter.error_only = True
+        self.reporter.report(
+            Diagnostic('eg.py', 3, 0, None, 'info', 'test'))
+        self.assertIs(0, self.reporter.call_count)
+
+
+class ConsoleOutputTestCase(CheckerTestCase):
+    """Capture the console output."""
+
+    def setUp(self):
+        super(ConsoleOutputTestCase, self).setUp()
+        reporter.console.flush()
+        self.stdout = sys.stdout
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        reporter.console.flush()
+        sys.stdout = self.stdout
+
+
+class ConsoleReporterTestCase(ConsoleOutputTestCase):
+
+    def test_report(self):
+        console_reporter = Reporter(Reporter.CONSOLE)
+        console_reporter.report(
+            Diagnostic('lib/eg.py', 3, 0, None, 'error', 'test'))
+        console_reporter.report(
+            Diagnostic('lib/eg.py', 12, 0, None, 'error', 'other'))
+        self.assertEqual('', sys.stdout.getvalue())
+        console_reporter.report(
+            Diagnostic('lib/other.py', 1, 0, None, 'error', 'test'))
+        self.assertEqual(
+            './lib/eg.py\n       3: test\n      12: other\n',
+            sys.stdout.getvalue())
+        console_reporter.flush()
+        self.assertEqual(
+            './lib/eg.py\n       3: test\n      12: other\n'
+            './lib/other.py\n       1: test\n',
+            sys.stdout.getvalue())
+        self.assertEqual(3, console_reporter.call_count)
+
+
+class MachineReporterTestCase(ConsoleOutputTestCase):
+
+    def report(self, report_type):
+        machine_reporter = Reporter(report_type)
+        machine_reporter.report(
+            Diagnostic('lib/eg.py', 3, 7, 'E1', 'error', 'test'))
+        machine_reporter.report(
+            Diagnostic('lib/eg.py', 0, 0, None, 'info', 'other'))
+        machine_reporter.report(
+            Diagnostic('lib/other.py', 1, 0, None, None, 'third'))
+        self.assertEqual(3, machine_reporter.close())
+        return sys.stdout.getvalue()
+
+    def test_jsonl(self):
+        records = [
+            json.loads(line) for line in
+            self.report(Reporter.JSONL).splitlines()]
+        self.assertEqual(
+            {'path': 'lib/eg.py', 'line': 3, 'column': 7, 'rule': 'E1',
+             'severity': 'error', 'message': 'test'},
+            records[0])
+        self.assertEqual(4, len(records))
+        self.assertEqual(
+            {'summary': {
+                'messages': 3, 'errors': 1, 'files': 2, 'exit_code': 3}},
+            records[3])
+
+    def test_sarif(self):
+        log = json.loads(self.report(Reporter.SARIF))
+        self.assertEqual('2.1.0', log['version'])
+        run = log['runs'][0]
+        self.assertEqual('pocketlint', run['tool']['driver']['name'])
+        self.assertEqual(
+            ['error', 'note', 'warning'],
+            [result['level'] for result in run['results']])
+        self.assertEqual(
+            [{'executionSuccessful': True, 'exitCode': 3}],
+            run['invocations'])
+
+    def test_sarif_without_results(self):
+        self.assertEqual(0, Reporter(Reporter.SARIF).close())
+        log = json.loads(sys.stdout.getvalue())
+        self.assertEqual([], log['runs'][0]['results'])
+        self.assertEqual(0, log['runs'][0]['invocations'][0]['exitCode'])
+
+    def test_exit_code(self):
+        machine_reporter = Reporter(Reporter.JSONL)
+        machine_reporter.call_count = 300
+        self.assertEqual(255, machine_reporter.exit_code)
+
+
+class SARIFResultTestCase(CheckerTestCase):
+
+    def test_result(self):
+        result = get_sarif_result(
+            Diagnostic('lib/my eg.py', 3, 7, 'E1', 'error', 'test'))
+        self.assertEqual(
+            {'level': 'error',
+             'message': {'text': 'test'},
+             'ruleId': 'E1',
+             'locations': [{'physicalLocation': {
+                 'artifactLocation': {'uri': 'lib/my%20eg.py'},
+                 'region': {'startLine': 3, 'startColumn': 7}}}]},
+            result)
+
+    def test_result_of_file(self):
+        result = get_sarif_result(
+            Diagnostic('lib/eg.py', 0, 0, None, 'info', 'test'))
+        self.assertEqual(
+            [{'physicalLocation': {'artifactLocation': {'uri': 'lib/eg.py'}}}],
+            result['locations'])
+        self.assertNotIn('ruleId', result)
+
+    def test_result_without_path(self):
+        result = get_sarif_result(
+            Diagnostic(None, 1, 0, None, None, 'test'))
+        self.assertEqual('warning', result['level'])
+        self.assertNotIn('locations', result)
+
+
+class FileReportTestCase(CheckerTestCase):
+
+    def test_report(self):
+        file_report = FileReport(3, 'lib/eg.py')
+        file_report(12, 'test', icon='info', base_dir='lib', file_name='eg.py')
+        diagnostic = Diagnostic('lib/eg.py', 3, 7, 'E1', 'error', 'other')
+        file_report.report(diagnostic)
+        self.assertEqual(
+            [Diagnostic('lib/eg.py', 12, 0, None, 'info', 'test'),
+             diagnostic],
+            file_report.diagnostics)
+
+    def test_pickle(self):
+        file_report = FileReport(3, 'lib/eg.py')
+        file_report(12, 'test', icon='info', base_dir='lib', file_name='eg.py')
+        copy = pickle.loads(pickle.dumps(file_report))
+        self.assertEqual(3, copy.index)
+        self.assertEqual(file_report.diagnostics, copy.diagnostics)
+
+
+def make_file_reports(count):
+    """Return FileReports of files with an info and an error message."""
+    file_reports = []
+    for index in range(count):
+        path = 'lib/eg%02d.py' % index
+        file_report = FileReport(index, path)
+        file_report.report(Diagnostic(path, 1, 0, None, 'info', 'test'))
+        file_report.report(Diagnostic(path, 2, 0, None, 'error', 'test'))
+        file_reports.append(file_report)
+    return file_reports
+
+
+class ReportAggregatorTestCase(CheckerTestCase):
+
+    def test_add_in_order(self):
+        first, second = make_file_reports(2)
+        aggregator = ReportAggregator(self.reporter)
+        aggregator.add(second)
+        self.assertEqual([], self.reporter.diagnostics)
+        self.assertEqual(1, aggregator.waiting)
+        aggregator.add(first)
+        self.assertEqual(
+            first.diagnostics + second.diagnostics,
+            self.reporter.diagnostics)
+        self.assertEqual(0, aggregator.waiting)
+        self.assertEqual(4, self.reporter.call_count)
+
+    def test_error_only(self):
+        self.reporter.error_only = True
+        aggregator = ReportAggregator(self.reporter)
+        for file_report in make_file_reports(2):
+            aggregator.add(file_report)
+        self.assertEqual(
+            [(2, 'test'), (2, 'test')], self.reporter.messages)
+        self.assertEqual(2, self.reporter.call_count)
+
+    def test_close_merges_waiting_reports(self):
+        file_reports = make_file_reports(4)
+        aggregator = ReportAggregator(self.reporter)
+        aggregator.add(file_reports[3])
+        aggregator.add(file_reports[1])
+        aggregator.close()
+        self.assertEqual(
+            file_reports[1].diagnostics + file_reports[3].diagnostics,
+            self.reporter.diagnostics)
+        self.assertEqual(0, aggregator.waiting)
+
+    def test_threads(self):
+        file_reports = make_file_reports(50)
+        expected = [
+            diagnostic for file_report in file_reports
+            for diagnostic in file_report.diagnostics]
+        random.shuffle(file_reports)
+        aggregator = ReportAggregator(self.reporter)
+
+        def add(reports):
+            for file_report in reports:
+                aggregator.add(file_report)
+
+        threads = [
+            threading.Thread(target=add, args=(file_reports[start::4],))
+            for start in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(expected, self.reporter.diagnostics)
+        self.assertEqual(100, self.reporter.call_count)
+
+
+class ConsoleWriterTestCase(CheckerTestCase):
+
+    def test_write_line(self):
+        stream = StringIO()
+        writer = ConsoleWriter(stream, max_lines=3)
+        writer.write_line('one')
+        writer.write_line('two')
+        self.assertEqual('', stream.getvalue())
+        writer.write_line('three')
+        self.assertEqual('one\ntwo\nthree\n', stream.getvalue())
+        writer.write_line('four')
+        writer.flush()
+        writer.flush()
+        self.assertEqual('one\ntwo\nthree\nfour\n', stream.getvalue())
+
+    def test_flush_closed_stream(self):
+        stream = StringIO()
+        writer = ConsoleWriter(stream)
+        writer.write_line('one')
+        stream.close()
+        writer.flush()
+
+
+class DiagnosticTestCase(CheckerTestCase):
+
+    def test_file_parts(self):
+        diagnostic = Diagnostic('./lib/eg.py', 1, 0, None, None, 'test')
+        self.assertEqual('./lib', diagnostic.base_dir)
+        self.assertEqual('eg.py', diagnostic.file_name)
+
+    def test_file_parts_unknown(self):
+        diagnostic = Diagnostic(None, 1, 0, None, None, 'test')
+        self.assertIs(None, diagnostic.base_dir)
+        self.assertIs(None, diagnostic.file_name)
@@ -498,3 +498,28 @@ class TestReStructuredTextChecker(CheckerTestCase):
             (3, 'Section marker has wrong length.')]
         self.assertEqual(expect, self.reporter.messages)
         self.assertEqual(3, self.reporter.call_count)
+
+    def test_classify_lines(self):
+        lines = ['', '====', '---', '=== ===', '.. _anchor:', 'text', '==']
+        kinds = ReStructuredTextChecker.classify_lines(lines)
+        expected = [
+            ReStructuredTextChecker.BLANK,
+            ReStructuredTextChecker.DELIMITER |
+            ReStructuredTextChecker.TRANSITION,
+            ReStructuredTextChecker.DELIMITER,
+            ReStructuredTextChecker.TABLE_HEADER,
+            ReStructuredTextChecker.ANCHOR,
+            0,
+            0,
+            ]
+        self.assertEqual(expected, kinds)
+
+    def test_check_transition_at_end(self):
+        content = (
+            'some text\n'
+            '\n'
+            '----\n'
+            '\n')
+        checker = ReStructuredTextChecker('bogus', content, self.reporter)
+        checker.check_lines()
+        self.assertEqual([], self.reporter.messages)
@@ -7,7 +7,19 @@ from __future__ import (
     unicode_literals,
 )
 
-from pocketlint.formatcheck import SQLChecker
+import os
+import shutil
+from tempfile import mkdtemp
+
+from pocketlint import formatcheck
+from pocketlint.formatcheck import (
+    Language,
+    PocketLintOptions,
+    read_source,
+    SQLChecker,
+    UniversalChecker,
+    )
+from pocketlint.sqlscanner import SQLScanner
 from pocketlint.tests import CheckerTestCase
 from pocketlint.tests.test_text import TestAnyTextMixin
 
@@ -22,3 +34,155 @@ class TestSQL(CheckerTestCase, TestAnyTextMixin):
     def test_long_length(self):
         """SQL files may have long lines."""
         pass
+
+    def test_literals_are_not_checked(self):
+        content = (
+            "INSERT INTO t VALUES ('a \n"
+            "\tb', \"c\td\", $body$\n"
+            "<<<<<<< \n"
+            "$body$);\n")
+        self.create_and_check('bogus.sql', content)
+        self.assertEqual([], self.reporter.messages)
+
+    def test_code_after_literal_is_checked(self):
+        content = "SELECT 'a\tb' FROM\tt; \n"
+        self.create_and_check('bogus.sql', content)
+        self.assertEqual(
+            [(1, 'Line has trailing whitespace.'),
+             (1, 'Line contains a tab character.')],
+            self.reporter.messages)
+
+    def test_unclosed_string(self):
+        content = "SELECT 1;\nSELECT 'it''s;\n"
+        self.create_and_check('bogus.sql', content)
+        self.assertEqual([(2, 'Unclosed string.')], self.reporter.messages)
+        self.assertEqual(8, self.reporter.diagnostics[0].column)
+
+    def test_mysql_dialect(self):
+        content = "INSERT INTO `t` VALUES ('it\\'s \n\tdone');\n"
+        options = PocketLintOptions()
+        options.sql['dialect'] = 'mysql'
+        self.create_and_check('bogus.sql', content, options)
+        self.assertEqual([], self.reporter.messages)
+        self.create_and_check('bogus.sql', content)
+        self.assertEqual(
+            [(1, 'Line has trailing whitespace.'),
+             (2, 'Line contains a tab character.'),
+             (2, 'Unclosed string.')],
+            self.reporter.messages)
+
+    def test_universal_checker(self):
+        checker = UniversalChecker(
+            'bogus.sql', "SELECT 'a \n';\n", Language.SQL, self.reporter)
+        checker.check()
+        self.assertEqual([], self.reporter.messages)
+
+
+class TestSQLScanner(CheckerTestCase):
+    """Verify the SQL literal and comment scanner."""
+
+    def scan(self, text, dialect='standard'):
+        scanner = SQLScanner(dialect)
+        lines = [scanner.scan_line(line) for line in text.split('\n')]
+        return lines, scanner.close()
+
+    def test_code(self):
+        lines, problems = self.scan('SELECT 1 FROM t;')
+        self.assertEqual(['SELECT 1 FROM t;'], lines)
+        self.assertEqual([], problems)
+
+    def test_strings(self):
+        lines, problems = self.scan("SELECT 'a''b', E'c\\'d', x FROM t;")
+        self.assertEqual(["SELECT 'xxxx', E'xxxx', x FROM t;"], lines)
+        self.assertEqual([], problems)
+
+    def test_multiline_string(self):
+        lines, problems = self.scan("SELECT 'a\nb\nc' FROM t;")
+        self.assertEqual(["SELECT 'x", 'x', "x' FROM t;"], lines)
+        self.assertEqual([], problems)
+
+    def test_quoted_identifier(self):
+        lines, problems = self.scan('SELECT "a "" b" FROM t;')
+        self.assertEqual(['SELECT "xxxxxx" FROM t;'], lines)
+        self.assertEqual([], problems)
+
+    def test_comments_are_not_masked(self):
+        lines, problems = self.scan(
+            "SELECT 1; -- it's\n/* a /* 'b */ c */ SELECT 'd';")
+        self.assertEqual(
+            ["SELECT 1; -- it's", "/* a /* 'b */ c */ SELECT 'x';"], lines)
+        self.assertEqual([], problems)
+
+    def test_dollar_quoting(self):
+        lines, problems = self.scan(
+            "CREATE FUNCTION f() AS $fn$\nSELECT 'a$$b';\n$fn$;")
+        self.assertEqual(
+            ['CREATE FUNCTION f() AS $fn$', 'xxxxxxxxxxxxxx', '$fn$;'], lines)
+        self.assertEqual([], problems)
+
+    def test_positional_parameters(self):
+        lines, problems = self.scan('SELECT $1, $2;')
+        self.assertEqual(['SELECT $1, $2;'], lines)
+        self.assertEqual([], problems)
+
+    def test_mysql(self):
+        lines, problems = self.scan(
+            "SELECT `a`, 'b\\'c', \"d\" # 'e\n--'f\n", 'mysql')
+        self.assertEqual(
+            ["SELECT `x`, 'xxxx', \"x\" # 'e", "--'x", ''], lines)
+        self.assertEqual([(2, 3, 'Unclosed string.')], problems)
+
+    def test_unclosed(self):
+        self.assertEqual(
+            [(1, 8, 'Unclosed quoted identifier.')],
+            self.scan('SELECT "a')[1])
+        self.assertEqual(
+            [(2, 1, 'Unclosed comment.')],
+            self.scan('SELECT 1;\n/* a /* b */')[1])
+        self.assertEqual(
+            [(1, 8, 'Unclosed dollar-quoted string.')],
+            self.scan('SELECT $a$ b $b$')[1])
+
+    def test_unknown_dialect(self):
+        self.assertRaises(ValueError, SQLScanner, 'bogus')
+
+
+class TestSQLStream(CheckerTestCase):
+    """Verify the streaming check of large SQL files."""
+
+    def setUp(self):
+        super(TestSQLStream, self).setUp()
+        self.root = mkdtemp(prefix='pocketlint_')
+        self.chunk_size = formatcheck.STREAM_CHUNK_SIZE
+        formatcheck.STREAM_CHUNK_SIZE = 7
+
+    def tearDown(self):
+        formatcheck.STREAM_CHUNK_SIZE = self.chunk_size
+        shutil.rmtree(self.root)
+
+    def check_stream(self, content):
+        path = os.path.join(self.root, 'bogus.sql')
+        with open(path, 'wb') as sql_file:
+            sql_file.write(content.encode('utf-8'))
+        checker = UniversalChecker(path, None, Language.SQL, self.reporter)
+        checker.check()
+        return path
+
+    def test_problems(self):
+        self.check_stream("SELECT 'a \r\n\tb'; \r\nSELECT 'c\n")
+        self.assertEqual(
+            [(2, 'Line has trailing whitespace.'),
+             (3, 'Unclosed string.'),
+             (0, 'File contains Windows new lines.')],
+            self.reporter.messages)
+
+    def test_read_source_streams_large_sql(self):
+        content = 'SELECT 1;\n'
+        path = self.check_stream(content)
+        self.assertEqual(content, read_source(path))
+        size = formatcheck.STREAM_SIZE
+        formatcheck.STREAM_SIZE = 5
+        try:
+            self.assertIs(None, read_source(path))
+        finally:
+            formatcheck.STREAM_SIZE = size
@@ -0,0 +1,199 @@
+# Copyright (C) 2013 - Curtis Hovey <sinzui.is at verizon.net>
+# This software is licensed under the MIT license (see the file COPYING).
+
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+import _ast
+import ast
+import os
+import shutil
+from tempfile import mkdtemp
+import threading
+
+from pocketlint.formatcheck import PythonChecker
+from pocketlint.symbolindex import (
+    get_module_symbols,
+    SymbolIndex,
+)
+from pocketlint.tests import CheckerTestCase
+
+
+def parse(source):
+    return compile(source, 'bogus', 'exec', _ast.PyCF_ONLY_AST)
+
+
+class TestModuleSymbols(CheckerTestCase):
+    """Verify the symbols found in a module tree."""
+
+    def test_definitions(self):
+        symbols = get_module_symbols(parse(
+            'import os.path\n'
+            'a, b = 1, 2\n'
+            'try:\n'
+            '    import json\n'
+            'except ImportError:\n'
+            '    json = None\n'
+            'def f():\n'
+            '    c = 1\n'
+            'class C:\n'
+            '    d = 1\n'))
+        self.assertEqual(
+            ['C', 'a', 'b', 'f', 'json', 'os'], symbols['definitions'])
+
+    def test_definitions_in_compound_statements(self):
+        symbols = get_module_symbols(parse(
+            'with open("a") as a, open("b") as (b, c):\n'
+            '    pass\n'
+            'def f():\n'
+            '    global d, e\n'
+            '    d = 1\n'
+            '    return e\n'))
+        self.assertEqual(['a', 'b', 'c', 'd', 'f'], symbols['definitions'])
+
+    def test_definitions_in_new_statements(self):
+        if not hasattr(ast, 'TryStar'):
+            return
+        symbols = get_module_symbols(parse(
+            'async def f():\n'
+            '    pass\n'
+            'try:\n'
+            '    g = 1\n'
+            'except* ValueError:\n'
+            '    h = 1\n'
+            'match g:\n'
+            '    case [i, *j]:\n'
+            '        k = 1\n'
+            '    case {"key": 1, **l}:\n'
+            '        pass\n'
+            '    case int() as m:\n'
+            '        pass\n'))
+        self.assertEqual(
+            ['f', 'g', 'h', 'i', 'j', 'k', 'l', 'm'], symbols['definitions'])
+
+    def test_imports_and_all(self):
+        symbols = get_module_symbols(parse(
+            '__all__ = ["g"]\n'
+            'from os import path as p\n'
+            'from . import sibling\n'
+            'from .other import *\n'), 'pkg.mod')
+        self.assertEqual(['g'], symbols['all'])
+        self.assertEqual(1, symbols['all_lineno'])
+        self.assertEqual(
+            [['os', 'path', 2], ['pkg', 'sibling', 3]], symbols['imports'])
+        self.assertEqual(['pkg.other'], symbols['star_imports'])
+
+
+class TestSymbolIndex(CheckerTestCase):
+    """Verify the cross-module checks and the persistent index."""
+
+    def setUp(self):
+        super(TestSymbolIndex, self).setUp()
+        self.root = mkdtemp(prefix='pocketlint_')
+        self.index_path = os.path.join(self.root, 'index.json')
+        self.write('pkg/__init__.py', '')
+        self.write('pkg/base.py', 'def good():\n    pass\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, name, text):
+        path = os.path.join(self.root, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'wt') as module_file:
+            module_file.write(text)
+        return path
+
+    def check(self, path, text, symbol_index):
+        checker = PythonChecker(path, text, self.reporter)
+        checker.options.symbol_index = symbol_index
+        checker.check_flakes()
+        checker.check_symbols()
+
+    def test_import_missing_name(self):
+        text = 'from pkg.base import good, bad\n\ngood, bad\n'
+        path = self.write('pkg/user.py', text)
+        self.check(path, text, SymbolIndex())
+        self.assertEqual(
+            [(1, "Module 'pkg.base' does not define 'bad'.")],
+            self.reporter.messages)
+
+    def test_import_from_module_getattr(self):
+        self.write(
+            'pkg/lazy.py',
+            'def __getattr__(name):\n    return name\n')
+        text = 'from pkg.lazy import anything\n\nanything\n'
+        path = self.write('pkg/user.py', text)
+        self.check(path, text, SymbolIndex())
+        self.assertEqual([], self.reporter.messages)
+
+    def test_import_submodule(self):
+        text = 'from pkg import base\n\nbase\n'
+        path = self.write('pkg/user.py', text)
+        self.check(path, text, SymbolIndex())
+        self.assertEqual([], self.reporter.messages)
+
+    def test_all_with_star_import(self):
+        text = (
+            '__all__ = ["good", "missing"]\n'
+            'from pkg.base import *\n')
+        path = self.write('pkg/user.py', text)
+        self.check(path, text, SymbolIndex())
+        self.assertEqual(
+            [(1, "__all__ lists 'missing', which is not defined.")],
+            [(diagnostic.line, diagnostic.message)
+             for diagnostic in self.reporter.diagnostics
+             if diagnostic.rule == 'symbols'])
+
+    def test_persistent_index(self):
+        text = 'from pkg.base import good\n\ngood\n'
+        path = self.write('pkg/user.py', text)
+        symbol_index = SymbolIndex(self.index_path)
+        self.check(path, text, symbol_index)
+        symbol_index.save()
+        self.assertTrue(os.path.isfile(self.index_path))
+        loaded = SymbolIndex(self.index_path)
+        self.assertEqual(
+            ['pkg.base', 'pkg.user'], sorted(loaded.modules))
+        self.assertTrue(loaded.is_current('pkg.user', path))
+        self.assertFalse(loaded.is_dirty)
+
+    def test_changed_module_is_reindexed(self):
+        text = 'from pkg.base import good\n\ngood\n'
+        path = self.write('pkg/user.py', text)
+        symbol_index = SymbolIndex(self.index_path)
+        self.check(path, text, symbol_index)
+        symbol_index.save()
+        self.write('pkg/base.py', 'def better():\n    pass\n')
+        loaded = SymbolIndex(self.index_path)
+        self.check(path, text, loaded)
+        self.assertEqual(
+            [(1, "Module 'pkg.base' does not define 'good'.")],
+            self.reporter.messages)
+
+    def test_threads(self):
+        # The checks in threads share the index.
+        paths = [
+            self.write('pkg/user%d.py' % index, 'from pkg.base import good\n')
+            for index in range(16)]
+        symbol_index = SymbolIndex(self.index_path)
+        problems = []
+
+        def check(path):
+            module_name = symbol_index.update(path)
+            problems.extend(symbol_index.check_module(module_name))
+
+        threads = [
+            threading.Thread(target=check, args=(path,)) for path in paths]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], problems)
+        self.assertEqual(17, len(symbol_index.modules))
+        symbol_index.save()
+        self.assertEqual(17, len(SymbolIndex(self.index_path).modules))
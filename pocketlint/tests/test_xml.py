@@ -7,7 +7,15 @@ from __future__ import (
     unicode_literals,
 )
 
-from pocketlint.formatcheck import XMLChecker
+import os
+import shutil
+from tempfile import mkdtemp
+
+from pocketlint.formatcheck import (
+    read_source,
+    XMLChecker,
+)
+from pocketlint import formatcheck
 from pocketlint.tests import CheckerTestCase
 from pocketlint.tests.test_text import TestAnyTextMixin
 
@@ -106,6 +114,98 @@ class TestXML(CheckerTestCase):
         checker.check()
         self.assertEqual([], self.reporter.messages)
 
+    def test_non_ascii_names(self):
+        checker = XMLChecker(
+            'bogus', '<\xe9t\xe9>\u2603</\xe9t\xe9>\n', self.reporter)
+        checker.check()
+        self.assertEqual([], self.reporter.messages)
+
+    def test_error_line_after_xml_declaration(self):
+        markup = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<root>\n'
+            '  <child>&bogus;</child>\n'
+            '</root>\n')
+        checker = XMLChecker('bogus', markup, self.reporter)
+        checker.check()
+        self.assertEqual([(3, 'undefined entity')], self.reporter.messages)
+        self.assertEqual(10, self.reporter.diagnostics[0].column)
+
+    def test_error_column_after_leading_space(self):
+        checker = XMLChecker('bogus', '\xa0 <a></b>\n', self.reporter)
+        checker.check()
+        self.assertEqual([(1, 'mismatched tag')], self.reporter.messages)
+        self.assertEqual(8, self.reporter.diagnostics[0].column)
+
+    def test_error_column_counts_characters(self):
+        checker = XMLChecker('bogus', '<a>\xe9\u2603</b>\n', self.reporter)
+        checker.check()
+        self.assertEqual([(1, 'mismatched tag')], self.reporter.messages)
+        self.assertEqual(8, self.reporter.diagnostics[0].column)
+
+
+class TestXMLStream(CheckerTestCase):
+    """Verify the streaming check of large files."""
+
+    def setUp(self):
+        super(TestXMLStream, self).setUp()
+        self.root = mkdtemp(prefix='pocketlint_')
+        self.chunk_size = formatcheck.STREAM_CHUNK_SIZE
+        formatcheck.STREAM_CHUNK_SIZE = 7
+
+    def tearDown(self):
+        formatcheck.STREAM_CHUNK_SIZE = self.chunk_size
+        shutil.rmtree(self.root)
+
+    def check_stream(self, markup, name='bogus.xml'):
+        path = os.path.join(self.root, name)
+        with open(path, 'wb') as xml_file:
+            xml_file.write(markup.encode('utf-8'))
+        checker = XMLChecker(path, None, self.reporter)
+        checker.check()
+        return path
+
+    def test_good_markup(self):
+        self.check_stream(good_markup)
+        self.assertEqual([], self.reporter.messages)
+
+    def test_missing_dtd_and_xml(self):
+        self.check_stream(missing_dtd_and_xml)
+        self.assertEqual([], self.reporter.messages)
+
+    def test_html5_dtd(self):
+        self.check_stream(html5_dtd_and_entity)
+        self.assertEqual([], self.reporter.messages)
+
+    def test_ill_formed_markup(self):
+        self.check_stream(ill_formed_markup)
+        self.assertEqual(
+            [(3, 'not well-formed (invalid token)')], self.reporter.messages)
+
+    def test_undefined_entity(self):
+        self.check_stream('<root>\n  <child>&bogus;</child>\n</root>\n')
+        self.assertEqual([(2, 'undefined entity')], self.reporter.messages)
+        self.assertEqual(10, self.reporter.diagnostics[0].column)
+
+    def test_line_checks(self):
+        self.check_stream(
+            '<root>  \r\n  <child>h\xe9llo</child> \r\n</root>\r\n')
+        self.assertEqual(
+            [(1, 'Line has trailing whitespace.'),
+             (2, 'Line has trailing whitespace.'),
+             (0, 'File contains Windows new lines.')],
+            self.reporter.messages)
+
+    def test_read_source_streams_large_xml(self):
+        path = self.check_stream(good_markup)
+        self.assertEqual(good_markup, read_source(path))
+        size = formatcheck.STREAM_SIZE
+        formatcheck.STREAM_SIZE = 10
+        try:
+            self.assertIs(None, read_source(path))
+        finally:
+            formatcheck.STREAM_SIZE = size
+
 
 class TestText(CheckerTestCase, TestAnyTextMixin):
     """Verify text integration."""